@@ -1,6 +1,7 @@
 """
 Alert Manager - Coordinates all alert channels with cooldown logic
 """
+import time
 import asyncio
 from datetime import datetime, timedelta
 from typing import Optional, Dict, List, Any
@@ -11,6 +12,7 @@ from .sms_handler import SMSHandler
 from .email_handler import EmailHandler
 from .telegram_handler import TelegramHandler
 from .whatsapp_handler import WhatsAppHandler
+from metrics import ALERT_DISPATCH_SECONDS, ALERT_FAILURES
 
 
 @dataclass
@@ -22,6 +24,7 @@ class AlertRecord:
     timestamp: datetime
     channels: List[str]
     evidence_path: Optional[str] = None
+    camera_id: Optional[str] = None
 
 
 class AlertManager:
@@ -140,7 +143,8 @@ class AlertManager:
         confidence: float,
         location: str,
         channels: List[str],
-        evidence_path: Optional[str] = None
+        evidence_path: Optional[str] = None,
+        camera_id: Optional[str] = None
     ):
         """Record an alert in history and update cooldown"""
         now = datetime.now()
@@ -152,7 +156,8 @@ class AlertManager:
             location=location,
             timestamp=now,
             channels=channels,
-            evidence_path=evidence_path
+            evidence_path=evidence_path,
+            camera_id=camera_id
         )
         
         self._alert_history.append(record)
@@ -167,7 +172,9 @@ class AlertManager:
         confidence: float,
         location: str = "Camera 1",
         evidence_path: Optional[str] = None,
-        force: bool = False
+        force: bool = False,
+        camera_id: Optional[str] = None,
+        image: Optional[bytes] = None
     ) -> Dict[str, Any]:
         """
         Trigger alerts across all configured channels
@@ -178,6 +185,9 @@ class AlertManager:
             location: Camera/location identifier
             evidence_path: Path to evidence image
             force: Bypass cooldown check
+            camera_id: Camera that produced the detection
+            image: Evidence JPEG already in memory; channels attach it
+                instead of re-reading evidence_path
             
         Returns:
             Dict with alert status for each channel
@@ -200,6 +210,11 @@ class AlertManager:
             result["reason"] = f"cooldown_active_{int(remaining)}s_remaining"
             return result
         
+        # Start the cooldown now: alerts are dispatched concurrently, and a
+        # second one for this weapon must not pass the check while the
+        # channels of the first are still sending
+        self._last_alerts[weapon_type] = datetime.now()
+        
         successful_channels = []
         
         # Dispatch to all channels concurrently
@@ -217,7 +232,8 @@ class AlertManager:
                 weapon_type=weapon_type,
                 confidence=confidence,
                 location=location,
-                evidence_path=evidence_path
+                evidence_path=evidence_path,
+                image=image
             )))
         
         if self.telegram_handler and self.telegram_handler._initialized:
@@ -225,7 +241,8 @@ class AlertManager:
                 weapon_type=weapon_type,
                 confidence=confidence,
                 location=location,
-                evidence_path=evidence_path
+                evidence_path=evidence_path,
+                image=image
             )))
         
         if self.whatsapp_handler and self.whatsapp_handler._initialized:
@@ -238,14 +255,19 @@ class AlertManager:
         
         # Execute all alerts
         for channel, task in tasks:
+            started = time.perf_counter()
             try:
                 success = await task
                 result["channels"][channel] = success
                 if success:
                     successful_channels.append(channel)
+                else:
+                    ALERT_FAILURES.labels(channel).inc()
             except Exception as e:
                 result["channels"][channel] = False
+                ALERT_FAILURES.labels(channel).inc()
                 print(f"❌ {channel} alert failed: {e}")
+            ALERT_DISPATCH_SECONDS.labels(channel).observe(time.perf_counter() - started)
         
         # Always record the alert in history (even if no channels configured)
         result["triggered"] = True
@@ -255,7 +277,8 @@ class AlertManager:
             confidence=confidence,
             location=location,
             channels=channels_used,
-            evidence_path=evidence_path
+            evidence_path=evidence_path,
+            camera_id=camera_id
         )
         
         if successful_channels:
@@ -287,7 +310,8 @@ class AlertManager:
                 "location": a.location,
                 "timestamp": a.timestamp.isoformat(),
                 "channels": a.channels,
-                "evidence_path": a.evidence_path
+                "evidence_path": a.evidence_path,
+                "camera_id": a.camera_id
             }
             for a in reversed(alerts)
         ]
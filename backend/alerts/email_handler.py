@@ -67,7 +67,8 @@ class EmailHandler:
         confidence: float,
         location: str = "Camera 1",
         timestamp: Optional[datetime] = None,
-        evidence_path: Optional[str] = None
+        evidence_path: Optional[str] = None,
+        image: Optional[bytes] = None
     ) -> bool:
         """
         Send email alert for weapon detection
@@ -78,6 +79,7 @@ class EmailHandler:
             location: Camera/location identifier
             timestamp: Detection timestamp
             evidence_path: Optional path to evidence image
+            image: Evidence JPEG bytes; read from evidence_path if None
             
         Returns:
             True if email sent successfully
@@ -136,21 +138,21 @@ class EmailHandler:
         msg.attach(MIMEText(html_body, 'html'))
         
         # Attach evidence image if provided
-        if evidence_path:
-            evidence_file = Path(evidence_path)
-            if evidence_file.exists():
-                try:
-                    with open(evidence_file, 'rb') as f:
-                        part = MIMEBase('application', 'octet-stream')
-                        part.set_payload(f.read())
-                        encoders.encode_base64(part)
-                        part.add_header(
-                            'Content-Disposition',
-                            f'attachment; filename="{evidence_file.name}"'
-                        )
-                        msg.attach(part)
-                except Exception as e:
-                    print(f"⚠️ Could not attach evidence: {e}")
+        filename = Path(evidence_path).name if evidence_path else "evidence.jpg"
+        try:
+            if image is None and evidence_path and Path(evidence_path).exists():
+                image = Path(evidence_path).read_bytes()
+            if image:
+                part = MIMEBase('image', 'jpeg')
+                part.set_payload(image)
+                encoders.encode_base64(part)
+                part.add_header(
+                    'Content-Disposition',
+                    f'attachment; filename="{filename}"'
+                )
+                msg.attach(part)
+        except Exception as e:
+            print(f"⚠️ Could not attach evidence: {e}")
         
         try:
             await aiosmtplib.send(
@@ -52,7 +52,8 @@ class TelegramHandler:
         weapon_type: str,
         confidence: float,
         location: str = "Camera 1",
-        evidence_path: Optional[str] = None
+        evidence_path: Optional[str] = None,
+        image: Optional[bytes] = None
     ) -> bool:
         """
         Send alert message via Telegram
@@ -62,6 +63,7 @@ class TelegramHandler:
             confidence: Detection confidence score
             location: Camera/location identifier
             evidence_path: Optional path to evidence image
+            image: Evidence JPEG bytes; read from evidence_path if None
             
         Returns:
             True if sent successfully
@@ -80,6 +82,10 @@ class TelegramHandler:
             f"<i>Smart Surveillance System Alert</i>"
         )
         
+        # Read a file-only image once, not once per chat
+        if image is None and evidence_path and Path(evidence_path).exists():
+            image = Path(evidence_path).read_bytes()
+        
         success = True
         
         async with aiohttp.ClientSession() as session:
@@ -101,8 +107,8 @@ class TelegramHandler:
                             continue
                     
                     # Send image if available
-                    if evidence_path and Path(evidence_path).exists():
-                        await self._send_photo(session, chat_id, evidence_path)
+                    if image:
+                        await self._send_photo(session, chat_id, image)
                     
                     self._send_count += 1
                     print(f"✅ Telegram alert sent to {chat_id}")
@@ -117,20 +123,19 @@ class TelegramHandler:
         self,
         session: aiohttp.ClientSession,
         chat_id: str,
-        photo_path: str
+        photo: bytes
     ) -> bool:
-        """Send photo to Telegram"""
+        """Send JPEG bytes as a photo to Telegram"""
         try:
             url = f"{self.BASE_URL}{self.bot_token}/sendPhoto"
             
-            with open(photo_path, 'rb') as photo:
-                data = aiohttp.FormData()
-                data.add_field('chat_id', chat_id)
-                data.add_field('photo', photo, filename='evidence.jpg')
-                data.add_field('caption', '📷 Detection Evidence')
-                
-                async with session.post(url, data=data) as response:
-                    return response.status == 200
+            data = aiohttp.FormData()
+            data.add_field('chat_id', chat_id)
+            data.add_field('photo', photo, filename='evidence.jpg', content_type='image/jpeg')
+            data.add_field('caption', '📷 Detection Evidence')
+            
+            async with session.post(url, data=data) as response:
+                return response.status == 200
                     
         except Exception as e:
             print(f"❌ Failed to send photo: {e}")
@@ -0,0 +1,3 @@
+"""
+Offline benchmarks (run from backend/ with ``python -m bench.<name>``)
+"""
@@ -0,0 +1,242 @@
+"""
+Shared Benchmark Helpers
+Stub detector backend, synthetic video sources, latency statistics and
+JSON reports that can be compared across commits
+"""
+import os
+import sys
+import json
+import time
+import platform
+import resource
+import subprocess
+import cv2
+import numpy as np
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple
+
+from detection.backends import InferenceBackend, RawDetections, BACKENDS, preprocess
+
+
+# ============================================================================
+# Stub Model
+# ============================================================================
+
+class StubBackend(InferenceBackend):
+    """
+    Model-free backend for CPU-only, offline runs.
+
+    Emits ``boxes`` random detections per frame and can burn a fixed
+    ``latency_ms`` to stand in for the forward pass. With ``preprocess``
+    the real letterbox/normalize step still runs, so input handling costs
+    what it does with a real model.
+    """
+
+    name = "stub"
+
+    def __init__(
+        self,
+        model_path: str = "",
+        boxes: int = 5,
+        latency_ms: float = 0.0,
+        input_size: int = 640,
+        preprocess: bool = True,
+        seed: int = 0,
+        **_
+    ):
+        super().__init__(model_path)
+        self.boxes = boxes
+        self.latency_ms = latency_ms
+        self.input_size = input_size
+        self.preprocess = preprocess
+        self._rng = np.random.default_rng(seed)
+
+    def load(self):
+        self.names = {0: "gun", 1: "knife", 2: "rifle", 3: "person"}
+
+    def predict(self, frames: List[np.ndarray]) -> List[RawDetections]:
+        if self.preprocess:
+            preprocess(frames, self.input_size)
+        if self.latency_ms > 0:
+            time.sleep(self.latency_ms * len(frames) / 1000.0)
+        return [self._random_detections(frame.shape[:2]) for frame in frames]
+
+    def _random_detections(self, shape: Tuple[int, int]) -> RawDetections:
+        height, width = shape
+        if self.boxes <= 0:
+            return RawDetections.empty()
+        corners = self._rng.random((self.boxes, 2)) * [width * 0.8, height * 0.8]
+        sizes = self._rng.random((self.boxes, 2)) * [width * 0.2, height * 0.2] + 8
+        boxes = np.hstack([corners, corners + sizes]).astype(np.float32)
+        scores = self._rng.uniform(0.75, 0.99, self.boxes).astype(np.float32)
+        class_ids = self._rng.integers(0, len(self.names), self.boxes)
+        return RawDetections(boxes=boxes, scores=scores, class_ids=class_ids)
+
+
+BACKENDS.setdefault(StubBackend.name, StubBackend)
+
+
+# ============================================================================
+# Synthetic Sources
+# ============================================================================
+
+def synthetic_frame(width: int, height: int, index: int) -> np.ndarray:
+    """Deterministic textured frame with a few moving shapes"""
+    y, x = np.mgrid[0:height, 0:width]
+    frame = np.empty((height, width, 3), dtype=np.uint8)
+    frame[..., 0] = (x + index * 3) % 256
+    frame[..., 1] = (y + index * 2) % 256
+    frame[..., 2] = ((x + y) // 2 + index) % 256
+
+    rng = np.random.default_rng(index)
+    noise = rng.integers(0, 24, (height, width, 1), dtype=np.uint8)
+    cv2.add(frame, np.broadcast_to(noise, frame.shape).copy(), dst=frame)
+
+    for k in range(4):
+        cx = int((0.2 + 0.2 * k) * width + 0.1 * width * np.sin(index / 7 + k))
+        cy = int(0.5 * height + 0.3 * height * np.cos(index / 11 + k))
+        size = max(8, min(width, height) // 10)
+        cv2.rectangle(frame, (cx - size, cy - size), (cx + size, cy + size), (40 * k, 255 - 40 * k, 128), -1)
+    return frame
+
+
+def write_synthetic_video(
+    path: Path,
+    width: int,
+    height: int,
+    frames: int = 60,
+    fps: int = 30
+) -> Path:
+    """Encode synthetic frames to an MJPG .avi so capture includes decoding"""
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), fps, (width, height))
+    if not writer.isOpened():
+        raise RuntimeError(f"Could not create {path}")
+    try:
+        for index in range(frames):
+            writer.write(synthetic_frame(width, height, index))
+    finally:
+        writer.release()
+    return path
+
+
+def parse_resolution(value: str) -> Tuple[int, int]:
+    """'1280x720' → (1280, 720)"""
+    width, height = value.lower().split("x")
+    return int(width), int(height)
+
+
+# ============================================================================
+# Statistics
+# ============================================================================
+
+def summarize(samples_ms: List[float]) -> Dict[str, float]:
+    """Latency percentiles and throughput of one stage"""
+    if not samples_ms:
+        return {"count": 0}
+    samples = np.asarray(samples_ms, dtype=np.float64)
+    p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+    mean = float(samples.mean())
+    return {
+        "count": int(samples.size),
+        "mean_ms": round(mean, 3),
+        "p50_ms": round(float(p50), 3),
+        "p95_ms": round(float(p95), 3),
+        "p99_ms": round(float(p99), 3),
+        "max_ms": round(float(samples.max()), 3),
+        "throughput_fps": round(1000.0 / mean, 1) if mean > 0 else None
+    }
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process so far"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def current_rss_mb() -> Optional[float]:
+    """Current resident set size (Linux only)"""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return round(pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024), 1)
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+# ============================================================================
+# Reports
+# ============================================================================
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+            cwd=Path(__file__).resolve().parent
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment() -> Dict[str, Any]:
+    """Machine and library versions the numbers were measured on"""
+    return {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "opencv": cv2.__version__,
+        "numpy": np.__version__,
+        "opencv_threads": cv2.getNumThreads()
+    }
+
+
+def write_report(report: Dict[str, Any], path: Optional[str]):
+    if path:
+        Path(path).write_text(json.dumps(report, indent=2))
+        print(f"📝 Report written to {path}")
+
+
+def compare_reports(
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    metric: str = "p50_ms"
+) -> List[Dict[str, Any]]:
+    """
+    Per-scenario, per-stage change of one latency metric
+
+    Scenarios are matched by name; positive change_pct means slower.
+    """
+    previous = {scenario["name"]: scenario for scenario in baseline.get("scenarios", [])}
+    rows = []
+    for scenario in current.get("scenarios", []):
+        old = previous.get(scenario["name"])
+        if old is None:
+            continue
+        for stage, stats in scenario["stages"].items():
+            before = old["stages"].get(stage, {}).get(metric)
+            after = stats.get(metric)
+            if not before or after is None:
+                continue
+            rows.append({
+                "scenario": scenario["name"],
+                "stage": stage,
+                "before": before,
+                "after": after,
+                "change_pct": round((after - before) / before * 100.0, 1)
+            })
+    return rows
+
+
+def print_comparison(rows: List[Dict[str, Any]], metric: str = "p50_ms"):
+    if not rows:
+        print("No matching scenarios in the baseline")
+        return
+    print(f"\n{'scenario':<36} {'stage':<10} {'before':>10} {'after':>10} {'change':>8}  ({metric})")
+    for row in rows:
+        print(
+            f"{row['scenario']:<36} {row['stage']:<10} {row['before']:>10.3f} "
+            f"{row['after']:>10.3f} {row['change_pct']:>+7.1f}%"
+        )
@@ -0,0 +1,222 @@
+"""
+Detection Pipeline Benchmark
+
+Runs VideoProcessor → WeaponDetector.detect() → annotate_frame() →
+frame_to_jpeg() on recorded video files and on synthetic videos at several
+resolutions and box densities, reporting per-stage throughput, p50/p95/p99
+latency and peak RSS. Needs no network or GPU: without --model a stub
+backend stands in for the network.
+
+Usage (from backend/):
+    python -m bench.pipeline
+    python -m bench.pipeline --resolutions 640x480,1920x1080 --boxes 0,10,50
+    python -m bench.pipeline --video clips/lobby.mp4 --output before.json
+    python -m bench.pipeline --backend onnx --model models/best.onnx --baseline before.json
+"""
+import sys
+import json
+import time
+import argparse
+import tempfile
+import cv2
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+
+from detection import WeaponDetector, VideoProcessor, frame_to_jpeg
+from .common import (
+    write_synthetic_video, parse_resolution, summarize, peak_rss_mb, current_rss_mb,
+    environment, write_report, compare_reports, print_comparison
+)
+
+
+STAGES = ("capture", "detect", "annotate", "encode", "total")
+
+
+def run_scenario(
+    name: str,
+    source: str,
+    detector: WeaponDetector,
+    width: int,
+    height: int,
+    frames: int,
+    warmup: int,
+    jpeg_quality: int
+) -> Dict[str, Any]:
+    """Time every stage of the pipeline for one source and detector setup"""
+    processor = VideoProcessor(source=source, frame_width=width, frame_height=height)
+    if not processor.open():
+        raise RuntimeError(f"Could not open {source}")
+
+    samples: Dict[str, List[float]] = {stage: [] for stage in STAGES}
+    detections_seen = 0
+    jpeg_bytes = 0
+    measured = 0
+    started = None
+
+    try:
+        while measured < frames:
+            t0 = time.perf_counter()
+            frame_data = processor.read_frame()
+            if frame_data is None:
+                # End of file: rewind and keep going
+                processor.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                continue
+            t1 = time.perf_counter()
+            try:
+                detections = detector.detect(frame_data.frame)
+                t2 = time.perf_counter()
+                annotated = detector.annotate_frame(frame_data.frame, detections)
+                t3 = time.perf_counter()
+                jpeg = frame_to_jpeg(annotated, quality=jpeg_quality)
+                t4 = time.perf_counter()
+            finally:
+                frame_data.release()
+
+            if warmup > 0:
+                warmup -= 1
+                continue
+            if started is None:
+                started = t0
+
+            for stage, begin, end in (
+                ("capture", t0, t1), ("detect", t1, t2), ("annotate", t2, t3),
+                ("encode", t3, t4), ("total", t0, t4)
+            ):
+                samples[stage].append((end - begin) * 1000.0)
+            detections_seen += len(detections)
+            jpeg_bytes += len(jpeg)
+            measured += 1
+        wall = time.perf_counter() - started if started is not None else 0.0
+    finally:
+        processor.close()
+
+    return {
+        "name": name,
+        "source": source,
+        "resolution": f"{width}x{height}",
+        "frames": measured,
+        "wall_seconds": round(wall, 3),
+        "fps": round(measured / wall, 1) if wall > 0 else None,
+        "avg_detections": round(detections_seen / max(measured, 1), 2),
+        "avg_jpeg_kb": round(jpeg_bytes / max(measured, 1) / 1024, 1),
+        "stages": {stage: summarize(values) for stage, values in samples.items()},
+        "peak_rss_mb": peak_rss_mb(),
+        "rss_mb": current_rss_mb()
+    }
+
+
+def build_detector(args: argparse.Namespace, boxes: int) -> WeaponDetector:
+    if args.model:
+        options = {"input_size": args.input_size, "num_threads": args.threads}
+        backend = args.backend
+    else:
+        options = {
+            "boxes": boxes,
+            "latency_ms": args.stub_latency_ms,
+            "input_size": args.input_size
+        }
+        backend = "stub"
+
+    detector = WeaponDetector(
+        model_path=args.model or "",
+        confidence_threshold=args.confidence,
+        backend=backend,
+        backend_options=options
+    )
+    if not detector.load_model():
+        raise RuntimeError(f"Could not load {args.model or 'stub model'}")
+    return detector
+
+
+def print_scenario(result: Dict[str, Any]):
+    print(
+        f"\n▶ {result['name']}: {result['fps']} fps over {result['frames']} frames "
+        f"(peak RSS {result['peak_rss_mb']} MB)"
+    )
+    for stage, stats in result["stages"].items():
+        if not stats.get("count"):
+            continue
+        print(
+            f"   {stage:<9} p50 {stats['p50_ms']:>8.2f} ms   p95 {stats['p95_ms']:>8.2f} ms   "
+            f"p99 {stats['p99_ms']:>8.2f} ms   {stats['throughput_fps']:>8} fps"
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Offline benchmark of the detection pipeline")
+    parser.add_argument("--video", action="append", default=[],
+                        help="Recorded video file (repeatable)")
+    parser.add_argument("--resolutions", default="640x480,1280x720,1920x1080",
+                        help="Comma-separated WxH list for synthetic videos and resizing")
+    parser.add_argument("--boxes", default="0,5,25",
+                        help="Comma-separated detections per frame (stub model only)")
+    parser.add_argument("--no-synthetic", action="store_true", help="Only benchmark --video files")
+    parser.add_argument("--frames", type=int, default=200, help="Measured frames per scenario")
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--backend", choices=["onnx", "ultralytics"], default="onnx",
+                        help="Runtime for --model")
+    parser.add_argument("--model", default=None,
+                        help="Local model file (default: stub model, no weights needed)")
+    parser.add_argument("--stub-latency-ms", type=float, default=0.0,
+                        help="Simulated forward-pass time of the stub model")
+    parser.add_argument("--input-size", type=int, default=640)
+    parser.add_argument("--threads", type=int, default=0)
+    parser.add_argument("--confidence", type=float, default=0.5)
+    parser.add_argument("--jpeg-quality", type=int, default=80)
+    parser.add_argument("--output", default=None, help="Write the JSON report here")
+    parser.add_argument("--baseline", default=None, help="Earlier JSON report to compare against")
+    args = parser.parse_args(argv)
+
+    if args.model and not Path(args.model).exists():
+        print(f"❌ Model not found: {args.model}")
+        return 1
+
+    resolutions = [parse_resolution(value) for value in args.resolutions.split(",") if value]
+    densities = [int(value) for value in args.boxes.split(",") if value] if not args.model else [None]
+
+    scenarios = []
+    with tempfile.TemporaryDirectory(prefix="bench_") as tmp:
+        sources = [(Path(path).stem, path, None) for path in args.video]
+        if not args.no_synthetic:
+            for width, height in resolutions:
+                path = write_synthetic_video(Path(tmp) / f"synthetic_{width}x{height}.avi", width, height)
+                sources.append(("synthetic", str(path), (width, height)))
+
+        for label, path, native in sources:
+            for width, height in ([native] if native else resolutions):
+                for boxes in densities:
+                    name = f"{label}@{width}x{height}"
+                    if boxes is not None:
+                        name += f"/{boxes}boxes"
+                    detector = build_detector(args, boxes or 0)
+                    result = run_scenario(
+                        name, path, detector, width, height,
+                        frames=args.frames, warmup=args.warmup, jpeg_quality=args.jpeg_quality
+                    )
+                    result["boxes"] = boxes
+                    scenarios.append(result)
+                    print_scenario(result)
+
+    report = {
+        "benchmark": "pipeline",
+        "environment": environment(),
+        "model": {
+            "backend": args.backend if args.model else "stub",
+            "path": args.model,
+            "input_size": args.input_size,
+            "stub_latency_ms": None if args.model else args.stub_latency_ms
+        },
+        "settings": {"frames": args.frames, "warmup": args.warmup, "jpeg_quality": args.jpeg_quality},
+        "scenarios": scenarios
+    }
+    write_report(report, args.output)
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        for metric in ("p50_ms", "p99_ms"):
+            print_comparison(compare_reports(baseline, report, metric), metric)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
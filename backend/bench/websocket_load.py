@@ -0,0 +1,538 @@
+"""
+WebSocket Load Test
+
+Opens a growing number of concurrent /ws/stream viewers that read at
+different speeds and reports, per step, the frame delivery rate, send and
+end-to-end latency (from the server's camera histograms), dropped frames and
+server CPU, and the client count at which the server saturates.
+
+Viewer profiles:
+    fast     reads every frame as soon as it arrives
+    slow     sleeps --slow-delay seconds after each frame
+    stalled  connects and never reads
+
+The server is either started here with a file video source and the stub
+model (in-process in a background thread, or as a local subprocess), or an
+already running one is targeted with --url.
+
+Usage (from backend/):
+    python -m bench.websocket_load --steps 10,50,100,200,400
+    python -m bench.websocket_load --spawn --video clips/lobby.mp4 --output ws.json
+    python -m bench.websocket_load --url http://127.0.0.1:8000 --server-pid 4242
+    python -m bench.websocket_load --path /ws/stream/camera_2 --mix fast=0.5,slow=0.5
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+import threading
+import functools
+import subprocess
+import urllib.request
+import numpy as np
+import yaml
+from pathlib import Path
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Optional, Tuple
+
+from .common import (
+    StubBackend, write_synthetic_video, parse_resolution, environment, write_report
+)
+
+
+PROFILES = ("fast", "slow", "stalled")
+
+
+# ============================================================================
+# Server
+# ============================================================================
+
+def write_server_config(
+    path: Path,
+    video: str,
+    width: int,
+    height: int,
+    fps: int,
+    port: int,
+    evidence_path: str
+) -> Path:
+    """Config for one camera streaming a file through the stub model"""
+    config = {
+        "detection": {
+            "backend": "stub",
+            "model_path": "",
+            "adaptive_scheduling": False
+        },
+        "cameras": [{
+            "id": "load",
+            "name": "Load test",
+            "source": video,
+            "frame_width": width,
+            "frame_height": height,
+            "fps": fps,
+            "motion_gate": False
+        }],
+        "alerts": {"enabled": False},
+        "storage": {"evidence_path": evidence_path},
+        "server": {"host": "127.0.0.1", "port": port}
+    }
+    path.write_text(yaml.safe_dump(config))
+    return path
+
+
+def serve(config_path: str, boxes: int):
+    """Run the FastAPI app with the stub model (blocks)"""
+    import uvicorn
+    from detection.backends import BACKENDS
+    from config import reload_config
+
+    BACKENDS["stub"] = functools.partial(StubBackend, boxes=boxes)
+    config = reload_config(config_path)
+
+    import main
+    uvicorn.run(main.app, host=config.server.host, port=config.server.port, log_level="warning")
+
+
+class InProcessServer:
+    """The app on its own thread and event loop inside this process"""
+
+    def __init__(self, config_path: str, boxes: int):
+        import uvicorn
+        from detection.backends import BACKENDS
+        from config import reload_config
+
+        BACKENDS["stub"] = functools.partial(StubBackend, boxes=boxes)
+        config = reload_config(config_path)
+
+        import main
+        self._server = uvicorn.Server(uvicorn.Config(
+            main.app, host=config.server.host, port=config.server.port, log_level="warning"
+        ))
+        self._thread = threading.Thread(target=self._server.run, name="server", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._server.should_exit = True
+        self._thread.join(timeout=10)
+
+    @staticmethod
+    def cpu_seconds() -> float:
+        """Process CPU minus the load generator's own (main) thread"""
+        return time.process_time() - time.thread_time()
+
+
+class SubprocessServer:
+    """The app in a local child process"""
+
+    def __init__(self, config_path: str, boxes: int):
+        self._args = [
+            sys.executable, "-m", "bench.websocket_load",
+            "--serve", config_path, "--boxes", str(boxes)
+        ]
+        self._process: Optional[subprocess.Popen] = None
+
+    def start(self):
+        self._process = subprocess.Popen(self._args, cwd=Path(__file__).resolve().parent.parent)
+
+    def stop(self):
+        if self._process and self._process.poll() is None:
+            self._process.terminate()
+            try:
+                self._process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+
+    def cpu_seconds(self) -> Optional[float]:
+        return process_cpu_seconds(self._process.pid) if self._process else None
+
+
+def process_cpu_seconds(pid: int) -> Optional[float]:
+    """User + system CPU time of a process (Linux /proc)"""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def fetch_json(url: str, timeout: float = 5.0) -> Dict[str, Any]:
+    with urllib.request.urlopen(url, timeout=timeout) as response:
+        return json.loads(response.read())
+
+
+async def wait_for_server(base_url: str, timeout: float = 60.0):
+    loop = asyncio.get_running_loop()
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            status = await loop.run_in_executor(None, fetch_json, f"{base_url}/api/cameras", 2.0)
+            if any(camera["is_running"] for camera in status["cameras"]):
+                return
+        except Exception:
+            pass
+        await asyncio.sleep(0.5)
+    raise RuntimeError(f"Server at {base_url} did not come up")
+
+
+# ============================================================================
+# Viewers
+# ============================================================================
+
+@dataclass
+class ViewerStats:
+    profile: str
+    connected: bool = False
+    closed: bool = False
+    error: Optional[str] = None
+    frames: int = 0
+    events: int = 0
+    bytes: int = 0
+    arrivals: List[float] = field(default_factory=list)
+
+
+async def viewer(
+    url: str,
+    stats: ViewerStats,
+    stop: asyncio.Event,
+    slow_delay: float
+):
+    """One simulated dashboard"""
+    import websockets
+
+    try:
+        # A one-message client queue makes a slow reader push back on the
+        # server's socket instead of buffering frames locally
+        async with websockets.connect(
+            url, max_size=None, max_queue=1, ping_interval=None, open_timeout=30
+        ) as ws:
+            stats.connected = True
+            if stats.profile == "stalled":
+                await stop.wait()
+                return
+            while not stop.is_set():
+                try:
+                    message = await asyncio.wait_for(ws.recv(), timeout=0.5)
+                except asyncio.TimeoutError:
+                    continue
+                if isinstance(message, bytes):
+                    stats.frames += 1
+                    stats.bytes += len(message)
+                    stats.arrivals.append(time.monotonic())
+                else:
+                    stats.events += 1
+                if stats.profile == "slow":
+                    await asyncio.sleep(slow_delay)
+    except Exception as e:
+        stats.error = type(e).__name__
+    finally:
+        stats.closed = True
+
+
+def parse_mix(value: str) -> Dict[str, float]:
+    """'fast=0.8,slow=0.15,stalled=0.05' → normalized shares"""
+    mix = {}
+    for part in value.split(","):
+        name, share = part.split("=")
+        if name not in PROFILES:
+            raise ValueError(f"Unknown viewer profile: {name}")
+        mix[name] = float(share)
+    total = sum(mix.values())
+    return {name: share / total for name, share in mix.items()}
+
+
+def assign_profiles(count: int, mix: Dict[str, float]) -> List[str]:
+    """Deterministic profile per viewer index, matching the mix at any count"""
+    profiles = []
+    assigned = {name: 0 for name in mix}
+    for index in range(1, count + 1):
+        # Pick the profile furthest below its share so far
+        name = max(mix, key=lambda p: mix[p] * index - assigned[p])
+        assigned[name] += 1
+        profiles.append(name)
+    return profiles
+
+
+# ============================================================================
+# Measurement
+# ============================================================================
+
+def histogram_delta(before: Dict[str, Any], after: Dict[str, Any]) -> Dict[str, Optional[float]]:
+    """Percentiles of the observations a server latency histogram gained"""
+    buckets_after = after.get("buckets", {})
+    buckets_before = before.get("buckets", {})
+    counts = [
+        (bound, buckets_after[bound] - buckets_before.get(bound, 0))
+        for bound in buckets_after
+    ]
+    total = sum(count for _, count in counts)
+    result: Dict[str, Optional[float]] = {"count": total}
+    for name, q in (("p50_ms", 0.50), ("p95_ms", 0.95), ("p99_ms", 0.99)):
+        value = None
+        if total:
+            seen = 0
+            for bound, count in counts:
+                seen += count
+                if seen >= q * total:
+                    value = float("inf") if bound == "+Inf" else float(bound)
+                    break
+        result[name] = value
+    return result
+
+
+def camera_snapshot(cameras: Dict[str, Any], camera_id: Optional[str]) -> Dict[str, Any]:
+    for camera in cameras["cameras"]:
+        if camera_id is None or camera["id"] == camera_id:
+            return camera
+    raise RuntimeError(f"Camera not found in /api/cameras: {camera_id}")
+
+
+def summarize_step(
+    clients: int,
+    duration: float,
+    viewers: List[ViewerStats],
+    window: Tuple[float, float],
+    before: Dict[str, Any],
+    after: Dict[str, Any],
+    cpu: Tuple[Optional[float], Optional[float]]
+) -> Dict[str, Any]:
+    start, end = window
+    published = after["stream"]["frames_published"] - before["stream"]["frames_published"]
+    source_fps = published / duration
+
+    profiles: Dict[str, Any] = {}
+    for profile in PROFILES:
+        group = [v for v in viewers if v.profile == profile]
+        if not group:
+            continue
+        rates, gaps = [], []
+        for stats in group:
+            arrivals = [t for t in stats.arrivals if start <= t <= end]
+            rates.append(len(arrivals) / duration)
+            gaps.extend(np.diff(arrivals) * 1000.0)
+        rates_array = np.asarray(rates)
+        profiles[profile] = {
+            "clients": len(group),
+            "disconnected": sum(1 for v in group if v.closed),
+            "fps_p50": round(float(np.median(rates_array)), 2),
+            "fps_min": round(float(rates_array.min()), 2),
+            "delivery_ratio": round(float(np.median(rates_array)) / source_fps, 3) if source_fps else None,
+            "gap_p99_ms": round(float(np.percentile(gaps, 99)), 1) if gaps else None
+        }
+
+    latency_before = before["pipeline"]["latency"]
+    latency_after = after["pipeline"]["latency"]
+    cpu_start, cpu_end = cpu
+    return {
+        "clients": clients,
+        "connected": sum(1 for v in viewers if v.connected and not v.closed),
+        "published_fps": round(source_fps, 2),
+        "pipeline_fps": after["pipeline"].get("fps"),
+        "frames_dropped": after["stream"]["frames_dropped"] - before["stream"]["frames_dropped"],
+        "send_latency": histogram_delta(
+            latency_before["stages"].get("send", {}), latency_after["stages"].get("send", {})
+        ),
+        "end_to_end_latency": histogram_delta(
+            latency_before["end_to_end"], latency_after["end_to_end"]
+        ),
+        "server_cpu_percent": (
+            round((cpu_end - cpu_start) / duration * 100.0, 1)
+            if cpu_start is not None and cpu_end is not None else None
+        ),
+        "profiles": profiles
+    }
+
+
+def is_saturated(step: Dict[str, Any], baseline_fps: float, threshold: float) -> bool:
+    """Fast viewers fall behind, or the pipeline itself slows down"""
+    fast = step["profiles"].get("fast")
+    if fast and fast["delivery_ratio"] is not None and fast["delivery_ratio"] < threshold:
+        return True
+    return baseline_fps > 0 and step["published_fps"] < threshold * baseline_fps
+
+
+def print_step(step: Dict[str, Any]):
+    e2e = step["end_to_end_latency"]
+    fast = step["profiles"].get("fast", {})
+    print(
+        f"👥 {step['clients']:>5} clients | published {step['published_fps']:>6.1f} fps | "
+        f"fast p50 {fast.get('fps_p50', '-'):>6} fps | e2e p99 {e2e['p99_ms']} ms | "
+        f"dropped {step['frames_dropped']:>6} | server CPU {step['server_cpu_percent']}%"
+    )
+
+
+# ============================================================================
+# Runner
+# ============================================================================
+
+async def run_load(
+    base_url: str,
+    ws_path: str,
+    camera_id: Optional[str],
+    steps: List[int],
+    mix: Dict[str, float],
+    duration: float,
+    settle: float,
+    slow_delay: float,
+    threshold: float,
+    cpu_seconds,
+    connect_batch: int = 50
+) -> Dict[str, Any]:
+    loop = asyncio.get_running_loop()
+    ws_url = base_url.replace("http://", "ws://").replace("https://", "wss://") + ws_path
+    profiles = assign_profiles(max(steps), mix)
+
+    stop = asyncio.Event()
+    viewers: List[ViewerStats] = []
+    tasks: List[asyncio.Task] = []
+    results = []
+    saturated_at = None
+    baseline_fps = 0.0
+
+    try:
+        for clients in steps:
+            # Ramp up in batches so connection setup does not dominate
+            while len(viewers) < clients:
+                batch = min(connect_batch, clients - len(viewers))
+                for _ in range(batch):
+                    stats = ViewerStats(profile=profiles[len(viewers)])
+                    viewers.append(stats)
+                    tasks.append(asyncio.create_task(viewer(ws_url, stats, stop, slow_delay)))
+                await asyncio.sleep(0.2)
+            await asyncio.sleep(settle)
+
+            before = camera_snapshot(
+                await loop.run_in_executor(None, fetch_json, f"{base_url}/api/cameras"), camera_id
+            )
+            cpu_start = cpu_seconds()
+            start = time.monotonic()
+            await asyncio.sleep(duration)
+            end = time.monotonic()
+            cpu_end = cpu_seconds()
+            after = camera_snapshot(
+                await loop.run_in_executor(None, fetch_json, f"{base_url}/api/cameras"), camera_id
+            )
+
+            step = summarize_step(
+                clients, end - start, viewers, (start, end), before, after, (cpu_start, cpu_end)
+            )
+            if not results:
+                baseline_fps = step["published_fps"]
+            step["saturated"] = is_saturated(step, baseline_fps, threshold)
+            if step["saturated"] and saturated_at is None:
+                saturated_at = clients
+            results.append(step)
+            print_step(step)
+    finally:
+        stop.set()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    errors: Dict[str, int] = {}
+    for stats in viewers:
+        if stats.error:
+            errors[stats.error] = errors.get(stats.error, 0) + 1
+
+    return {"steps": results, "saturated_at": saturated_at, "client_errors": errors}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="WebSocket viewer load test")
+    parser.add_argument("--url", default=None,
+                        help="Running server, e.g. http://127.0.0.1:8000 (default: start one here)")
+    parser.add_argument("--spawn", action="store_true",
+                        help="Start the server as a subprocess instead of in this process")
+    parser.add_argument("--server-pid", type=int, default=None,
+                        help="PID of the --url server, to measure its CPU")
+    parser.add_argument("--path", default="/ws/stream", help="WebSocket endpoint path")
+    parser.add_argument("--camera", default=None, help="Camera id the endpoint streams")
+    parser.add_argument("--video", default=None, help="Video file (default: synthetic)")
+    parser.add_argument("--resolution", default="640x480")
+    parser.add_argument("--fps", type=int, default=30)
+    parser.add_argument("--boxes", type=int, default=0, help="Stub detections per frame")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--steps", default="10,50,100,200,400",
+                        help="Comma-separated concurrent viewer counts")
+    parser.add_argument("--mix", default="fast=0.8,slow=0.15,stalled=0.05")
+    parser.add_argument("--slow-delay", type=float, default=0.2,
+                        help="Seconds a slow viewer waits between frames")
+    parser.add_argument("--duration", type=float, default=10.0, help="Measured seconds per step")
+    parser.add_argument("--settle", type=float, default=2.0, help="Seconds before measuring a step")
+    parser.add_argument("--threshold", type=float, default=0.9,
+                        help="Delivery ratio below which a step counts as saturated")
+    parser.add_argument("--output", default=None, help="Write the JSON report here")
+    parser.add_argument("--serve", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.serve:
+        serve(args.serve, args.boxes)
+        return 0
+
+    steps = sorted(int(value) for value in args.steps.split(",") if value)
+    mix = parse_mix(args.mix)
+    width, height = parse_resolution(args.resolution)
+
+    with tempfile.TemporaryDirectory(prefix="wsload_") as tmp:
+        server = None
+        if args.url:
+            base_url = args.url.rstrip("/")
+            cpu_seconds = (
+                functools.partial(process_cpu_seconds, args.server_pid)
+                if args.server_pid else lambda: None
+            )
+            mode = "external"
+        else:
+            video = args.video or str(write_synthetic_video(
+                Path(tmp) / "synthetic.avi", width, height, frames=120, fps=args.fps
+            ))
+            config_path = write_server_config(
+                Path(tmp) / "config.yaml", video, width, height, args.fps,
+                args.port, str(Path(tmp) / "evidence")
+            )
+            server_cls = SubprocessServer if args.spawn else InProcessServer
+            server = server_cls(str(config_path), args.boxes)
+            server.start()
+            base_url = f"http://127.0.0.1:{args.port}"
+            cpu_seconds = server.cpu_seconds
+            mode = "subprocess" if args.spawn else "inprocess"
+
+        try:
+            asyncio.run(wait_for_server(base_url))
+            print(f"🚦 Load testing {base_url}{args.path} ({mode}) with steps {steps}")
+            result = asyncio.run(run_load(
+                base_url, args.path, args.camera, steps, mix,
+                duration=args.duration, settle=args.settle,
+                slow_delay=args.slow_delay, threshold=args.threshold,
+                cpu_seconds=cpu_seconds
+            ))
+        finally:
+            if server:
+                server.stop()
+
+    if result["saturated_at"] is not None:
+        print(f"\n📈 Saturated at {result['saturated_at']} concurrent viewers")
+    else:
+        print(f"\n📈 Not saturated up to {steps[-1]} concurrent viewers")
+
+    report = {
+        "benchmark": "websocket_load",
+        "environment": environment(),
+        "server": {"mode": mode, "url": base_url, "path": args.path},
+        "settings": {
+            "steps": steps, "mix": mix, "slow_delay": args.slow_delay,
+            "duration": args.duration, "threshold": args.threshold,
+            "video": args.video or "synthetic", "resolution": args.resolution,
+            "fps": args.fps, "boxes": args.boxes
+        },
+        **result
+    }
+    write_report(report, args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -12,6 +12,29 @@ class DetectionConfig(BaseModel):
     model_path: str = "models/yolov8n.pt"
     confidence_threshold: float = 0.70
     classes: List[str] = ["gun", "knife", "rifle", "pistol"]
+    backend: str = "ultralytics"  # "ultralytics" (PyTorch) or "onnx" (ONNX Runtime)
+    input_size: int = 640
+    onnx_providers: List[str] = ["CPUExecutionProvider"]
+    onnx_threads: int = 0
+    batch_inference: bool = True
+    batch_max_size: int = 8
+    batch_deadline_ms: float = 15.0
+    adaptive_scheduling: bool = True
+    inference_cpu_budget: float = 1.0  # CPU cores' worth of inference per second
+    max_inference_interval: int = 10  # Infer at least every N frames
+    active_hold_seconds: float = 3.0  # Full-rate inference after a detection
+    tracking: bool = True  # One event per tracked object instead of per frame
+    track_iou_threshold: float = 0.3
+    track_max_missed: int = 3  # Inference frames a track survives unmatched
+    track_min_hits: int = 1  # Matches before a track is reported
+    track_max_coast_seconds: float = 2.0
+    event_cooldown_seconds: float = 5.0  # Per class and object/region
+    event_region_iou: float = 0.3
+    process_mode: str = "inprocess"  # "inprocess" or "multiprocess"
+    inference_workers: int = 2  # Worker processes in multiprocess mode
+    shm_ring_slots: int = 8  # Shared-memory frames per camera
+    inference_threads: int = 1  # Concurrent in-process detector calls
+    render_threads: int = 2  # Annotation / JPEG encoding threads
 
 
 class VideoConfig(BaseModel):
@@ -19,6 +42,22 @@ class VideoConfig(BaseModel):
     frame_width: int = 640
     frame_height: int = 480
     fps: int = 30
+    motion_gate: bool = True
+    motion_threshold: float = 0.002
+    motion_force_interval: float = 2.0
+
+
+class CameraConfig(BaseModel):
+    id: str
+    name: str = ""
+    source: str | int = 0
+    frame_width: int = 640
+    frame_height: int = 480
+    fps: int = 30
+    enabled: bool = True
+    motion_gate: bool = True
+    motion_threshold: float = 0.002
+    motion_force_interval: float = 2.0
 
 
 class SMSConfig(BaseModel):
@@ -65,6 +104,12 @@ class StorageConfig(BaseModel):
     evidence_path: str = "data/evidence"
     max_evidence_files: int = 1000
     save_annotated_frames: bool = True
+    jpeg_quality: int = 95  # Evidence JPEG quality (80 = the stream's, encoded once)
+    index_backend: str = "sqlite"  # "sqlite", "journal" or "json" (legacy metadata.json)
+    journal_fsync_interval: float = 1.0  # Max seconds between journal fsyncs
+    journal_compact_every: int = 10000  # Journal entries before a snapshot
+    reconcile_interval_seconds: float = 3600.0  # Size check against disk (0 = off)
+    reconcile_files_per_second: float = 200.0  # stat() rate limit while reconciling
 
 
 class ServerConfig(BaseModel):
@@ -76,10 +121,27 @@ class ServerConfig(BaseModel):
 class Config(BaseModel):
     detection: DetectionConfig = DetectionConfig()
     video: VideoConfig = VideoConfig()
+    cameras: List[CameraConfig] = []
     alerts: AlertsConfig = AlertsConfig()
     storage: StorageConfig = StorageConfig()
     server: ServerConfig = ServerConfig()
 
+    def get_cameras(self) -> List[CameraConfig]:
+        """Configured cameras, falling back to the single `video` source"""
+        if self.cameras:
+            return self.cameras
+        return [CameraConfig(
+            id="camera_1",
+            name="Camera 1",
+            source=self.video.source,
+            frame_width=self.video.frame_width,
+            frame_height=self.video.frame_height,
+            fps=self.video.fps,
+            motion_gate=self.video.motion_gate,
+            motion_threshold=self.video.motion_threshold,
+            motion_force_interval=self.video.motion_force_interval
+        )]
+
 
 def load_config(config_path: str = None) -> Config:
     """Load configuration from YAML file"""
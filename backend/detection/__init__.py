@@ -2,13 +2,49 @@
 Detection module initialization
 """
 from .detector import WeaponDetector, Detection
-from .processor import VideoProcessor, FrameData, frame_to_jpeg, frame_to_base64
+from .backends import InferenceBackend, RawDetections, create_backend
+from .processor import VideoProcessor, FrameData, MotionGate, EncodedFrame, frame_to_jpeg, frame_to_base64
+from .broadcaster import StreamBroadcaster
+from .pipeline import DetectionPipeline
+from .batching import BatchInferenceService
+from .scheduler import InferenceScheduler
+from .tracker import ObjectTracker
+from .suppression import EventSuppressor
+from .renderer import FrameRenderer
+from .buffers import FramePool, FrameBuffer
+from .executors import StageExecutors, LoopLagMonitor
+from .timing import StageLatency, EwmaFps
+from .multiprocess import SharedMemoryVideoSource, ProcessInferencePool, SharedFrameRing
+from .registry import CameraRegistry, Camera
 
 __all__ = [
     "WeaponDetector",
     "Detection", 
+    "InferenceBackend",
+    "RawDetections",
+    "create_backend",
     "VideoProcessor",
     "FrameData",
+    "MotionGate",
+    "EncodedFrame",
     "frame_to_jpeg",
-    "frame_to_base64"
+    "frame_to_base64",
+    "StreamBroadcaster",
+    "DetectionPipeline",
+    "BatchInferenceService",
+    "InferenceScheduler",
+    "ObjectTracker",
+    "EventSuppressor",
+    "FrameRenderer",
+    "FramePool",
+    "FrameBuffer",
+    "StageExecutors",
+    "LoopLagMonitor",
+    "StageLatency",
+    "EwmaFps",
+    "SharedMemoryVideoSource",
+    "ProcessInferencePool",
+    "SharedFrameRing",
+    "CameraRegistry",
+    "Camera"
 ]
@@ -0,0 +1,392 @@
+"""
+Inference Backends for the Weapon Detector
+Pluggable model runtimes that all return detections as NumPy arrays in
+original-frame pixel coordinates
+"""
+import ast
+import shutil
+from abc import ABC, abstractmethod
+import cv2
+import numpy as np
+from pathlib import Path
+from dataclasses import dataclass
+from typing import List, Dict, Optional, Tuple
+
+
+@dataclass
+class RawDetections:
+    """Model output for one frame, before weapon mapping and thresholds"""
+    boxes: np.ndarray      # (N, 4) float32, x1, y1, x2, y2 in frame pixels
+    scores: np.ndarray     # (N,) float32
+    class_ids: np.ndarray  # (N,) int64
+
+    @classmethod
+    def empty(cls) -> "RawDetections":
+        return cls(
+            boxes=np.zeros((0, 4), dtype=np.float32),
+            scores=np.zeros((0,), dtype=np.float32),
+            class_ids=np.zeros((0,), dtype=np.int64)
+        )
+
+    def __len__(self) -> int:
+        return len(self.scores)
+
+
+class InferenceBackend(ABC):
+    """Base class for detector runtimes"""
+
+    name = "base"
+
+    def __init__(self, model_path: str):
+        self.model_path = model_path
+        self.names: Dict[int, str] = {}
+
+    @abstractmethod
+    def load(self):
+        """Load the model; raises on failure"""
+
+    @abstractmethod
+    def predict(self, frames: List[np.ndarray]) -> List[RawDetections]:
+        """Run inference on BGR frames, one RawDetections per frame"""
+
+
+# ============================================================================
+# Ultralytics (PyTorch)
+# ============================================================================
+
+class UltralyticsBackend(InferenceBackend):
+    """Runs the model through ultralytics.YOLO on PyTorch"""
+
+    name = "ultralytics"
+
+    def __init__(self, model_path: str, **_):
+        super().__init__(model_path)
+        self.model = None
+
+    def load(self):
+        from ultralytics import YOLO
+
+        model_file = Path(self.model_path)
+
+        if model_file.exists():
+            # Load custom trained model
+            self.model = YOLO(str(model_file))
+            print(f"✅ Loaded custom model from {self.model_path}")
+        else:
+            # Use pre-trained YOLOv8 model (will detect general objects)
+            # For weapon detection, you'd train on weapon dataset
+            self.model = YOLO("yolov8n.pt")
+            print("⚠️ Custom model not found, using pre-trained YOLOv8n")
+            print("   For weapon detection, train on a weapon dataset")
+
+        self.names = dict(self.model.names)
+
+    def predict(self, frames: List[np.ndarray]) -> List[RawDetections]:
+        # A list input is batched by ultralytics
+        results = self.model(list(frames), verbose=False)
+
+        outputs = []
+        for result in results:
+            boxes = result.boxes
+            if boxes is None or len(boxes) == 0:
+                outputs.append(RawDetections.empty())
+                continue
+            # One device→host copy per tensor for the whole frame
+            outputs.append(RawDetections(
+                boxes=boxes.xyxy.cpu().numpy().astype(np.float32, copy=False),
+                scores=boxes.conf.cpu().numpy().astype(np.float32, copy=False),
+                class_ids=boxes.cls.cpu().numpy().astype(np.int64)
+            ))
+        return outputs
+
+
+# ============================================================================
+# ONNX Runtime (CPU / OpenVINO execution providers)
+# ============================================================================
+
+def letterbox(
+    frame: np.ndarray,
+    new_size: int = 640,
+    color: Tuple[int, int, int] = (114, 114, 114)
+) -> Tuple[np.ndarray, float, Tuple[float, float]]:
+    """
+    Resize keeping aspect ratio and pad to a square input
+
+    Returns:
+        (padded image, scale ratio, (pad_left, pad_top))
+    """
+    height, width = frame.shape[:2]
+    ratio = min(new_size / height, new_size / width)
+    new_w, new_h = int(round(width * ratio)), int(round(height * ratio))
+
+    pad_w = (new_size - new_w) / 2
+    pad_h = (new_size - new_h) / 2
+
+    if (new_w, new_h) != (width, height):
+        frame = cv2.resize(frame, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+
+    top, bottom = int(round(pad_h - 0.1)), int(round(pad_h + 0.1))
+    left, right = int(round(pad_w - 0.1)), int(round(pad_w + 0.1))
+    padded = cv2.copyMakeBorder(
+        frame, top, bottom, left, right, cv2.BORDER_CONSTANT, value=color
+    )
+    return padded, ratio, (left, top)
+
+
+def preprocess(frames: List[np.ndarray], input_size: int = 640):
+    """
+    Letterbox BGR frames into a normalized NCHW float32 RGB batch
+
+    Returns:
+        (batch tensor, list of (ratio, (pad_left, pad_top)) per frame)
+    """
+    batch = np.empty((len(frames), 3, input_size, input_size), dtype=np.float32)
+    transforms = []
+
+    for i, frame in enumerate(frames):
+        padded, ratio, pad = letterbox(frame, input_size)
+        # BGR→RGB and HWC→CHW in one strided copy, then scale to [0, 1]
+        np.multiply(padded[:, :, ::-1].transpose(2, 0, 1), 1.0 / 255.0, out=batch[i])
+        transforms.append((ratio, pad))
+
+    return batch, transforms
+
+
+def box_iou(boxes_a: np.ndarray, boxes_b: np.ndarray) -> np.ndarray:
+    """Pairwise IoU matrix (len(a), len(b)) for x1, y1, x2, y2 boxes"""
+    boxes_a = np.asarray(boxes_a, dtype=np.float32).reshape(-1, 4)
+    boxes_b = np.asarray(boxes_b, dtype=np.float32).reshape(-1, 4)
+
+    top_left = np.maximum(boxes_a[:, None, :2], boxes_b[None, :, :2])
+    bottom_right = np.minimum(boxes_a[:, None, 2:], boxes_b[None, :, 2:])
+    inter = np.clip(bottom_right - top_left, 0, None).prod(axis=2)
+
+    area_a = np.clip(boxes_a[:, 2:] - boxes_a[:, :2], 0, None).prod(axis=1)
+    area_b = np.clip(boxes_b[:, 2:] - boxes_b[:, :2], 0, None).prod(axis=1)
+    return inter / (area_a[:, None] + area_b[None, :] - inter + 1e-9)
+
+
+def nms(boxes: np.ndarray, scores: np.ndarray, iou_threshold: float) -> np.ndarray:
+    """
+    Greedy non-maximum suppression with vectorized IoU
+
+    Returns:
+        Indices of kept boxes, highest score first
+    """
+    if len(boxes) == 0:
+        return np.zeros((0,), dtype=np.int64)
+
+    x1, y1, x2, y2 = boxes[:, 0], boxes[:, 1], boxes[:, 2], boxes[:, 3]
+    areas = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    order = scores.argsort()[::-1]
+
+    keep = []
+    while order.size > 0:
+        i = order[0]
+        keep.append(i)
+        rest = order[1:]
+
+        inter_w = np.clip(np.minimum(x2[i], x2[rest]) - np.maximum(x1[i], x1[rest]), 0, None)
+        inter_h = np.clip(np.minimum(y2[i], y2[rest]) - np.maximum(y1[i], y1[rest]), 0, None)
+        inter = inter_w * inter_h
+        iou = inter / (areas[i] + areas[rest] - inter + 1e-9)
+
+        order = rest[iou <= iou_threshold]
+
+    return np.asarray(keep, dtype=np.int64)
+
+
+def batched_nms(
+    boxes: np.ndarray,
+    scores: np.ndarray,
+    class_ids: np.ndarray,
+    iou_threshold: float
+) -> np.ndarray:
+    """Per-class NMS by offsetting each class into its own coordinate range"""
+    if len(boxes) == 0:
+        return np.zeros((0,), dtype=np.int64)
+    offsets = class_ids.astype(np.float32)[:, None] * (boxes.max() + 1.0)
+    return nms(boxes + offsets, scores, iou_threshold)
+
+
+class OnnxRuntimeBackend(InferenceBackend):
+    """
+    Runs an exported YOLOv8 ONNX model through ONNX Runtime.
+
+    Loads ``model_path`` if it is an ``.onnx`` file, otherwise the ``.onnx``
+    file next to it, exporting it with ultralytics once if missing. Torch is
+    only needed for that one-time export.
+    """
+
+    name = "onnx"
+
+    def __init__(
+        self,
+        model_path: str,
+        input_size: int = 640,
+        providers: Optional[List[str]] = None,
+        num_threads: int = 0,
+        conf_threshold: float = 0.25,
+        iou_threshold: float = 0.7,
+        max_detections: int = 300,
+        **_
+    ):
+        """
+        Initialize the ONNX Runtime backend
+
+        Args:
+            model_path: .onnx model, or .pt weights to export next to
+            input_size: Square network input size
+            providers: ONNX Runtime execution providers, in priority order
+            num_threads: Intra-op threads (0 lets ONNX Runtime decide)
+            conf_threshold: Pre-NMS score threshold
+            iou_threshold: NMS IoU threshold
+            max_detections: Maximum boxes kept per frame
+        """
+        super().__init__(model_path)
+        self.input_size = input_size
+        self.providers = providers or ["CPUExecutionProvider"]
+        self.num_threads = num_threads
+        self.conf_threshold = conf_threshold
+        self.iou_threshold = iou_threshold
+        self.max_detections = max_detections
+
+        self.session = None
+        self.onnx_path: Optional[Path] = None
+        self._input_name = ""
+        self._fixed_batch: Optional[int] = None
+
+    def _resolve_onnx_path(self) -> Path:
+        """Find the .onnx model, exporting it from the .pt weights if needed"""
+        model_file = Path(self.model_path)
+        onnx_file = model_file if model_file.suffix == ".onnx" else model_file.with_suffix(".onnx")
+
+        if onnx_file.exists():
+            return onnx_file
+
+        weights = str(model_file) if model_file.exists() else "yolov8n.pt"
+        print(f"📦 Exporting {weights} to ONNX (one-time)...")
+
+        from ultralytics import YOLO
+        exported = Path(YOLO(weights).export(
+            format="onnx", imgsz=self.input_size, dynamic=True
+        ))
+
+        if exported.resolve() != onnx_file.resolve():
+            onnx_file.parent.mkdir(parents=True, exist_ok=True)
+            shutil.move(str(exported), str(onnx_file))
+        return onnx_file
+
+    def load(self):
+        import onnxruntime as ort
+
+        self.onnx_path = self._resolve_onnx_path()
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if self.num_threads:
+            options.intra_op_num_threads = self.num_threads
+
+        available = set(ort.get_available_providers())
+        providers = [p for p in self.providers if p in available] or ["CPUExecutionProvider"]
+
+        self.session = ort.InferenceSession(
+            str(self.onnx_path), sess_options=options, providers=providers
+        )
+
+        model_input = self.session.get_inputs()[0]
+        self._input_name = model_input.name
+        batch_dim = model_input.shape[0]
+        self._fixed_batch = batch_dim if isinstance(batch_dim, int) else None
+
+        # Ultralytics stores class names as a dict literal in the metadata
+        metadata = self.session.get_modelmeta().custom_metadata_map
+        try:
+            self.names = {int(k): v for k, v in ast.literal_eval(metadata["names"]).items()}
+        except (KeyError, ValueError, SyntaxError):
+            self.names = {}
+
+        print(f"✅ Loaded ONNX model from {self.onnx_path} ({', '.join(providers)})")
+
+    def predict(self, frames: List[np.ndarray]) -> List[RawDetections]:
+        size = self._fixed_batch
+        if size and len(frames) > size:
+            # Model was exported with a static batch: run it chunk by chunk
+            return [
+                result
+                for start in range(0, len(frames), size)
+                for result in self.predict(frames[start:start + size])
+            ]
+
+        batch, transforms = preprocess(frames, self.input_size)
+        if size and len(frames) < size:
+            # Fill the static batch with blank images and ignore their output
+            blank = np.zeros((size - len(frames),) + batch.shape[1:], dtype=batch.dtype)
+            batch = np.concatenate([batch, blank])
+        output = self.session.run(None, {self._input_name: batch})[0]
+
+        return [
+            self._postprocess(prediction, transform, frame.shape[:2])
+            for prediction, transform, frame in zip(output, transforms, frames)
+        ]
+
+    def _postprocess(
+        self,
+        prediction: np.ndarray,
+        transform: Tuple[float, Tuple[int, int]],
+        frame_shape: Tuple[int, int]
+    ) -> RawDetections:
+        """Decode one (4 + num_classes, anchors) YOLOv8 output"""
+        prediction = prediction.T
+        class_scores = prediction[:, 4:]
+
+        class_ids = class_scores.argmax(axis=1)
+        scores = class_scores[np.arange(len(class_ids)), class_ids]
+
+        mask = scores > self.conf_threshold
+        if not mask.any():
+            return RawDetections.empty()
+
+        xywh = prediction[mask, :4]
+        scores = scores[mask].astype(np.float32, copy=False)
+        class_ids = class_ids[mask].astype(np.int64, copy=False)
+
+        boxes = np.empty_like(xywh, dtype=np.float32)
+        boxes[:, :2] = xywh[:, :2] - xywh[:, 2:] / 2
+        boxes[:, 2:] = xywh[:, :2] + xywh[:, 2:] / 2
+
+        keep = batched_nms(boxes, scores, class_ids, self.iou_threshold)[:self.max_detections]
+        boxes, scores, class_ids = boxes[keep], scores[keep], class_ids[keep]
+
+        # Undo letterbox
+        ratio, (pad_left, pad_top) = transform
+        boxes[:, [0, 2]] -= pad_left
+        boxes[:, [1, 3]] -= pad_top
+        boxes /= ratio
+
+        height, width = frame_shape
+        boxes[:, [0, 2]] = boxes[:, [0, 2]].clip(0, width)
+        boxes[:, [1, 3]] = boxes[:, [1, 3]].clip(0, height)
+
+        return RawDetections(boxes=boxes, scores=scores, class_ids=class_ids)
+
+
+BACKENDS = {
+    UltralyticsBackend.name: UltralyticsBackend,
+    OnnxRuntimeBackend.name: OnnxRuntimeBackend,
+}
+
+
+def backend_class(name: str) -> type:
+    """Backend class registered under a config name"""
+    try:
+        return BACKENDS[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown detection backend '{name}', expected one of: {', '.join(BACKENDS)}"
+        )
+
+
+def create_backend(name: str, model_path: str, **options) -> InferenceBackend:
+    """Instantiate a backend by config name ("ultralytics" or "onnx")"""
+    return backend_class(name)(model_path, **options)
@@ -0,0 +1,216 @@
+"""
+Cross-Camera Batched Inference
+Collects frames from every camera pipeline and runs them through the
+detector in a single forward pass
+"""
+import time
+import asyncio
+import numpy as np
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Optional, List, Dict, Any, Set
+
+from .detector import WeaponDetector, Detection
+from .executors import StageExecutors
+
+
+@dataclass
+class _InferenceRequest:
+    frame: np.ndarray
+    camera_id: Optional[str]
+    future: asyncio.Future
+    submitted_at: float = field(default_factory=time.perf_counter)
+
+
+class BatchInferenceService:
+    """
+    Batches detection requests across cameras.
+
+    A batch is flushed when it reaches ``max_batch_size``, when every
+    registered camera has a frame waiting, or when ``max_wait_ms`` has passed
+    since the first frame of the batch arrived.
+    """
+
+    def __init__(
+        self,
+        detector: WeaponDetector,
+        max_batch_size: int = 8,
+        max_wait_ms: float = 15.0,
+        executors: Optional[StageExecutors] = None
+    ):
+        """
+        Initialize the batching service
+
+        Args:
+            detector: Weapon detector used for batched forward passes
+            max_batch_size: Maximum frames per forward pass
+            max_wait_ms: Longest time the first frame of a batch may wait
+            executors: Thread pools; forward passes run on the "inference"
+                pool (the loop's default executor if None)
+        """
+        self.detector = detector
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_ms = max(0.0, max_wait_ms)
+        self.executors = executors
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._sources: Set[str] = set()
+        self._batch: List[_InferenceRequest] = []
+
+        # Metrics
+        self.batches_run = 0
+        self.frames_inferred = 0
+        self.total_wait_ms = 0.0
+        self.total_inference_ms = 0.0
+        self.batch_sizes: Counter = Counter()
+        self.flush_reasons: Counter = Counter()
+        self._started_at: Optional[float] = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def register_source(self, camera_id: str):
+        """Announce a camera that will submit frames"""
+        self._sources.add(camera_id)
+
+    def unregister_source(self, camera_id: str):
+        """Forget a camera that stopped submitting frames"""
+        self._sources.discard(camera_id)
+
+    def start(self):
+        """Start the batching task"""
+        if self.is_running:
+            return
+        self._queue = asyncio.Queue()
+        self._started_at = time.perf_counter()
+        self._task = asyncio.create_task(self._run())
+        print(f"🧮 Batched inference started (batch ≤ {self.max_batch_size}, "
+              f"deadline {self.max_wait_ms:.0f} ms)")
+
+    async def stop(self):
+        """Stop the batching task; pending requests get no detections"""
+        task, self._task = self._task, None
+        if task and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+        pending, self._batch = self._batch, []
+        if self._queue:
+            while not self._queue.empty():
+                pending.append(self._queue.get_nowait())
+        for request in pending:
+            if not request.future.done():
+                request.future.set_result([])
+
+    async def detect(
+        self,
+        frame: np.ndarray,
+        camera_id: Optional[str] = None,
+        ref: Optional[Any] = None
+    ) -> List[Detection]:
+        """
+        Queue a frame for the next batch and wait for its detections
+
+        `ref` (a shared-memory frame location) is only used by the
+        multi-process pool; frames are read directly here.
+        """
+        if not self.is_running:
+            self.start()
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put(_InferenceRequest(frame, camera_id, future))
+        return await future
+
+    async def _collect_batch(self) -> List[_InferenceRequest]:
+        """Wait for the first request, then gather more until a flush condition"""
+        batch = self._batch = [await self._queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_wait_ms / 1000.0
+
+        while len(batch) < self.max_batch_size:
+            # Every active camera already has a frame in this batch
+            if self._sources and len(batch) >= len(self._sources):
+                self.flush_reasons["all_sources"] += 1
+                return batch
+
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                self.flush_reasons["deadline"] += 1
+                return batch
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                self.flush_reasons["deadline"] += 1
+                return batch
+
+        self.flush_reasons["max_batch_size"] += 1
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect_batch()
+            started = time.perf_counter()
+
+            frames = [request.frame for request in batch]
+            camera_ids = [request.camera_id for request in batch]
+            try:
+                # The forward pass runs off the event loop
+                if self.executors:
+                    results = await self.executors.run(
+                        "inference", self.detector.detect_batch, frames, camera_ids
+                    )
+                else:
+                    results = await asyncio.get_running_loop().run_in_executor(
+                        None, self.detector.detect_batch, frames, camera_ids
+                    )
+            except Exception as e:
+                print(f"❌ Batched inference failed: {e}")
+                results = [[] for _ in batch]
+
+            finished = time.perf_counter()
+            self._record_batch(batch, started, finished)
+
+            for request, detections in zip(batch, results):
+                if not request.future.done():
+                    request.future.set_result(detections)
+            self._batch = []
+
+    def _record_batch(self, batch: List[_InferenceRequest], started: float, finished: float):
+        self.batches_run += 1
+        self.frames_inferred += len(batch)
+        self.batch_sizes[len(batch)] += 1
+        self.total_inference_ms += (finished - started) * 1000.0
+        self.total_wait_ms += sum(
+            (started - request.submitted_at) * 1000.0 for request in batch
+        )
+
+    def get_status(self) -> Dict[str, Any]:
+        """Batch size / deadline trade-off metrics"""
+        batches = max(self.batches_run, 1)
+        frames = max(self.frames_inferred, 1)
+        elapsed = time.perf_counter() - self._started_at if self._started_at else 0.0
+
+        return {
+            "is_running": self.is_running,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_ms,
+            "sources": len(self._sources),
+            "batches_run": self.batches_run,
+            "frames_inferred": self.frames_inferred,
+            "avg_batch_size": round(self.frames_inferred / batches, 2),
+            "avg_queue_wait_ms": round(self.total_wait_ms / frames, 2),
+            "avg_batch_latency_ms": round(self.total_inference_ms / batches, 2),
+            "avg_frame_latency_ms": round(self.total_inference_ms / frames, 2),
+            "inference_fps": round(self.frames_inferred / elapsed, 1) if elapsed > 0 else 0.0,
+            "batch_size_histogram": {str(size): count for size, count in sorted(self.batch_sizes.items())},
+            "flush_reasons": dict(self.flush_reasons)
+        }
@@ -0,0 +1,238 @@
+"""
+Stream Broadcaster
+Fans out encoded frames and detection events to every connected viewer
+"""
+import asyncio
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from .timing import StageLatency
+
+
+class ClientChannel:
+    """
+    Per-viewer send queue drained by its own task.
+
+    Frames go into a small bounded queue where the oldest frame is replaced
+    by the newest one, so a slow viewer only ever sees stale frames skipped.
+    Detection events are never dropped; a client that cannot keep up with
+    events is disconnected instead. When the channel ends on its own (too
+    many pending events, failed send) it closes the socket, so the endpoint
+    handler leaves its receive loop and unsubscribes the client.
+    """
+
+    # WebSocket close codes
+    POLICY_VIOLATION = 1008
+    INTERNAL_ERROR = 1011
+    CLOSE_TIMEOUT = 5.0
+
+    def __init__(
+        self,
+        client: Any,
+        client_id: int,
+        max_queued_frames: int = 1,
+        max_pending_events: int = 256,
+        latency: Optional[StageLatency] = None
+    ):
+        """
+        Initialize a client channel
+
+        Args:
+            client: WebSocket-like object with send_bytes/send_json coroutines
+            client_id: Identifier used in status reports
+            max_queued_frames: Frames buffered before the oldest is dropped
+            max_pending_events: Undelivered events before the client is dropped
+            latency: Receives send and end-to-end latency of delivered frames
+        """
+        self.client = client
+        self.client_id = client_id
+        self.max_pending_events = max_pending_events
+        self.latency = latency
+
+        self._frames: Deque[Tuple[bytes, Optional[Dict[str, float]]]] = deque(
+            maxlen=max(1, max_queued_frames)
+        )
+        self._events: Deque[Dict[str, Any]] = deque()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._close_code: Optional[int] = None  # Set when the channel drops the client
+        self.closed = False
+
+        self.frames_sent = 0
+        self.frames_dropped = 0
+        self.events_sent = 0
+
+    def start(self, on_close):
+        """Start the sender task; on_close(channel) runs when it exits"""
+        self._task = asyncio.create_task(self._sender(on_close))
+
+    def stop(self, close_code: Optional[int] = None):
+        """
+        Stop the sender task
+
+        Args:
+            close_code: Also close the socket with this code (the endpoint
+                handler is still waiting on it)
+        """
+        if close_code is not None and not self.closed:
+            self._close_code = close_code
+        self.closed = True
+        if self._task and not self._task.done():
+            self._task.cancel()
+
+    def push_frame(self, data: bytes, stamps: Optional[Dict[str, float]] = None):
+        """Queue a frame, replacing the oldest one if the queue is full"""
+        if self.closed:
+            return
+        if len(self._frames) == self._frames.maxlen:
+            self.frames_dropped += 1
+        self._frames.append((data, stamps))
+        self._wakeup.set()
+
+    def push_event(self, message: Dict[str, Any]):
+        """Queue an event; events are never dropped"""
+        if self.closed:
+            return
+        if len(self._events) >= self.max_pending_events:
+            print(f"⚠️ Client {self.client_id} is not reading events, disconnecting")
+            self.stop(close_code=self.POLICY_VIOLATION)
+            return
+        self._events.append(message)
+        self._wakeup.set()
+
+    async def _sender(self, on_close):
+        try:
+            while not self.closed:
+                await self._wakeup.wait()
+                self._wakeup.clear()
+
+                # Events first so they precede the frame they belong to
+                while self._events:
+                    await self.client.send_json(self._events.popleft())
+                    self.events_sent += 1
+
+                while self._frames:
+                    data, stamps = self._frames.popleft()
+                    await self.client.send_bytes(data)
+                    self.frames_sent += 1
+                    if self.latency is not None and stamps:
+                        self.latency.record_send(stamps)
+        except asyncio.CancelledError:
+            pass
+        except Exception:
+            # Socket is broken; closing it wakes up the endpoint handler
+            self._close_code = self._close_code or self.INTERNAL_ERROR
+        finally:
+            self.closed = True
+            on_close(self)
+            if self._close_code is not None:
+                await self._close_client(self._close_code)
+
+    async def _close_client(self, code: int):
+        try:
+            await asyncio.wait_for(self.client.close(code=code), self.CLOSE_TIMEOUT)
+        except Exception:
+            pass  # Already closed or unresponsive; the server times it out
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get per-client counters"""
+        return {
+            "id": self.client_id,
+            "frames_sent": self.frames_sent,
+            "frames_dropped": self.frames_dropped,
+            "events_sent": self.events_sent,
+            "queued_frames": len(self._frames),
+            "pending_events": len(self._events)
+        }
+
+
+class StreamBroadcaster:
+    """
+    Pushes the same payload to every subscribed WebSocket.
+
+    Publishing never waits on the network: each subscriber has its own
+    ClientChannel, so one slow viewer cannot throttle capture or detection.
+    """
+
+    def __init__(
+        self,
+        max_queued_frames: int = 1,
+        max_pending_events: int = 256,
+        latency: Optional[StageLatency] = None
+    ):
+        """
+        Initialize broadcaster
+
+        Args:
+            max_queued_frames: Per-client frame queue size
+            max_pending_events: Per-client undelivered event limit
+            latency: Camera latency histograms fed with per-client send times
+        """
+        self.max_queued_frames = max_queued_frames
+        self.max_pending_events = max_pending_events
+        self.latency = latency
+
+        self._channels: Dict[int, ClientChannel] = {}
+        self._next_id = 1
+        self.frames_published = 0
+        self.events_published = 0
+        self._closed_frames_dropped = 0  # Drops of clients that have left
+
+    @property
+    def client_count(self) -> int:
+        return len(self._channels)
+
+    def add_client(self, client: Any) -> ClientChannel:
+        """Subscribe a client to the stream"""
+        for channel in self._channels.values():
+            if channel.client is client:
+                return channel
+
+        channel = ClientChannel(
+            client,
+            client_id=self._next_id,
+            max_queued_frames=self.max_queued_frames,
+            max_pending_events=self.max_pending_events,
+            latency=self.latency
+        )
+        self._next_id += 1
+        self._channels[channel.client_id] = channel
+        channel.start(on_close=self._on_channel_closed)
+        return channel
+
+    def remove_client(self, client: Any):
+        """Unsubscribe a client (safe to call more than once)"""
+        for client_id, channel in list(self._channels.items()):
+            if channel.client is client:
+                del self._channels[client_id]
+                self._closed_frames_dropped += channel.frames_dropped
+                channel.stop()
+
+    def _on_channel_closed(self, channel: ClientChannel):
+        if self._channels.pop(channel.client_id, None) is not None:
+            self._closed_frames_dropped += channel.frames_dropped
+
+    def publish_frame(self, data: bytes, stamps: Optional[Dict[str, float]] = None):
+        """Queue a binary payload (JPEG frame) and its stage timestamps for all clients"""
+        for channel in list(self._channels.values()):
+            channel.push_frame(data, stamps)
+        self.frames_published += 1
+
+    def publish_event(self, message: Dict[str, Any]):
+        """Queue a JSON message (detection event) for all clients"""
+        for channel in list(self._channels.values()):
+            channel.push_event(message)
+        self.events_published += 1
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get broadcaster status including per-client counters"""
+        clients: List[Dict[str, Any]] = [
+            channel.get_status() for channel in self._channels.values()
+        ]
+        return {
+            "clients": self.client_count,
+            "frames_published": self.frames_published,
+            "events_published": self.events_published,
+            "frames_dropped": self._closed_frames_dropped + sum(c["frames_dropped"] for c in clients),
+            "per_client": clients
+        }
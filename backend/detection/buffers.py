@@ -0,0 +1,98 @@
+"""
+Frame Buffer Pool
+Preallocated, reference-counted frame buffers so capture and resize reuse
+memory instead of allocating a new array per frame
+"""
+import threading
+import numpy as np
+from typing import Optional, List, Tuple
+
+
+class FrameBuffer:
+    """
+    A pooled frame array with a reference count.
+
+    The buffer goes back to its pool when the last holder calls release();
+    downstream stages that keep the frame beyond the current iteration call
+    retain() first.
+    """
+
+    def __init__(self, array: np.ndarray, pool: Optional["FramePool"] = None):
+        self.array = array
+        self._pool = pool
+        self._refs = 0
+
+    def retain(self) -> "FrameBuffer":
+        """Add a reference"""
+        if self._pool is not None:
+            with self._pool._lock:
+                self._refs += 1
+        return self
+
+    def release(self):
+        """Drop a reference, recycling the buffer when none remain"""
+        if self._pool is not None:
+            self._pool._release(self)
+
+
+class FramePool:
+    """Fixed-size ring of preallocated frame buffers of one shape"""
+
+    def __init__(self, shape: Tuple[int, ...], size: int = 8, dtype=np.uint8):
+        """
+        Initialize the pool
+
+        Args:
+            shape: Frame shape, e.g. (height, width, 3)
+            size: Number of buffers to preallocate
+            dtype: Frame dtype
+        """
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.size = size
+
+        self._lock = threading.Lock()
+        self._free: List[FrameBuffer] = [
+            FrameBuffer(np.empty(self.shape, dtype=self.dtype), self)
+            for _ in range(size)
+        ]
+
+        self.acquired = 0
+        self.misses = 0  # Pool empty: fell back to a one-off allocation
+
+    def acquire(self) -> FrameBuffer:
+        """
+        Take a free buffer with one reference held by the caller.
+
+        If every buffer is in use, a one-off (unpooled) buffer is returned so
+        capture never blocks on a slow consumer.
+        """
+        with self._lock:
+            self.acquired += 1
+            if self._free:
+                buffer = self._free.pop()
+                buffer._refs = 1
+                return buffer
+            self.misses += 1
+        return FrameBuffer(np.empty(self.shape, dtype=self.dtype))
+
+    def _release(self, buffer: FrameBuffer):
+        with self._lock:
+            if buffer._refs <= 0:
+                return  # Already back in the pool
+            buffer._refs -= 1
+            if buffer._refs == 0:
+                self._free.append(buffer)
+
+    @property
+    def in_use(self) -> int:
+        return self.size - len(self._free)
+
+    def get_status(self) -> dict:
+        """Pool occupancy and fallback allocations"""
+        return {
+            "size": self.size,
+            "in_use": self.in_use,
+            "acquired": self.acquired,
+            "misses": self.misses
+        }
@@ -2,12 +2,19 @@
 YOLOv8 Weapon Detection Module
 """
 import cv2
+import time
+import threading
 import numpy as np
 from datetime import datetime
 from pathlib import Path
 from typing import List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass
-from ultralytics import YOLO
+
+from metrics import INFERENCE_SECONDS
+from .backends import InferenceBackend, RawDetections, create_backend
+
+# detect_batch runs on executor threads while metrics are lock-free
+_inference_metrics_lock = threading.Lock()
 
 
 @dataclass
@@ -18,6 +25,8 @@ class Detection:
     bbox: Tuple[int, int, int, int]  # x1, y1, x2, y2
     timestamp: datetime
     frame_id: int
+    camera_id: Optional[str] = None
+    track_id: Optional[int] = None
     
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -25,7 +34,9 @@ class Detection:
             "confidence": round(self.confidence, 3),
             "bbox": self.bbox,
             "timestamp": self.timestamp.isoformat(),
-            "frame_id": self.frame_id
+            "frame_id": self.frame_id,
+            "camera_id": self.camera_id,
+            "track_id": self.track_id
         }
 
 
@@ -40,12 +51,28 @@ class WeaponDetector:
         3: "pistol"
     }
     
+    # For demo purposes, map common objects to weapons
+    # In production, use a model trained on weapon dataset
+    WEAPON_MAPPING = {
+        "cell phone": "gun",  # Demo mapping
+        "remote": "gun",
+        "scissors": "knife",
+        "knife": "knife",
+        "baseball bat": "rifle",
+        "sports ball": "gun",  # Demo
+        "bottle": "gun",  # Demo - elongated objects
+        "umbrella": "rifle",  # Demo
+        "handbag": "gun",  # Demo  
+        "suitcase": "gun",  # Demo
+    }
+    
     def __init__(
         self,
         model_path: str = "models/yolov8n.pt",
         confidence_threshold: float = 0.70,
         target_classes: Optional[List[str]] = None,
-        detection_cooldown: int = 30  # Frames between alerts (30 frames = ~1 sec at 30fps)
+        backend: str = "ultralytics",
+        backend_options: Optional[Dict[str, Any]] = None
     ):
         """
         Initialize the weapon detector
@@ -54,128 +81,194 @@ class WeaponDetector:
             model_path: Path to YOLOv8 model weights
             confidence_threshold: Minimum confidence for detections
             target_classes: List of class names to detect
-            detection_cooldown: Frames to wait between detections of same class
+            backend: Inference runtime ("ultralytics" or "onnx")
+            backend_options: Extra keyword arguments for the backend
         """
         self.model_path = model_path
         self.confidence_threshold = confidence_threshold
         self.target_classes = target_classes or list(self.WEAPON_CLASSES.values())
-        self.model: Optional[YOLO] = None
+        self.backend_name = backend
+        self.backend_options = backend_options or {}
+        self.model: Optional[InferenceBackend] = None
+        self._class_lut = np.empty(0, dtype=np.int64)
+        self._person_lut = np.empty(0, dtype=bool)
+        self._lut_labels: List[str] = []
+        self._warned_no_names = False
         self.frame_count = 0
-        self.detection_cooldown = detection_cooldown
-        self.last_detection_frame: Dict[str, int] = {}  # Track last detection per class
+        self.avg_frame_latency = 0.0  # EWMA of inference seconds per frame
         
     def load_model(self) -> bool:
-        """Load the YOLOv8 model"""
+        """Load the YOLOv8 model through the configured backend"""
         try:
-            model_file = Path(self.model_path)
-            
-            if model_file.exists():
-                # Load custom trained model
-                self.model = YOLO(str(model_file))
-                print(f"✅ Loaded custom model from {self.model_path}")
-            else:
-                # Use pre-trained YOLOv8 model (will detect general objects)
-                # For weapon detection, you'd train on weapon dataset
-                self.model = YOLO("yolov8n.pt")
-                print("⚠️ Custom model not found, using pre-trained YOLOv8n")
-                print("   For weapon detection, train on a weapon dataset")
-                
+            backend = create_backend(
+                self.backend_name, self.model_path, **self.backend_options
+            )
+            backend.load()
+            self.model = backend
+            self._build_class_lut(backend.names)
             return True
             
         except Exception as e:
             print(f"❌ Error loading model: {e}")
             return False
     
-    def detect(self, frame: np.ndarray) -> List[Detection]:
+    def detect(self, frame: np.ndarray, camera_id: Optional[str] = None) -> List[Detection]:
         """
         Detect weapons in a frame
         
         Args:
             frame: BGR image as numpy array
+            camera_id: Camera the frame came from
             
         Returns:
             List of Detection objects
         """
+        return self.detect_batch([frame], [camera_id])[0]
+    
+    def detect_batch(
+        self,
+        frames: List[np.ndarray],
+        camera_ids: Optional[List[Optional[str]]] = None
+    ) -> List[List[Detection]]:
+        """
+        Detect weapons in several frames with a single batched forward pass
+        
+        Args:
+            frames: BGR images as numpy arrays
+            camera_ids: Camera of each frame (same order as frames)
+            
+        Returns:
+            List of Detection lists, one per frame
+        """
+        if not frames:
+            return []
+        
         if self.model is None:
             if not self.load_model():
-                return []
+                return [[] for _ in frames]
         
-        self.frame_count += 1
-        detections = []
+        camera_ids = camera_ids or [None] * len(frames)
         
         # Run inference
-        results = self.model(frame, verbose=False)
+        started = time.perf_counter()
+        results = self.model.predict(list(frames))
+        elapsed = time.perf_counter() - started
+        self.record_inference(elapsed, len(frames))
+        return self.parse_results(results, camera_ids, elapsed / len(frames))
+    
+    def parse_results(
+        self,
+        results: List[RawDetections],
+        camera_ids: List[Optional[str]],
+        seconds_per_frame: Optional[float] = None
+    ) -> List[List[Detection]]:
+        """
+        Turn raw model output into detections
+        
+        Used directly when inference runs elsewhere (e.g. worker processes)
         
-        for result in results:
-            boxes = result.boxes
+        Args:
+            results: Raw output per frame
+            camera_ids: Camera of each frame
+            seconds_per_frame: Measured inference time, fed to the latency average
             
-            if boxes is None:
-                continue
-                
-            for box in boxes:
-                confidence = float(box.conf[0])
-                
-                # Check confidence threshold
-                if confidence < self.confidence_threshold:
-                    continue
-                
-                class_id = int(box.cls[0])
-                class_name = result.names.get(class_id, "unknown")
-                
-                # For demo purposes, map common objects to weapons
-                # In production, use a model trained on weapon dataset
-                weapon_mapping = {
-                    "cell phone": "gun",  # Demo mapping
-                    "remote": "gun",
-                    "scissors": "knife",
-                    "knife": "knife",
-                    "baseball bat": "rifle",
-                    "sports ball": "gun",  # Demo
-                    "bottle": "gun",  # Demo - elongated objects
-                    "umbrella": "rifle",  # Demo
-                    "handbag": "gun",  # Demo  
-                    "suitcase": "gun",  # Demo
-                }
-                
-                # Also detect persons - useful for surveillance
-                # In a real system, you'd combine person + weapon detection
-                person_alert = False
-                if class_name == "person" and confidence > 0.5:
-                    # Flag any high-confidence person detection
-                    person_alert = True
-                
-                # Check if it's a known weapon or mapped class
-                if class_name in self.target_classes:
-                    detected_class = class_name
-                elif class_name in weapon_mapping:
-                    detected_class = weapon_mapping[class_name]
-                elif person_alert:
-                    detected_class = "person_detected"
-                else:
-                    continue
-                
-                # Get bounding box coordinates
-                x1, y1, x2, y2 = map(int, box.xyxy[0])
-                
-                detection = Detection(
-                    class_name=detected_class,
-                    confidence=confidence,
-                    bbox=(x1, y1, x2, y2),
-                    timestamp=datetime.now(),
-                    frame_id=self.frame_count
-                )
-                detections.append(detection)
+        Returns:
+            List of Detection lists, one per frame
+        """
+        if seconds_per_frame is not None:
+            self._record_latency(seconds_per_frame)
+        return [
+            self._parse_result(result, camera_id)
+            for result, camera_id in zip(results, camera_ids)
+        ]
+    
+    def set_class_names(self, names: Dict[int, str]):
+        """Use the class names of a model loaded out of process"""
+        self._build_class_lut(names)
+    
+    def record_inference(self, seconds: float, batch_size: int):
+        """Observe one forward pass in the inference latency histogram"""
+        with _inference_metrics_lock:
+            INFERENCE_SECONDS.labels(self.backend_name, str(batch_size)).observe(seconds)
+    
+    def _record_latency(self, seconds_per_frame: float, alpha: float = 0.2):
+        """Update the per-frame inference latency average"""
+        if self.avg_frame_latency <= 0:
+            self.avg_frame_latency = seconds_per_frame
+        else:
+            self.avg_frame_latency += alpha * (seconds_per_frame - self.avg_frame_latency)
+    
+    def _build_class_lut(self, names: Dict[int, str]):
+        """
+        Precompute, per model class id, the reported class (index into
+        self._lut_labels, -1 to ignore) and whether it is a person
+        """
+        if not names and not self._warned_no_names:
+            self._warned_no_names = True
+            print("⚠️ Model has no class names; no detections will be reported")
+        
+        size = max(names, default=-1) + 1
+        self._lut_labels = []
+        self._class_lut = np.full(size, -1, dtype=np.int64)
+        self._person_lut = np.zeros(size, dtype=bool)
         
-        # Apply cooldown at batch level - only return detections if cooldown expired
-        if detections:
-            last_alert_frame = self.last_detection_frame.get("_any_", 0)
-            if self.frame_count - last_alert_frame >= self.detection_cooldown:
-                self.last_detection_frame["_any_"] = self.frame_count
-                return detections  # Return all detections
+        for class_id, class_name in names.items():
+            # Known weapon, mapped class, or person (surveillance context)
+            if class_name in self.target_classes:
+                label = class_name
+            elif class_name in self.WEAPON_MAPPING:
+                label = self.WEAPON_MAPPING[class_name]
+            elif class_name == "person":
+                label = "person_detected"
+                self._person_lut[class_id] = True
             else:
-                return []  # In cooldown, return empty
+                continue
+            
+            if label not in self._lut_labels:
+                self._lut_labels.append(label)
+            self._class_lut[class_id] = self._lut_labels.index(label)
+    
+    def _parse_result(self, result: RawDetections, camera_id: Optional[str]) -> List[Detection]:
+        """Convert one frame's model output into weapon detections"""
+        self.frame_count += 1
+        
+        if not len(result) or not len(self._class_lut):
+            return []
+        
+        class_ids = result.class_ids
+        scores = result.scores
         
-        return detections
+        # Unknown class ids (outside the model's names) are ignored; only
+        # in-range ids are used as indices
+        in_range = class_ids < len(self._class_lut)
+        labels = np.full(len(class_ids), -1, dtype=np.int64)
+        labels[in_range] = self._class_lut[class_ids[in_range]]
+        is_person = np.zeros(len(class_ids), dtype=bool)
+        is_person[in_range] = self._person_lut[class_ids[in_range]]
+        
+        keep = (labels >= 0) & (scores >= self.confidence_threshold)
+        # Persons are only flagged at high confidence
+        keep &= ~is_person | (scores > 0.5)
+        
+        if not keep.any():
+            return []
+        
+        boxes = result.boxes[keep].astype(np.int64).tolist()
+        timestamp = datetime.now()
+        
+        return [
+            Detection(
+                class_name=self._lut_labels[label],
+                confidence=confidence,
+                bbox=tuple(box),
+                timestamp=timestamp,
+                frame_id=self.frame_count,
+                camera_id=camera_id
+            )
+            for box, confidence, label in zip(
+                boxes, scores[keep].tolist(), labels[keep].tolist()
+            )
+        ]
     
     def annotate_frame(
         self,
@@ -194,69 +287,10 @@ class WeaponDetector:
         Returns:
             Annotated frame
         """
-        annotated = frame.copy()
-        
-        # Color scheme for different weapons
-        colors = {
-            "gun": (0, 0, 255),      # Red
-            "knife": (0, 165, 255),   # Orange
-            "rifle": (0, 0, 200),     # Dark Red
-            "pistol": (0, 100, 255),  # Red-Orange
-        }
-        
-        for det in detections:
-            x1, y1, x2, y2 = det.bbox
-            color = colors.get(det.class_name, (0, 255, 0))
-            
-            # Draw bounding box
-            cv2.rectangle(annotated, (x1, y1), (x2, y2), color, 3)
-            
-            # Prepare label
-            label = f"⚠️ {det.class_name.upper()}"
-            if show_confidence:
-                label += f" {det.confidence:.1%}"
-            
-            # Draw label background
-            (label_w, label_h), _ = cv2.getTextSize(
-                label, cv2.FONT_HERSHEY_SIMPLEX, 0.7, 2
-            )
-            cv2.rectangle(
-                annotated,
-                (x1, y1 - label_h - 10),
-                (x1 + label_w + 10, y1),
-                color,
-                -1
-            )
-            
-            # Draw label text
-            cv2.putText(
-                annotated,
-                label,
-                (x1 + 5, y1 - 5),
-                cv2.FONT_HERSHEY_SIMPLEX,
-                0.7,
-                (255, 255, 255),
-                2
-            )
-            
-            # Add warning overlay
-            overlay = annotated.copy()
-            cv2.rectangle(overlay, (x1, y1), (x2, y2), color, -1)
-            cv2.addWeighted(overlay, 0.1, annotated, 0.9, 0, annotated)
-        
-        # Add detection count if any weapons found
-        if detections:
-            warning_text = f"🚨 WEAPON DETECTED: {len(detections)}"
-            cv2.putText(
-                annotated,
-                warning_text,
-                (10, 30),
-                cv2.FONT_HERSHEY_SIMPLEX,
-                1,
-                (0, 0, 255),
-                2
-            )
+        from .renderer import draw_detections
         
+        annotated = frame.copy()
+        draw_detections(annotated, detections, show_confidence)
         return annotated
     
     def update_threshold(self, threshold: float):
@@ -0,0 +1,170 @@
+"""
+Stage Executors and Event-Loop Monitoring
+Runs blocking OpenCV, inference and encoding calls on dedicated thread pools
+so the asyncio loop only awaits futures, and measures how late the loop runs
+"""
+import time
+import asyncio
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Any, Optional
+
+import numpy as np
+
+
+class _StageStats:
+    def __init__(self):
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.busy_seconds = 0.0
+
+
+class StageExecutors:
+    """
+    One bounded thread pool per pipeline stage.
+
+    OpenCV and ONNX Runtime release the GIL while working, so these threads
+    overlap with each other and with the event loop; ``max_workers`` bounds
+    how many calls of a stage run concurrently.
+    """
+
+    def __init__(
+        self,
+        capture_workers: int = 4,
+        inference_workers: int = 1,
+        render_workers: int = 2
+    ):
+        """
+        Initialize the executors
+
+        Args:
+            capture_workers: Threads for blocking frame reads (~one per camera)
+            inference_workers: Concurrent detector calls
+            render_workers: Threads for annotation and JPEG encoding
+        """
+        self.max_workers: Dict[str, int] = {
+            "capture": max(1, capture_workers),
+            "inference": max(1, inference_workers),
+            "render": max(1, render_workers)
+        }
+        self._executors: Dict[str, ThreadPoolExecutor] = {
+            stage: ThreadPoolExecutor(workers, thread_name_prefix=stage)
+            for stage, workers in self.max_workers.items()
+        }
+        self._stats: Dict[str, _StageStats] = {stage: _StageStats() for stage in self._executors}
+
+    def executor(self, stage: str) -> ThreadPoolExecutor:
+        return self._executors[stage]
+
+    async def run(self, stage: str, fn: Callable, *args) -> Any:
+        """Run fn(*args) on a stage's pool and await the result"""
+        stats = self._stats[stage]
+        stats.in_flight += 1
+        # The worker thread only measures; stats are updated on the loop
+        elapsed = [0.0]
+
+        def timed():
+            started = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                elapsed[0] = time.perf_counter() - started
+
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(
+                self._executors[stage], timed
+            )
+        except Exception:
+            stats.failed += 1
+            raise
+        finally:
+            stats.in_flight -= 1
+            stats.busy_seconds += elapsed[0]
+        stats.completed += 1
+        return result
+
+    def shutdown(self):
+        """Stop accepting work and let running calls finish"""
+        for executor in self._executors.values():
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def get_status(self) -> Dict[str, Any]:
+        """Per-stage concurrency and busy time"""
+        return {
+            stage: {
+                "max_workers": self.max_workers[stage],
+                "in_flight": stats.in_flight,
+                "completed": stats.completed,
+                "failed": stats.failed,
+                "avg_ms": round(stats.busy_seconds / max(stats.completed, 1) * 1000.0, 2)
+            }
+            for stage, stats in self._stats.items()
+        }
+
+
+class LoopLagMonitor:
+    """
+    Measures event-loop responsiveness.
+
+    A task asks to wake every ``interval`` seconds; how late it actually wakes
+    is the time any other callback (e.g. an /api request) would have waited.
+    """
+
+    def __init__(self, interval: float = 0.1, window: int = 600):
+        """
+        Initialize the monitor
+
+        Args:
+            interval: Seconds between probes
+            window: Number of recent probes kept for percentiles
+        """
+        self.interval = interval
+        self._samples: deque = deque(maxlen=window)
+        self._task: Optional[asyncio.Task] = None
+        self.max_lag_ms = 0.0
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        """Start probing the running loop"""
+        if not self.is_running:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop probing"""
+        task, self._task = self._task, None
+        if task and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag_ms = max(0.0, (loop.time() - expected) * 1000.0)
+            self._samples.append(lag_ms)
+            self.max_lag_ms = max(self.max_lag_ms, lag_ms)
+
+    def get_status(self) -> Dict[str, Any]:
+        """Lag percentiles over the recent window, in milliseconds"""
+        if not self._samples:
+            return {
+                "samples": 0, "lag_p50_ms": 0.0, "lag_p99_ms": 0.0,
+                "lag_recent_max_ms": 0.0, "lag_max_ms": 0.0
+            }
+        samples = np.fromiter(self._samples, dtype=np.float64)
+        p50, p99 = np.percentile(samples, [50, 99])
+        return {
+            "samples": len(samples),
+            "lag_p50_ms": round(float(p50), 2),
+            "lag_p99_ms": round(float(p99), 2),
+            "lag_recent_max_ms": round(float(samples.max()), 2),
+            "lag_max_ms": round(self.max_lag_ms, 2)
+        }
@@ -0,0 +1,783 @@
+"""
+Multi-Process Capture and Inference
+Capture workers decode frames into shared-memory rings and inference workers
+read them in place; only small descriptors travel over queues, so capture
+and detection scale across cores instead of sharing the server's GIL
+"""
+import time
+import queue
+import asyncio
+import itertools
+import threading
+import multiprocessing as mp
+import numpy as np
+from dataclasses import dataclass
+from datetime import datetime
+from multiprocessing import shared_memory
+from typing import Optional, List, Dict, Any, Tuple, AsyncGenerator
+
+from .detector import WeaponDetector, Detection
+from .backends import RawDetections, backend_class
+from .processor import FrameData, STREAM_PREFIXES
+from .timing import EwmaFps, now
+
+
+# Processes are spawned so they never inherit the server's threads or sockets
+_ctx = mp.get_context("spawn")
+
+
+@dataclass(frozen=True)
+class RingSpec:
+    """Everything a process needs to attach to a ring"""
+    name: str
+    shape: Tuple[int, int, int]
+    slots: int
+
+
+@dataclass(frozen=True)
+class FrameRef:
+    """Location of a frame in a ring, valid while the slot keeps its sequence"""
+    ring: RingSpec
+    slot: int
+    seq: int
+
+
+class SharedFrameRing:
+    """
+    Fixed-size ring of frames in one shared-memory block.
+
+    Each slot has a sequence counter used as a seqlock: the writer makes it
+    odd while writing and even when done, so a reader can tell whether the
+    slot was overwritten while it was using a zero-copy view.
+    """
+
+    def __init__(
+        self,
+        shape: Tuple[int, int, int],
+        slots: int = 8,
+        name: Optional[str] = None,
+        create: bool = False
+    ):
+        """
+        Create or attach to a ring
+
+        Args:
+            shape: Frame shape (height, width, 3)
+            slots: Number of frames in the ring
+            name: Shared-memory name to attach to (ignored when creating)
+            create: Allocate a new block owned by this process
+        """
+        self.shape = tuple(shape)
+        self.slots = slots
+        self._owner = create
+
+        header_bytes = 8 * slots
+        frame_bytes = int(np.prod(self.shape))
+        if create:
+            self.shm = shared_memory.SharedMemory(create=True, size=header_bytes + frame_bytes * slots)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+
+        self._seq = np.ndarray((slots,), dtype=np.uint64, buffer=self.shm.buf)
+        self._frames = np.ndarray(
+            (slots,) + self.shape, dtype=np.uint8, buffer=self.shm.buf, offset=header_bytes
+        )
+        if create:
+            self._seq[:] = 0
+
+    @classmethod
+    def attach(cls, spec: RingSpec) -> "SharedFrameRing":
+        return cls(spec.shape, spec.slots, name=spec.name)
+
+    @property
+    def spec(self) -> RingSpec:
+        return RingSpec(self.shm.name, self.shape, self.slots)
+
+    def view(self, slot: int) -> np.ndarray:
+        """Zero-copy view of a slot's frame"""
+        return self._frames[slot]
+
+    def begin_write(self, slot: int) -> np.ndarray:
+        """Mark a slot as being written and return its frame view"""
+        self._seq[slot] += 1
+        return self._frames[slot]
+
+    def end_write(self, slot: int) -> int:
+        """Publish a written slot; returns its new (even) sequence"""
+        self._seq[slot] += 1
+        return int(self._seq[slot])
+
+    def is_current(self, slot: int, seq: int) -> bool:
+        """True if the slot still holds the frame published with `seq`"""
+        return int(self._seq[slot]) == seq
+
+    def close(self):
+        """Detach, and free the block if this process created it"""
+        self._seq = self._frames = None
+        try:
+            self.shm.close()
+        except BufferError:
+            pass  # A view is still alive somewhere; the OS reclaims on unlink
+        if self._owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+
+
+# ============================================================================
+# Capture worker
+# ============================================================================
+
+def capture_worker(
+    source,
+    frame_width: int,
+    frame_height: int,
+    target_fps: int,
+    ring_spec: RingSpec,
+    frames_out,
+    stop_event,
+    initial_backoff: float = 0.5,
+    max_backoff: float = 30.0,
+    max_file_failures: int = 5
+):
+    """
+    Process entry point: read a video source into a ring.
+
+    Sends (slot, seq, frame_id, timestamp, fps, stamps) per frame, and None
+    when the source ends. Stamps use the monotonic clock, which is shared
+    between processes. Files loop at their end. A source that fails to
+    deliver a frame is reopened with exponential backoff, like StreamGrabber
+    does in single-process mode: live streams indefinitely, files (which
+    cannot recover by waiting) up to max_file_failures times in a row.
+    """
+    import cv2
+
+    is_stream = isinstance(source, str) and source.lower().startswith(STREAM_PREFIXES)
+    is_file = isinstance(source, str) and not is_stream
+
+    def connect() -> Optional[cv2.VideoCapture]:
+        capture = cv2.VideoCapture(source)
+        if not capture.isOpened():
+            capture.release()
+            return None
+        capture.set(cv2.CAP_PROP_FRAME_WIDTH, frame_width)
+        capture.set(cv2.CAP_PROP_FRAME_HEIGHT, frame_height)
+        capture.set(cv2.CAP_PROP_FPS, target_fps)
+        if is_stream:
+            capture.set(cv2.CAP_PROP_BUFFERSIZE, 1)  # Best effort; not every backend honours it
+        return capture
+
+    ring = SharedFrameRing.attach(ring_spec)
+    cap = connect()
+    try:
+        if cap is None and not is_stream:
+            print(f"❌ Failed to open video source: {source}")
+            return
+
+        frame_interval = 1.0 / target_fps
+        native: Optional[np.ndarray] = None  # Reused when the source size differs
+        fps_meter = EwmaFps()
+        frame_count = 0
+        backoff = initial_backoff
+        failures = 0
+        rewound = False  # No frame read since the file was rewound
+
+        for slot in itertools.cycle(range(ring.slots)):
+            if stop_event.is_set():
+                break
+            tick = time.monotonic()
+
+            grabbed = cap is not None and cap.grab()
+            if not grabbed and is_file and not rewound:
+                # End of file: loop. Failing again right away means the
+                # file itself is unreadable
+                cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                rewound = True
+                continue
+
+            ret = False
+            if grabbed:
+                stamps = {"grab": now()}
+                captured_at = time.time()
+                view = ring.begin_write(slot)
+                ret, frame = cap.retrieve(view if native is None else native)
+                stamps["decode"] = now()
+                if not ret:
+                    ring.end_write(slot)
+
+            if not ret:
+                if not (is_stream or is_file):
+                    break
+                failures += 1
+                if is_file and failures > max_file_failures:
+                    print(f"❌ Giving up on {source} after {max_file_failures} failed reopens")
+                    break
+                if cap is not None:
+                    print(f"⚠️ Source read failed, reopening in {backoff:.1f}s: {source}")
+                    cap.release()
+                else:
+                    print(f"⚠️ Source unavailable, retrying in {backoff:.1f}s: {source}")
+                stop_event.wait(backoff)
+                backoff = min(backoff * 2, max_backoff)
+                rewound = False
+                cap = connect()
+                if cap is not None:
+                    native = None  # Source size may have changed
+                    print(f"📡 Source reopened: {source}")
+                continue
+
+            # Delivering frames again: the next failure starts a fresh backoff
+            backoff = initial_backoff
+            failures = 0
+            rewound = False
+            if frame is not view:
+                native = frame
+                cv2.resize(frame, (frame_width, frame_height), dst=view)
+                stamps["resize"] = now()
+            seq = ring.end_write(slot)
+
+            frame_count += 1
+            fps = fps_meter.tick(stamps["grab"])
+
+            # Latest-frame semantics: drop the oldest descriptor if the
+            # consumer is behind
+            descriptor = (slot, seq, frame_count, captured_at, fps, stamps)
+            try:
+                frames_out.put_nowait(descriptor)
+            except queue.Full:
+                try:
+                    frames_out.get_nowait()
+                except queue.Empty:
+                    pass
+                frames_out.put_nowait(descriptor)
+
+            # Files are paced to the target rate; live sources deliver at
+            # their own rate and must be drained
+            if is_file:
+                remaining = frame_interval - (time.monotonic() - tick)
+                if remaining > 0:
+                    time.sleep(remaining)
+    finally:
+        if cap is not None:
+            cap.release()
+        ring.close()
+        try:
+            frames_out.put_nowait(None)
+        except queue.Full:
+            pass  # The server is already closing this source
+
+
+class SharedMemoryVideoSource:
+    """
+    Drop-in replacement for VideoProcessor that captures in a child process.
+
+    Frames are yielded as zero-copy views into the ring; FrameData.ref lets
+    the inference pool read the same memory. Consumers that keep a frame
+    past inference must detach() it first.
+    """
+
+    def __init__(
+        self,
+        source: str | int = 0,
+        frame_width: int = 640,
+        frame_height: int = 480,
+        target_fps: int = 30,
+        ring_slots: int = 8
+    ):
+        """
+        Initialize the source
+
+        Args:
+            source: Video source (0 for webcam, path for file, URL for RTSP)
+            frame_width: Target frame width
+            frame_height: Target frame height
+            target_fps: Target frames per second
+            ring_slots: Frames held in shared memory
+        """
+        self.source = source
+        self.frame_width = frame_width
+        self.frame_height = frame_height
+        self.target_fps = target_fps
+        self.ring_slots = max(2, ring_slots)
+
+        self.ring: Optional[SharedFrameRing] = None
+        self._process: Optional[mp.Process] = None
+        self._frames_in = None
+        self._stop_event = None
+
+        self.is_running = False
+        self.frame_count = 0
+        self.frames_captured = 0
+        self.current_fps = 0.0
+        self.frames_overwritten = 0  # Slot reused before the server got to it
+
+    @property
+    def is_opened(self) -> bool:
+        return self._process is not None and self._process.is_alive()
+
+    def open(self) -> bool:
+        """Allocate the ring and start the capture process"""
+        try:
+            self.ring = SharedFrameRing(
+                (self.frame_height, self.frame_width, 3), self.ring_slots, create=True
+            )
+            self._frames_in = _ctx.Queue(maxsize=2)
+            self._stop_event = _ctx.Event()
+            self._process = _ctx.Process(
+                target=capture_worker,
+                args=(
+                    self.source, self.frame_width, self.frame_height,
+                    self.target_fps, self.ring.spec, self._frames_in, self._stop_event
+                ),
+                daemon=True
+            )
+            self._process.start()
+        except Exception as e:
+            print(f"❌ Error starting capture process: {e}")
+            self.close()
+            return False
+
+        print(f"📹 Video source opened in capture process: {self.source} (pid {self._process.pid})")
+        self.is_running = True
+        return True
+
+    def close(self):
+        """Stop the capture process and free the ring"""
+        self.is_running = False
+        if self._stop_event is not None:
+            self._stop_event.set()
+        if self._process is not None:
+            self._process.join(timeout=2.0)
+            if self._process.is_alive():
+                self._process.terminate()
+            self._process = None
+        if self.ring is not None:
+            self.ring.close()
+            self.ring = None
+        print("📹 Video source closed")
+
+    async def stream_frames(self) -> AsyncGenerator[FrameData, None]:
+        """Async generator of frames published by the capture process"""
+        if not self.is_opened:
+            if not self.open():
+                return
+
+        loop = asyncio.get_running_loop()
+        while self.is_running:
+            try:
+                descriptor = await loop.run_in_executor(None, self._frames_in.get, True, 0.5)
+            except queue.Empty:
+                if self.is_opened:
+                    continue
+                break
+            if descriptor is None or self.ring is None:
+                break
+
+            slot, seq, frame_id, timestamp, fps, stamps = descriptor
+            self.frames_captured += 1
+            if not self.ring.is_current(slot, seq):
+                self.frames_overwritten += 1
+                continue
+
+            self.frame_count = frame_id
+            self.current_fps = fps
+            yield FrameData(
+                frame=self.ring.view(slot),
+                timestamp=datetime.fromtimestamp(timestamp),
+                frame_id=frame_id,
+                fps=fps,
+                ref=FrameRef(self.ring.spec, slot, seq),
+                stamps=stamps
+            )
+
+    def detach(self, frame_data: FrameData) -> bool:
+        """
+        Replace a frame's ring view with a private copy.
+
+        The capture process reuses the slot a few hundred milliseconds
+        later, so anything that keeps or re-reads the frame (rendering,
+        evidence, alerts) must work on a copy. Returns False if the slot was
+        overwritten before the copy was complete; the frame must be dropped.
+        """
+        ref = frame_data.ref
+        ring = self.ring
+        if ref is None or ring is None:
+            return ref is None
+        frame = frame_data.frame.copy()
+        if not ring.is_current(ref.slot, ref.seq):
+            self.frames_overwritten += 1
+            return False
+        frame_data.frame = frame
+        return True
+
+    def get_status(self) -> dict:
+        """Get current source status"""
+        return {
+            "source": str(self.source),
+            "is_running": self.is_running,
+            "frame_count": self.frame_count,
+            "frames_captured": self.frames_captured,
+            "current_fps": round(self.current_fps, 1),
+            "resolution": f"{self.frame_width}x{self.frame_height}",
+            "mode": "multiprocess",
+            "capture_pid": self._process.pid if self._process else None,
+            "frames_overwritten": self.frames_overwritten
+        }
+
+
+# ============================================================================
+# Inference workers
+# ============================================================================
+
+def inference_worker(
+    backend_cls: type,
+    model_path: str,
+    backend_options: Dict[str, Any],
+    max_batch_size: int,
+    requests_in,
+    results_out
+):
+    """
+    Process entry point: run batched inference on frames in shared memory.
+
+    Receives (request_id, FrameRef) and replies (request_id, RawDetections or
+    None if the slot was overwritten, seconds per frame). Announces the
+    model's class names once loaded with ("ready", names, 0.0) and reports
+    each forward pass with ("batch", batch size, seconds).
+
+    The backend class is passed rather than its name: it is pickled by
+    reference, so importing it in the worker also registers backends that
+    were added to BACKENDS at runtime.
+    """
+    try:
+        model = backend_cls(model_path, **backend_options)
+        model.load()
+    except Exception as e:
+        print(f"❌ Inference worker could not load {model_path}: {e}")
+        raise
+    results_out.put(("ready", dict(model.names), 0.0))
+
+    rings: Dict[str, SharedFrameRing] = {}
+
+    def ring_for(ref: FrameRef) -> SharedFrameRing:
+        ring = rings.get(ref.ring.name)
+        if ring is None:
+            ring = rings[ref.ring.name] = SharedFrameRing.attach(ref.ring)
+        return ring
+
+    try:
+        while True:
+            request = requests_in.get()
+            if request is None:
+                break
+
+            # Greedily batch whatever else is already waiting
+            batch = [request]
+            stop = False
+            while len(batch) < max_batch_size:
+                try:
+                    request = requests_in.get_nowait()
+                except queue.Empty:
+                    break
+                if request is None:
+                    stop = True
+                    break
+                batch.append(request)
+
+            valid, frames = [], []
+            for request_id, ref in batch:
+                try:
+                    ring = ring_for(ref)
+                except FileNotFoundError:
+                    continue  # Camera stopped and freed its ring
+                if ring.is_current(ref.slot, ref.seq):
+                    valid.append((request_id, ring, ref))
+                    frames.append(ring.view(ref.slot))
+
+            outputs: List[Optional[RawDetections]] = []
+            elapsed = 0.0
+            if frames:
+                started = time.perf_counter()
+                try:
+                    outputs = model.predict(frames)
+                    results_out.put(("batch", len(frames), time.perf_counter() - started))
+                except Exception as e:
+                    print(f"❌ Worker inference failed: {e}")
+                    outputs = [None] * len(frames)
+                elapsed = (time.perf_counter() - started) / len(frames)
+
+            answered = set()
+            for (request_id, ring, ref), raw in zip(valid, outputs):
+                # Discard results from frames overwritten mid-inference
+                if not ring.is_current(ref.slot, ref.seq):
+                    raw = None
+                results_out.put((request_id, raw, elapsed))
+                answered.add(request_id)
+            for request_id, _ in batch:
+                if request_id not in answered:
+                    results_out.put((request_id, None, 0.0))
+
+            if stop:
+                break
+    finally:
+        for ring in rings.values():
+            ring.close()
+
+
+class ProcessInferencePool:
+    """
+    Pool of inference worker processes sharing one request queue.
+
+    Exposes the same detect() coroutine as BatchInferenceService; frames must
+    come from a SharedMemoryVideoSource so only their FrameRef is sent.
+
+    Workers that exit are noticed by the dispatcher thread: requests still
+    pending get no detections and the missing workers are respawned on a
+    later detect() call, with exponential backoff so a model that cannot
+    load does not respawn on every frame.
+    """
+
+    def __init__(
+        self,
+        detector: WeaponDetector,
+        workers: int = 2,
+        max_batch_size: int = 8,
+        request_timeout: float = 30.0,
+        initial_backoff: float = 0.5,
+        max_backoff: float = 30.0
+    ):
+        """
+        Initialize the pool
+
+        Args:
+            detector: Turns raw worker output into detections (its model is
+                not loaded in this process)
+            workers: Number of inference processes
+            max_batch_size: Maximum frames per forward pass in a worker
+            request_timeout: Seconds to wait for a worker reply (covers
+                model loading on first use)
+            initial_backoff: First delay before respawning exited workers
+            max_backoff: Upper bound for the respawn delay
+        """
+        self.detector = detector
+        self.workers = max(1, workers)
+        self.max_batch_size = max(1, max_batch_size)
+        self.request_timeout = request_timeout
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+
+        self._processes: List[mp.Process] = []
+        self._requests = None
+        self._results = None
+        self._dispatcher: Optional[threading.Thread] = None
+        self._dispatcher_stop: Optional[threading.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pending: Dict[int, Tuple[asyncio.Future, Optional[str]]] = {}
+        self._ids = itertools.count()
+        self._sources = set()
+        self._backoff = initial_backoff
+        self._restart_at = 0.0  # Monotonic time before which no worker is respawned
+
+        # Metrics
+        self.workers_ready = 0
+        self.workers_exited = 0
+        self.frames_submitted = 0
+        self.frames_inferred = 0
+        self.frames_discarded = 0
+        self.frames_failed = 0  # Lost with an exited worker or timed out
+        self._started_at: Optional[float] = None
+
+    @property
+    def is_running(self) -> bool:
+        return any(process.is_alive() for process in self._processes)
+
+    def register_source(self, camera_id: str):
+        self._sources.add(camera_id)
+
+    def unregister_source(self, camera_id: str):
+        self._sources.discard(camera_id)
+
+    def start(self):
+        """Spawn worker processes until the pool is at full size"""
+        self._reap()
+        missing = self.workers - len(self._processes)
+        if missing <= 0:
+            return
+
+        if not self._processes:
+            # Nothing alive uses the old queues: retire them with their
+            # dispatcher instead of sharing them with the new workers
+            self._stop_dispatcher()
+            self._loop = asyncio.get_running_loop()
+            self._requests = _ctx.Queue()
+            self._results = _ctx.Queue()
+            self._dispatcher_stop = threading.Event()
+            self._dispatcher = threading.Thread(
+                target=self._dispatch_results,
+                args=(self._results, self._dispatcher_stop),
+                daemon=True
+            )
+            self._dispatcher.start()
+        if self._started_at is None:
+            self._started_at = time.perf_counter()
+
+        for _ in range(missing):
+            process = _ctx.Process(
+                target=inference_worker,
+                args=(
+                    backend_class(self.detector.backend_name), self.detector.model_path,
+                    self.detector.backend_options, self.max_batch_size,
+                    self._requests, self._results
+                ),
+                daemon=True
+            )
+            process.start()
+            self._processes.append(process)
+        print(f"🧮 Inference pool started {missing} worker process(es)")
+
+    async def stop(self):
+        """Stop the workers; pending requests get no detections"""
+        processes, self._processes = self._processes, []
+        if processes:
+            for _ in processes:
+                self._requests.put(None)
+            loop = asyncio.get_running_loop()
+            for process in processes:
+                await loop.run_in_executor(None, process.join, 5.0)
+                if process.is_alive():
+                    process.terminate()
+                    await loop.run_in_executor(None, process.join, 1.0)
+        await asyncio.get_running_loop().run_in_executor(None, self._stop_dispatcher)
+        self._fail_pending()
+
+    def _stop_dispatcher(self):
+        """End the dispatcher thread of the current result queue"""
+        if self._dispatcher is None:
+            return
+        self._dispatcher_stop.set()
+        self._results.put(None)
+        self._dispatcher.join(timeout=2.0)
+        self._dispatcher = None
+
+    def _reap(self) -> int:
+        """Join workers that have exited; returns how many"""
+        exited = [process for process in self._processes if not process.is_alive()]
+        if not exited:
+            return 0
+        for process in exited:
+            process.join()
+            print(f"⚠️ Inference worker {process.pid} exited (code {process.exitcode})")
+        self._processes = [process for process in self._processes if process.is_alive()]
+        self.workers_exited += len(exited)
+
+        # Respawn later, backing off while workers keep dying
+        self._restart_at = time.monotonic() + self._backoff
+        self._backoff = min(self._backoff * 2, self.max_backoff)
+        return len(exited)
+
+    def _fail_pending(self):
+        """Answer every waiting request with no detections"""
+        pending, self._pending = self._pending, {}
+        for future, _ in pending.values():
+            if not future.done():
+                self.frames_failed += 1
+                future.set_result([])
+
+    async def detect(
+        self,
+        frame: np.ndarray,
+        camera_id: Optional[str] = None,
+        ref: Optional[FrameRef] = None
+    ) -> List[Detection]:
+        """Send a frame reference to the workers and wait for its detections"""
+        if ref is None:
+            raise ValueError("ProcessInferencePool needs frames from a SharedMemoryVideoSource")
+        if len(self._processes) < self.workers and time.monotonic() >= self._restart_at:
+            self.start()
+        if not self._processes:
+            return []  # Every worker exited; waiting out the respawn backoff
+
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = (future, camera_id)
+        self.frames_submitted += 1
+        self._requests.put((request_id, ref))
+        try:
+            return await asyncio.wait_for(future, self.request_timeout)
+        except asyncio.TimeoutError:
+            self.frames_failed += 1
+            print(f"⚠️ Inference request timed out after {self.request_timeout:.0f}s")
+            return []
+        finally:
+            self._pending.pop(request_id, None)
+
+    def _dispatch_results(self, results, stop: threading.Event):
+        """Thread: forward worker replies to the event loop, watch for exits"""
+        while not stop.is_set():
+            try:
+                message = results.get(timeout=0.5)
+            except queue.Empty:
+                if any(not process.is_alive() for process in list(self._processes)):
+                    self._loop.call_soon_threadsafe(self._on_worker_exit)
+                continue
+            if message is None:
+                break
+            self._loop.call_soon_threadsafe(self._on_result, *message)
+
+    def _on_worker_exit(self):
+        # A dead worker may have taken requests off the shared queue;
+        # which ones is unknown, so nothing pending can be relied on
+        if self._reap():
+            self._fail_pending()
+
+    def _on_result(self, request_id, raw, seconds):
+        if request_id == "ready":
+            self.workers_ready += 1
+            self._backoff = self.initial_backoff
+            self.detector.set_class_names(raw)
+            return
+        if request_id == "batch":
+            self.detector.record_inference(seconds, raw)
+            return
+
+        entry = self._pending.get(request_id)
+        if entry is None:
+            return
+        future, camera_id = entry
+        if future.done():
+            return
+
+        if raw is None:
+            self.frames_discarded += 1
+            future.set_result([])
+            return
+
+        self.frames_inferred += 1
+        try:
+            detections = self.detector.parse_results([raw], [camera_id], seconds)[0]
+        except Exception as e:
+            print(f"❌ Failed to parse worker result: {e}")
+            detections = []
+        future.set_result(detections)
+
+    def get_status(self) -> Dict[str, Any]:
+        """Worker and throughput metrics"""
+        elapsed = time.perf_counter() - self._started_at if self._started_at else 0.0
+        return {
+            "is_running": self.is_running,
+            "mode": "multiprocess",
+            "workers": self.workers,
+            "workers_alive": sum(1 for process in self._processes if process.is_alive()),
+            "workers_ready": self.workers_ready,
+            "workers_exited": self.workers_exited,
+            "max_batch_size": self.max_batch_size,
+            "sources": len(self._sources),
+            "pending": len(self._pending),
+            "frames_submitted": self.frames_submitted,
+            "frames_inferred": self.frames_inferred,
+            "frames_discarded": self.frames_discarded,
+            "frames_failed": self.frames_failed,
+            "avg_frame_latency_ms": round(self.detector.avg_frame_latency * 1000.0, 2),
+            "inference_fps": round(self.frames_inferred / elapsed, 1) if elapsed > 0 else 0.0
+        }
@@ -0,0 +1,285 @@
+"""
+Shared Capture-and-Detect Pipeline
+Captures, detects, annotates and encodes each frame once per camera and
+hands the results to a broadcaster, however many viewers are connected
+"""
+import asyncio
+import numpy as np
+from typing import Optional, Callable, Awaitable, List, Dict, Any
+
+from .detector import WeaponDetector, Detection
+from .processor import VideoProcessor, FrameData, MotionGate, EncodedFrame, frame_to_jpeg
+from .renderer import FrameRenderer
+from .broadcaster import StreamBroadcaster
+from .batching import BatchInferenceService
+from .scheduler import InferenceScheduler
+from .tracker import ObjectTracker
+from .suppression import EventSuppressor
+from .multiprocess import SharedMemoryVideoSource, ProcessInferencePool
+from .executors import StageExecutors
+from .timing import StageLatency, EwmaFps
+
+
+# Called once per frame that produced new detection events (new tracks when
+# a tracker is attached, minus suppressed repeats):
+# (pipeline, frame_data, annotated, detections). `annotated` carries the
+# streamed JPEG so handlers only encode other quality levels.
+DetectionCallback = Callable[
+    ["DetectionPipeline", FrameData, EncodedFrame, List[Detection]],
+    Awaitable[None]
+]
+
+
+class DetectionPipeline:
+    """Background task running the per-camera processing loop"""
+
+    def __init__(
+        self,
+        processor: VideoProcessor | SharedMemoryVideoSource,
+        detector: WeaponDetector,
+        broadcaster: StreamBroadcaster,
+        on_detections: Optional[DetectionCallback] = None,
+        jpeg_quality: int = 80,
+        camera_id: str = "camera_1",
+        camera_name: str = "Camera 1",
+        batcher: Optional[BatchInferenceService | ProcessInferencePool] = None,
+        motion_gate: Optional[MotionGate] = None,
+        scheduler: Optional[InferenceScheduler] = None,
+        tracker: Optional[ObjectTracker] = None,
+        suppressor: Optional[EventSuppressor] = None,
+        executors: Optional[StageExecutors] = None,
+        latency: Optional[StageLatency] = None
+    ):
+        """
+        Initialize the pipeline
+
+        Args:
+            processor: Video source for this camera
+            detector: Weapon detector (may be shared between cameras)
+            broadcaster: Fan-out for encoded frames and detection events
+            on_detections: Async hook for evidence saving / alerting
+            jpeg_quality: JPEG quality of streamed frames
+            camera_id: Camera identifier attached to detections
+            camera_name: Human-readable camera location
+            batcher: Cross-camera batching service or inference process pool;
+                detects inline if None
+            motion_gate: Skips inference on static frames; every frame if None
+            scheduler: Adaptive inference-rate scheduler shared by all cameras
+            tracker: Persists boxes between inference frames and reports each
+                object once; every detection is reported if None
+            suppressor: Drops repeat events per class and track/region
+            executors: Thread pools for inference and render/encode (the
+                loop's default executor if None)
+            latency: Per-stage latency histograms (shared with the broadcaster)
+        """
+        self.camera_id = camera_id
+        self.camera_name = camera_name
+        self.processor = processor
+        self.detector = detector
+        self.broadcaster = broadcaster
+        self.on_detections = on_detections
+        self.jpeg_quality = jpeg_quality
+        self.batcher = batcher
+        self.motion_gate = motion_gate
+        self.scheduler = scheduler
+        self.tracker = tracker
+        self.suppressor = suppressor
+        self.executors = executors
+        self.latency = latency or StageLatency()
+        self.renderer = FrameRenderer()
+        self._fps = EwmaFps()
+
+        self.frames_processed = 0
+        self.detection_count = 0
+        self.frames_inferred = 0
+        self._last_detections: List[Detection] = []
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> bool:
+        """Open the video source and start the processing task"""
+        if self.is_running:
+            return True
+
+        if not self.processor.is_opened:
+            if not self.processor.open():
+                return False
+
+        if self.batcher:
+            self.batcher.register_source(self.camera_id)
+        if self.scheduler:
+            self.scheduler.register(self.camera_id, self.processor.target_fps)
+        self._last_detections = []
+        self._fps.reset()
+        if self.tracker:
+            self.tracker.reset()
+        if self.suppressor:
+            self.suppressor.reset()
+        self._task = asyncio.create_task(self._run())
+        print(f"▶️ Detection pipeline started: {self.camera_id}")
+        return True
+
+    async def stop(self):
+        """Stop the processing task and release the video source"""
+        task, self._task = self._task, None
+        self.processor.close()
+        if self.batcher:
+            self.batcher.unregister_source(self.camera_id)
+        if self.scheduler:
+            self.scheduler.unregister(self.camera_id)
+
+        if task and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+        print(f"⏹️ Detection pipeline stopped: {self.camera_id}")
+
+    async def _run(self):
+        """Capture → detect → annotate → encode → broadcast"""
+        try:
+            async for frame_data in self.processor.stream_frames():
+                try:
+                    frame = frame_data.frame
+
+                    # Run detection when scheduled and the scene changed
+                    detections: Optional[List[Detection]] = None
+                    if self._should_infer(frame):
+                        detections = await self._detect(frame_data)
+                        frame_data.mark("infer")
+                        # Report detections at the time the frame was captured
+                        for detection in detections:
+                            detection.timestamp = frame_data.timestamp
+                        self.frames_inferred += 1
+                        if self.scheduler:
+                            self.scheduler.mark_inferred(self.camera_id, detected=bool(detections))
+
+                    # Shared-memory frames are views into a ring slot the
+                    # capture process will overwrite: copy before rendering
+                    # and evidence, and drop the frame if it already was
+                    if frame_data.ref is not None:
+                        if not await self._offload("render", self.processor.detach, frame_data):
+                            continue
+
+                    # The tracker coasts boxes over skipped frames and only reports
+                    # objects it has not seen before; without it, skipped frames
+                    # reuse the last boxes and every detection is reported
+                    if self.tracker:
+                        self._last_detections, detections = self.tracker.step(detections)
+                    elif detections is not None:
+                        self._last_detections = detections
+
+                    if detections and self.suppressor:
+                        detections = self.suppressor.filter(detections)
+
+                    # Boxes and timestamp in one pass into the renderer's
+                    # buffer, then JPEG, off the event loop
+                    annotated_frame, jpeg_bytes = await self._offload(
+                        "render", self._render_and_encode, frame_data, self._last_detections
+                    )
+                    self.latency.record(frame_data.stamps)
+
+                    # Handle detections
+                    if detections:
+                        self.detection_count += len(detections)
+
+                        if self.on_detections:
+                            try:
+                                # The render buffer is reused next frame; the
+                                # handler gets its own copy to keep
+                                annotated = EncodedFrame(
+                                    annotated_frame.copy(), {self.jpeg_quality: jpeg_bytes}
+                                )
+                                await self.on_detections(self, frame_data, annotated, detections)
+                            except Exception as e:
+                                print(f"❌ Detection handler error: {e}")
+
+                        for detection in detections:
+                            self.broadcaster.publish_event({
+                                "type": "detection",
+                                "data": detection.to_dict()
+                            })
+
+                    # Encoded once, queued for every viewer
+                    self.broadcaster.publish_frame(jpeg_bytes, frame_data.stamps)
+                    self.frames_processed += 1
+                    self._fps.tick()
+                finally:
+                    # Recycle the pooled capture buffer; handlers that keep the
+                    # raw frame beyond this iteration must retain() it first
+                    frame_data.release()
+
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"❌ Pipeline error ({self.camera_id}): {e}")
+        finally:
+            if self.batcher:
+                self.batcher.unregister_source(self.camera_id)
+            if self.scheduler:
+                self.scheduler.unregister(self.camera_id)
+
+    def _should_infer(self, frame: np.ndarray) -> bool:
+        """Scheduler decides the rate, the motion gate vetoes static frames"""
+        if self.scheduler and not self.scheduler.is_due(self.camera_id):
+            return False
+        return self.motion_gate is None or self.motion_gate.should_infer(frame)
+
+    async def _offload(self, stage: str, fn, *args):
+        """Run a blocking call on the stage's executor"""
+        if self.executors:
+            return await self.executors.run(stage, fn, *args)
+        return await asyncio.get_running_loop().run_in_executor(None, fn, *args)
+
+    def _render_and_encode(self, frame_data: FrameData, detections: List[Detection]):
+        annotated_frame = self.renderer.render(frame_data.frame, detections)
+        frame_data.mark("annotate")
+        jpeg_bytes = frame_to_jpeg(annotated_frame, quality=self.jpeg_quality)
+        frame_data.mark("encode")
+        return annotated_frame, jpeg_bytes
+
+    async def _detect(self, frame_data: FrameData) -> List[Detection]:
+        """Run detection through the batching service when available"""
+        if self.batcher is None:
+            work = self._offload(
+                "inference", self.detector.detect, frame_data.frame, self.camera_id
+            )
+        else:
+            work = self.batcher.detect(
+                frame_data.frame, camera_id=self.camera_id, ref=frame_data.ref
+            )
+
+        # Inference keeps reading the frame even if this pipeline is stopped
+        # meanwhile: hold the pooled buffer until it has really finished
+        task = asyncio.ensure_future(work)
+        if frame_data.buffer is not None:
+            buffer = frame_data.buffer.retain()
+            task.add_done_callback(lambda _: buffer.release())
+        return await asyncio.shield(task)
+
+    @property
+    def current_fps(self) -> float:
+        """Instantaneous rate of published frames"""
+        return self._fps.fps
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get pipeline status"""
+        return {
+            "camera_id": self.camera_id,
+            "name": self.camera_name,
+            "is_running": self.is_running,
+            "frames_processed": self.frames_processed,
+            "frames_inferred": self.frames_inferred,
+            "fps": round(self.current_fps, 1),
+            "detection_count": self.detection_count,
+            "motion": self.motion_gate.get_status() if self.motion_gate else None,
+            "schedule": self.scheduler.get_camera_status(self.camera_id) if self.scheduler else None,
+            "tracking": self.tracker.get_status() if self.tracker else None,
+            "events": self.suppressor.get_status() if self.suppressor else None,
+            "latency": self.latency.get_status()
+        }
@@ -7,11 +7,16 @@ import asyncio
 import numpy as np
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, Callable, AsyncGenerator, Tuple
-from dataclasses import dataclass
+from typing import Optional, Callable, AsyncGenerator, Tuple, Any, Dict
+from dataclasses import dataclass, field
 import threading
 from queue import Queue
 
+from .renderer import draw_timestamp
+from .buffers import FramePool, FrameBuffer
+from .executors import StageExecutors
+from .timing import EwmaFps, now
+
 
 @dataclass
 class FrameData:
@@ -20,6 +25,175 @@ class FrameData:
     timestamp: datetime
     frame_id: int
     fps: float
+    buffer: Optional[FrameBuffer] = None  # Pooled storage behind `frame`
+    ref: Optional[Any] = None  # Shared-memory location (multiprocess.FrameRef)
+    stamps: Dict[str, float] = field(default_factory=dict)  # Monotonic time per stage
+    
+    def mark(self, stage: str):
+        """Record that the frame finished a pipeline stage (see timing.STAGES)"""
+        self.stamps[stage] = now()
+    
+    def release(self):
+        """Return the frame's buffer to its pool once this holder is done"""
+        if self.buffer is not None:
+            self.buffer.release()
+            self.buffer = None
+
+
+# Sources that are live network streams (grabbed continuously, reconnected)
+STREAM_PREFIXES = ("rtsp://", "rtsps://", "rtmp://", "http://", "https://")
+
+
+class StreamGrabber:
+    """
+    Dedicated thread draining a live stream.
+
+    Frames are decoded as fast as the stream delivers them and only the
+    latest one is kept, so the decoder's buffer never fills up with stale
+    frames. On read failure the stream is reopened with exponential backoff.
+    """
+    
+    def __init__(
+        self,
+        processor: "VideoProcessor",
+        initial_backoff: float = 0.5,
+        max_backoff: float = 30.0
+    ):
+        """
+        Initialize the grabber
+        
+        Args:
+            processor: Owning processor (source, target size and buffer pool)
+            initial_backoff: First reconnect delay in seconds
+            max_backoff: Upper bound for the reconnect delay
+        """
+        self.processor = processor
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        
+        self._cap: Optional[cv2.VideoCapture] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._cond = threading.Condition()
+        self._latest: Optional[FrameData] = None
+        self._latest_at = 0.0  # Monotonic capture time of _latest
+        
+        self.connected = False
+        self.reconnects = 0
+        self.frames_grabbed = 0
+        self.frames_dropped = 0  # Replaced by a newer frame before being consumed
+        self.fps = 0.0  # Rate the stream delivers at
+        self._fps = EwmaFps()
+        self.last_frame_at = 0.0
+        self.frame_age_ms = 0.0  # Capture-to-handoff delay of the last frame
+    
+    @property
+    def is_alive(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+    
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+        with self._cond:
+            if self._latest:
+                self._latest.release()
+                self._latest = None
+    
+    def _connect(self) -> bool:
+        cap = cv2.VideoCapture(self.processor.source)
+        if not cap.isOpened():
+            cap.release()
+            return False
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)  # Best effort; not every backend honours it
+        self._cap = cap
+        self.processor._capture_buffer = None  # Stream size may have changed
+        return True
+    
+    def _disconnect(self):
+        self.connected = False
+        if self._cap:
+            self._cap.release()
+            self._cap = None
+    
+    def _run(self):
+        backoff = self.initial_backoff
+        while not self._stop.is_set():
+            if self._cap is None:
+                if self._connect():
+                    self.connected = True
+                    print(f"📡 Stream connected: {self.processor.source}")
+                else:
+                    print(f"⚠️ Stream unavailable, retrying in {backoff:.1f}s: {self.processor.source}")
+                    self._stop.wait(backoff)
+                    backoff = min(backoff * 2, self.max_backoff)
+                    self.reconnects += 1
+                    continue
+            
+            stamps: Dict[str, float] = {}
+            frame, buffer, captured_at = self.processor._decode(self._cap, stamps)
+            if frame is None:
+                print(f"⚠️ Stream read failed, reconnecting in {backoff:.1f}s: {self.processor.source}")
+                self._disconnect()
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+                self.reconnects += 1
+                continue
+            
+            # Delivering frames again: the next failure starts a fresh backoff
+            backoff = self.initial_backoff
+            self.frames_grabbed += 1
+            self.fps = self._fps.tick(stamps["grab"])
+            frame_data = FrameData(
+                frame=frame,
+                timestamp=captured_at,
+                frame_id=self.frames_grabbed,
+                fps=self.fps,
+                buffer=buffer,
+                stamps=stamps
+            )
+            with self._cond:
+                if self._latest is not None:
+                    self._latest.release()
+                    self.frames_dropped += 1
+                self._latest = frame_data
+                self._latest_at = self.last_frame_at = stamps["grab"]
+                self._cond.notify_all()
+        
+        self._disconnect()
+    
+    def next_frame(self, timeout: float = 1.0) -> Optional[FrameData]:
+        """Take the latest frame, waiting up to `timeout` for a new one"""
+        with self._cond:
+            if self._latest is None:
+                self._cond.wait_for(
+                    lambda: self._latest is not None or self._stop.is_set(), timeout
+                )
+            frame_data, self._latest = self._latest, None
+            if frame_data is not None:
+                self.frame_age_ms = (time.monotonic() - self._latest_at) * 1000.0
+            return frame_data
+    
+    def get_status(self) -> dict:
+        """Connection health and staleness"""
+        since = time.monotonic() - self.last_frame_at if self.last_frame_at else None
+        return {
+            "connected": self.connected,
+            "reconnects": self.reconnects,
+            "frames_grabbed": self.frames_grabbed,
+            "frames_dropped": self.frames_dropped,
+            "stream_fps": round(self.fps, 1),
+            "frame_age_ms": round(self.frame_age_ms, 1),
+            "seconds_since_frame": round(since, 2) if since is not None else None
+        }
 
 
 class VideoProcessor:
@@ -30,7 +204,9 @@ class VideoProcessor:
         source: str | int = 0,
         frame_width: int = 640,
         frame_height: int = 480,
-        target_fps: int = 30
+        target_fps: int = 30,
+        pool_size: int = 8,
+        executors: Optional[StageExecutors] = None
     ):
         """
         Initialize video processor
@@ -40,6 +216,10 @@ class VideoProcessor:
             frame_width: Target frame width
             frame_height: Target frame height
             target_fps: Target frames per second
+            pool_size: Preallocated frame buffers; frames in flight beyond
+                this fall back to one-off allocations
+            executors: Thread pools for blocking reads in stream_frames()
+                (the loop's default executor if None)
         """
         self.source = source
         self.frame_width = frame_width
@@ -49,15 +229,45 @@ class VideoProcessor:
         self.cap: Optional[cv2.VideoCapture] = None
         self.is_running = False
         self.frame_count = 0
+        self.frames_captured = 0  # Lifetime total (frame_count restarts per loop)
         self.start_time: Optional[float] = None
-        self.current_fps = 0.0
+        self.current_fps = 0.0  # Exponentially weighted, not a lifetime average
+        self._fps = EwmaFps()
+        
+        # Frames are captured / resized into pooled buffers
+        self.pool = FramePool((frame_height, frame_width, 3), size=pool_size)
+        self._capture_buffer: Optional[np.ndarray] = None  # Native-size scratch
+        self.executors = executors
+        self._cap_lock = threading.Lock()  # Reads run off-loop; never release mid-read
+        self.grabber: Optional[StreamGrabber] = None  # Live network streams only
         
         # Threading for async frame reading
         self.frame_queue: Queue = Queue(maxsize=10)
         self.read_thread: Optional[threading.Thread] = None
+    
+    @property
+    def is_stream(self) -> bool:
+        """True for live network sources (RTSP/RTMP/HTTP)"""
+        return isinstance(self.source, str) and self.source.lower().startswith(STREAM_PREFIXES)
+    
+    @property
+    def is_opened(self) -> bool:
+        if self.grabber is not None:
+            return self.grabber.is_alive
+        return self.cap is not None and self.cap.isOpened()
         
     def open(self) -> bool:
         """Open the video source"""
+        if self.is_stream:
+            # Connects (and reconnects) in the background
+            self.grabber = StreamGrabber(self)
+            self.grabber.start()
+            print(f"📹 Video stream grabber started: {self.source}")
+            self.is_running = True
+            self.start_time = time.time()
+            self._fps.reset()
+            return True
+        
         try:
             self.cap = cv2.VideoCapture(self.source)
             
@@ -81,6 +291,8 @@ class VideoProcessor:
             
             self.is_running = True
             self.start_time = time.time()
+            self._fps.reset()
+            self._capture_buffer = None
             return True
             
         except Exception as e:
@@ -94,43 +306,103 @@ class VideoProcessor:
         if self.read_thread and self.read_thread.is_alive():
             self.read_thread.join(timeout=1.0)
         
-        if self.cap:
-            self.cap.release()
-            self.cap = None
+        if self.grabber:
+            self.grabber.stop()
+            self.grabber = None
+        
+        with self._cap_lock:
+            if self.cap:
+                self.cap.release()
+                self.cap = None
             
         print("📹 Video source closed")
     
     def read_frame(self) -> Optional[FrameData]:
-        """Read a single frame from the video source"""
-        if not self.cap or not self.cap.isOpened():
-            return None
+        """
+        Read a single frame from the video source
         
-        ret, frame = self.cap.read()
+        The frame lives in a pooled buffer: call FrameData.release() when
+        done with it.
+        """
+        with self._cap_lock:
+            if not self.cap or not self.cap.isOpened():
+                return None
+            stamps: Dict[str, float] = {}
+            frame, buffer, captured_at = self._decode(self.cap, stamps)
         
-        if not ret:
+        if frame is None:
             return None
         
         self.frame_count += 1
-        
-        # Calculate FPS
-        elapsed = time.time() - self.start_time
-        if elapsed > 0:
-            self.current_fps = self.frame_count / elapsed
-        
-        # Resize if needed
-        if frame.shape[1] != self.frame_width or frame.shape[0] != self.frame_height:
-            frame = cv2.resize(frame, (self.frame_width, self.frame_height))
+        self.frames_captured += 1
+        self.current_fps = self._fps.tick(stamps["grab"])
         
         return FrameData(
             frame=frame,
-            timestamp=datetime.now(),
+            timestamp=captured_at,
             frame_id=self.frame_count,
-            fps=self.current_fps
+            fps=self.current_fps,
+            buffer=buffer,
+            stamps=stamps
         )
     
+    def _decode(
+        self,
+        cap: cv2.VideoCapture,
+        stamps: Dict[str, float]
+    ) -> Tuple[Optional[np.ndarray], Optional[FrameBuffer], Optional[datetime]]:
+        """
+        Read one frame from `cap` into a pooled, target-size buffer
+        
+        Fills `stamps` with grab / decode / resize times and returns
+        (frame, buffer, wall-clock capture time).
+        """
+        # Grab (wait for and demux the next frame) separately from decoding
+        # so the frame's life starts when it arrived, not when we asked
+        if not cap.grab():
+            return None, None, None
+        stamps["grab"] = now()
+        captured_at = datetime.now()
+        
+        buffer = self.pool.acquire()
+        
+        # Decode straight into the pooled buffer when the source already has
+        # the target size, otherwise into a reused native-size scratch array
+        target = buffer.array if self._capture_buffer is None else self._capture_buffer
+        ret, frame = cap.retrieve(target)
+        stamps["decode"] = now()
+        
+        if not ret:
+            buffer.release()
+            return None, None, None
+        
+        if frame is not buffer.array:
+            if frame.ndim != 3 or frame.shape[2] != buffer.array.shape[2]:
+                # Unexpected layout (e.g. grayscale source): no pooling
+                buffer.release()
+                buffer = None
+                frame = cv2.resize(frame, (self.frame_width, self.frame_height))
+            else:
+                # Keep the native-size array for the next read, resize into the pool
+                self._capture_buffer = frame
+                if frame.shape == buffer.array.shape:
+                    np.copyto(buffer.array, frame)
+                else:
+                    cv2.resize(frame, (self.frame_width, self.frame_height), dst=buffer.array)
+                frame = buffer.array
+            stamps["resize"] = now()
+        
+        return frame, buffer, captured_at
+    
     def _frame_reader_thread(self):
         """Background thread for reading frames"""
+        # Only files need pacing; live sources block in read() until the next
+        # frame, and sleeping on top of that lets stale frames pile up
+        paced = isinstance(self.source, str) and not self.is_stream
+        frame_interval = 1.0 / self.target_fps
+        
         while self.is_running:
+            started = time.monotonic()
             frame_data = self.read_frame()
             
             if frame_data is None:
@@ -140,14 +412,16 @@ class VideoProcessor:
             # Put frame in queue (drop oldest if full)
             if self.frame_queue.full():
                 try:
-                    self.frame_queue.get_nowait()
+                    self.frame_queue.get_nowait().release()
                 except:
                     pass
             
             self.frame_queue.put(frame_data)
             
-            # Control frame rate
-            time.sleep(1.0 / self.target_fps)
+            if paced:
+                remaining = frame_interval - (time.monotonic() - started)
+                if remaining > 0:
+                    time.sleep(remaining)
     
     def start_async_reading(self):
         """Start reading frames in background thread"""
@@ -166,17 +440,34 @@ class VideoProcessor:
             return None
     
     async def stream_frames(self) -> AsyncGenerator[FrameData, None]:
-        """Async generator for streaming frames"""
-        if not self.cap:
+        """Async generator for streaming frames (release each when done)"""
+        if not self.is_opened:
             if not self.open():
                 return
         
         frame_interval = 1.0 / self.target_fps
+        loop = asyncio.get_running_loop()
+        # Only files are paced; live sources deliver at their own rate and
+        # any extra wait would let stale frames queue up in the decoder
+        paced = isinstance(self.source, str) and not self.is_stream
+        read = self._next_stream_frame if self.is_stream else self.read_frame
         
         while self.is_running:
-            frame_data = self.read_frame()
+            started = time.monotonic()
+            
+            # Blocking decode / wait runs off the event loop
+            if self.executors:
+                frame_data = await self.executors.run("capture", read)
+            else:
+                frame_data = await loop.run_in_executor(None, read)
+            if not self.is_running:
+                if frame_data:
+                    frame_data.release()
+                break
             
             if frame_data is None:
+                if self.is_stream:
+                    continue  # No new frame yet; the grabber reconnects on its own
                 # For video files, optionally loop
                 if isinstance(self.source, str):
                     self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
@@ -188,7 +479,22 @@ class VideoProcessor:
             yield frame_data
             
             # Maintain frame rate
-            await asyncio.sleep(frame_interval)
+            if paced:
+                remaining = frame_interval - (time.monotonic() - started)
+                if remaining > 0:
+                    await asyncio.sleep(remaining)
+            else:
+                await asyncio.sleep(0)
+    
+    def _next_stream_frame(self) -> Optional[FrameData]:
+        """Latest frame from the grabber, counted as delivered"""
+        frame_data = self.grabber.next_frame() if self.grabber else None
+        if frame_data is not None:
+            self.frame_count += 1
+            self.frames_captured += 1
+            self.current_fps = self._fps.tick()
+            frame_data.fps = self.current_fps
+        return frame_data
     
     def get_status(self) -> dict:
         """Get current processor status"""
@@ -196,8 +502,118 @@ class VideoProcessor:
             "source": str(self.source),
             "is_running": self.is_running,
             "frame_count": self.frame_count,
+            "frames_captured": self.frames_captured,
             "current_fps": round(self.current_fps, 1),
-            "resolution": f"{self.frame_width}x{self.frame_height}"
+            "resolution": f"{self.frame_width}x{self.frame_height}",
+            "buffer_pool": self.pool.get_status(),
+            "stream": self.grabber.get_status() if self.grabber else None
+        }
+
+
+class MotionGate:
+    """
+    Cheap motion detector deciding which frames are worth running inference on.
+
+    Frames are downscaled to grayscale and compared against a running-average
+    background; a frame passes when the fraction of changed pixels reaches
+    ``threshold``. A frame is also forced through every ``force_interval``
+    seconds so a still scene is never left unchecked.
+    """
+    
+    def __init__(
+        self,
+        threshold: float = 0.002,
+        force_interval: float = 2.0,
+        hold_seconds: float = 1.0,
+        downscale_width: int = 160,
+        pixel_threshold: int = 25,
+        background_alpha: float = 0.05
+    ):
+        """
+        Initialize motion gate
+        
+        Args:
+            threshold: Fraction of changed pixels that counts as motion
+            force_interval: Max seconds between inferences regardless of motion
+            hold_seconds: Keep inferring this long after motion stops
+            downscale_width: Width of the analysis image
+            pixel_threshold: Gray-level difference for a pixel to count as changed
+            background_alpha: Background running-average update rate
+        """
+        self.threshold = threshold
+        self.force_interval = force_interval
+        self.hold_seconds = hold_seconds
+        self.downscale_width = downscale_width
+        self.pixel_threshold = pixel_threshold
+        self.background_alpha = background_alpha
+        
+        self._background: Optional[np.ndarray] = None
+        self._last_inference = 0.0
+        self._last_motion = 0.0
+        
+        self.motion_score = 0.0
+        self.frames_seen = 0
+        self.frames_inferred = 0
+        self.frames_gated = 0
+        self.frames_forced = 0
+    
+    def reset(self):
+        """Forget the background model (e.g. after the source reconnects)"""
+        self._background = None
+    
+    def _motion_fraction(self, frame: np.ndarray) -> float:
+        height, width = frame.shape[:2]
+        small_height = max(1, int(height * self.downscale_width / width))
+        small = cv2.resize(frame, (self.downscale_width, small_height), interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        gray = cv2.GaussianBlur(gray, (5, 5), 0)
+        
+        if self._background is None or self._background.shape != gray.shape:
+            self._background = gray.astype(np.float32)
+            return 1.0
+        
+        diff = cv2.absdiff(gray, cv2.convertScaleAbs(self._background))
+        cv2.accumulateWeighted(gray, self._background, self.background_alpha)
+        
+        _, changed = cv2.threshold(diff, self.pixel_threshold, 255, cv2.THRESH_BINARY)
+        return cv2.countNonZero(changed) / changed.size
+    
+    def should_infer(self, frame: np.ndarray) -> bool:
+        """Return True if this frame should go to the detector"""
+        stamp = time.monotonic()
+        self.frames_seen += 1
+        self.motion_score = self._motion_fraction(frame)
+        
+        if self.motion_score >= self.threshold:
+            self._last_motion = stamp
+        
+        if stamp - self._last_motion <= self.hold_seconds:
+            infer = True
+        elif stamp - self._last_inference >= self.force_interval:
+            infer = True
+            self.frames_forced += 1
+        else:
+            infer = False
+        
+        if infer:
+            self._last_inference = stamp
+            self.frames_inferred += 1
+        else:
+            self.frames_gated += 1
+        return infer
+    
+    def get_status(self) -> dict:
+        """Gated vs. inferred frame counts"""
+        seen = max(self.frames_seen, 1)
+        return {
+            "threshold": self.threshold,
+            "motion_score": round(self.motion_score, 4),
+            "frames_seen": self.frames_seen,
+            "frames_inferred": self.frames_inferred,
+            "frames_gated": self.frames_gated,
+            "frames_forced": self.frames_forced,
+            "inferred_ratio": round(self.frames_inferred / seen, 3),
+            "gated_ratio": round(self.frames_gated / seen, 3)
         }
 
 
@@ -208,6 +624,36 @@ def frame_to_jpeg(frame: np.ndarray, quality: int = 85) -> bytes:
     return buffer.tobytes()
 
 
+class EncodedFrame:
+    """
+    A frame plus its JPEG encodings, cached per quality.
+
+    Streaming, evidence files and alert attachments of the same frame all
+    share one encode per quality level. Encoding may happen on executor
+    threads, so the cache is filled under a lock.
+    """
+
+    def __init__(self, frame: np.ndarray, encoded: Optional[Dict[int, bytes]] = None):
+        """
+        Args:
+            frame: Image to encode; must not be modified afterwards
+            encoded: JPEG bytes already produced for this frame, by quality
+        """
+        self.frame = frame
+        self._jpeg: Dict[int, bytes] = dict(encoded or {})
+        self._lock = threading.Lock()
+
+    def jpeg(self, quality: int = 85) -> bytes:
+        """JPEG bytes at the given quality, encoding on first use"""
+        data = self._jpeg.get(quality)
+        if data is None:
+            with self._lock:
+                data = self._jpeg.get(quality)
+                if data is None:
+                    data = self._jpeg[quality] = frame_to_jpeg(self.frame, quality)
+        return data
+
+
 def frame_to_base64(frame: np.ndarray, quality: int = 85) -> str:
     """Convert frame to base64 encoded JPEG"""
     import base64
@@ -218,22 +664,5 @@ def frame_to_base64(frame: np.ndarray, quality: int = 85) -> str:
 def add_timestamp_overlay(frame: np.ndarray) -> np.ndarray:
     """Add timestamp overlay to frame"""
     annotated = frame.copy()
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    
-    # Add semi-transparent background
-    overlay = annotated.copy()
-    cv2.rectangle(overlay, (10, frame.shape[0] - 40), (250, frame.shape[0] - 10), (0, 0, 0), -1)
-    cv2.addWeighted(overlay, 0.5, annotated, 0.5, 0, annotated)
-    
-    # Add timestamp text
-    cv2.putText(
-        annotated,
-        timestamp,
-        (15, frame.shape[0] - 18),
-        cv2.FONT_HERSHEY_SIMPLEX,
-        0.6,
-        (255, 255, 255),
-        1
-    )
-    
+    draw_timestamp(annotated)
     return annotated
@@ -0,0 +1,247 @@
+"""
+Camera Registry
+Owns one VideoProcessor, broadcaster and detection pipeline per camera
+"""
+from dataclasses import dataclass
+from typing import Optional, List, Dict, Any
+
+from .detector import WeaponDetector
+from .processor import VideoProcessor, MotionGate
+from .broadcaster import StreamBroadcaster
+from .pipeline import DetectionPipeline, DetectionCallback
+from .batching import BatchInferenceService
+from .scheduler import InferenceScheduler
+from .tracker import ObjectTracker
+from .suppression import EventSuppressor
+from .multiprocess import SharedMemoryVideoSource, ProcessInferencePool
+from .executors import StageExecutors
+from .timing import StageLatency
+
+
+@dataclass
+class Camera:
+    """A registered camera and its processing components"""
+    id: str
+    name: str
+    processor: VideoProcessor | SharedMemoryVideoSource
+    broadcaster: StreamBroadcaster
+    pipeline: DetectionPipeline
+    enabled: bool = True
+
+    @property
+    def is_running(self) -> bool:
+        return self.pipeline.is_running
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "enabled": self.enabled,
+            "is_running": self.is_running,
+            "video": self.processor.get_status(),
+            "pipeline": self.pipeline.get_status(),
+            "stream": self.broadcaster.get_status()
+        }
+
+
+class CameraRegistry:
+    """
+    Registry of cameras, each with its own capture-and-detect pipeline.
+
+    Cameras can be added, started and stopped at runtime; the detector is
+    shared by every pipeline.
+    """
+
+    def __init__(
+        self,
+        detector: WeaponDetector,
+        on_detections: Optional[DetectionCallback] = None,
+        jpeg_quality: int = 80,
+        batcher: Optional[BatchInferenceService | ProcessInferencePool] = None,
+        scheduler: Optional[InferenceScheduler] = None,
+        tracker_options: Optional[Dict[str, Any]] = None,
+        suppression_options: Optional[Dict[str, Any]] = None,
+        process_mode: str = "inprocess",
+        ring_slots: int = 8,
+        executors: Optional[StageExecutors] = None
+    ):
+        """
+        Initialize the registry
+
+        Args:
+            detector: Weapon detector shared by all cameras
+            on_detections: Async hook invoked by every pipeline on detections
+            jpeg_quality: JPEG quality of streamed frames
+            batcher: Cross-camera batching service (or inference process pool)
+                shared by all pipelines
+            scheduler: Adaptive inference-rate scheduler shared by all pipelines
+            tracker_options: ObjectTracker arguments; each camera gets its own
+                tracker, or none if None
+            suppression_options: EventSuppressor arguments; each camera gets
+                its own suppressor, or none if None
+            process_mode: "inprocess" captures in this process; "multiprocess"
+                captures each camera in a child process via shared memory
+            ring_slots: Shared-memory frames per camera in multiprocess mode
+            executors: Thread pools for blocking capture, inference and
+                render/encode calls, shared by all pipelines
+        """
+        if process_mode not in ("inprocess", "multiprocess"):
+            raise ValueError(f"Unknown process mode: {process_mode}")
+
+        self.detector = detector
+        self.batcher = batcher
+        self.scheduler = scheduler
+        self.tracker_options = tracker_options
+        self.suppression_options = suppression_options
+        self.process_mode = process_mode
+        self.ring_slots = ring_slots
+        self.executors = executors
+        self.on_detections = on_detections
+        self.jpeg_quality = jpeg_quality
+        self._cameras: Dict[str, Camera] = {}
+
+    def __contains__(self, camera_id: str) -> bool:
+        return camera_id in self._cameras
+
+    def __len__(self) -> int:
+        return len(self._cameras)
+
+    @property
+    def cameras(self) -> List[Camera]:
+        return list(self._cameras.values())
+
+    @property
+    def default_camera(self) -> Optional[Camera]:
+        """First registered camera (served by the legacy /ws/stream endpoint)"""
+        return next(iter(self._cameras.values()), None)
+
+    def get(self, camera_id: str) -> Optional[Camera]:
+        return self._cameras.get(camera_id)
+
+    def add_camera(
+        self,
+        camera_id: str,
+        source: str | int = 0,
+        name: str = "",
+        frame_width: int = 640,
+        frame_height: int = 480,
+        fps: int = 30,
+        enabled: bool = True,
+        motion_gate: bool = True,
+        motion_threshold: float = 0.002,
+        motion_force_interval: float = 2.0
+    ) -> Camera:
+        """
+        Register a camera
+
+        Args:
+            camera_id: Unique camera identifier
+            source: Video source (webcam index, file path or stream URL)
+            name: Human-readable location, defaults to the id
+            frame_width: Target frame width
+            frame_height: Target frame height
+            fps: Target frames per second
+            enabled: Whether start_all() should start this camera
+            motion_gate: Only run inference on frames with motion
+            motion_threshold: Fraction of changed pixels that counts as motion
+            motion_force_interval: Max seconds between inferences without motion
+        """
+        if camera_id in self._cameras:
+            raise ValueError(f"Camera already registered: {camera_id}")
+
+        name = name or camera_id
+        if self.process_mode == "multiprocess":
+            processor = SharedMemoryVideoSource(
+                source=source,
+                frame_width=frame_width,
+                frame_height=frame_height,
+                target_fps=fps,
+                ring_slots=self.ring_slots
+            )
+        else:
+            processor = VideoProcessor(
+                source=source,
+                frame_width=frame_width,
+                frame_height=frame_height,
+                target_fps=fps,
+                executors=self.executors
+            )
+        latency = StageLatency()
+        broadcaster = StreamBroadcaster(latency=latency)
+        pipeline = DetectionPipeline(
+            processor=processor,
+            detector=self.detector,
+            broadcaster=broadcaster,
+            on_detections=self.on_detections,
+            jpeg_quality=self.jpeg_quality,
+            camera_id=camera_id,
+            camera_name=name,
+            executors=self.executors,
+            latency=latency,
+            batcher=self.batcher,
+            scheduler=self.scheduler,
+            tracker=ObjectTracker(
+                **self.tracker_options
+            ) if self.tracker_options is not None else None,
+            suppressor=EventSuppressor(
+                **self.suppression_options
+            ) if self.suppression_options is not None else None,
+            motion_gate=MotionGate(
+                threshold=motion_threshold,
+                force_interval=motion_force_interval
+            ) if motion_gate else None
+        )
+
+        camera = Camera(
+            id=camera_id,
+            name=name,
+            processor=processor,
+            broadcaster=broadcaster,
+            pipeline=pipeline,
+            enabled=enabled
+        )
+        self._cameras[camera_id] = camera
+        print(f"📷 Camera registered: {camera_id} ({source})")
+        return camera
+
+    async def remove_camera(self, camera_id: str) -> bool:
+        """Stop and unregister a camera"""
+        camera = self._cameras.pop(camera_id, None)
+        if camera is None:
+            return False
+        await camera.pipeline.stop()
+        return True
+
+    def start(self, camera_id: str) -> bool:
+        """Start a camera's pipeline; returns False if it could not be opened"""
+        camera = self._cameras.get(camera_id)
+        if camera is None:
+            return False
+        camera.enabled = True
+        return camera.pipeline.start()
+
+    async def stop(self, camera_id: str) -> bool:
+        """Stop a camera's pipeline and release its source"""
+        camera = self._cameras.get(camera_id)
+        if camera is None:
+            return False
+        camera.enabled = False
+        await camera.pipeline.stop()
+        return True
+
+    def start_all(self):
+        """Start every enabled camera"""
+        for camera in self._cameras.values():
+            if camera.enabled and not camera.pipeline.start():
+                print(f"⚠️ Camera {camera.id} failed to start")
+
+    async def stop_all(self):
+        """Stop every camera"""
+        for camera in self._cameras.values():
+            await camera.pipeline.stop()
+        if self.batcher:
+            await self.batcher.stop()
+
+    def get_status(self) -> List[Dict[str, Any]]:
+        """Status of every camera"""
+        return [camera.get_status() for camera in self._cameras.values()]
@@ -0,0 +1,168 @@
+"""
+Frame Renderer
+Draws detection boxes, labels and the timestamp into a reusable buffer in a
+single pass, blending only the regions that change
+"""
+import cv2
+import numpy as np
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from .detector import Detection
+
+
+# Color scheme for different weapons
+COLORS = {
+    "gun": (0, 0, 255),      # Red
+    "knife": (0, 165, 255),   # Orange
+    "rifle": (0, 0, 200),     # Dark Red
+    "pistol": (0, 100, 255),  # Red-Orange
+}
+DEFAULT_COLOR = (0, 255, 0)
+
+
+def _clip_box(bbox: Tuple[int, int, int, int], shape) -> Tuple[int, int, int, int]:
+    """Clip a box to the image so it can be used as a slice"""
+    height, width = shape[:2]
+    x1, y1, x2, y2 = bbox
+    return (
+        min(max(x1, 0), width), min(max(y1, 0), height),
+        min(max(x2, 0), width), min(max(y2, 0), height)
+    )
+
+
+def draw_detections(
+    image: np.ndarray,
+    detections: List[Detection],
+    show_confidence: bool = True,
+    scratch: Optional[np.ndarray] = None
+):
+    """
+    Draw detection boxes and labels on an image in place
+
+    Args:
+        image: BGR image to draw on
+        detections: List of detections to draw
+        show_confidence: Whether to show confidence scores
+        scratch: Buffer of the image's shape for the tint fill; a box-sized
+            one is allocated per detection if None
+    """
+    for det in detections:
+        x1, y1, x2, y2 = det.bbox
+        color = COLORS.get(det.class_name, DEFAULT_COLOR)
+
+        # Warning tint, blended over the box region only
+        cx1, cy1, cx2, cy2 = _clip_box(det.bbox, image.shape)
+        if cx2 > cx1 and cy2 > cy1:
+            roi = image[cy1:cy2, cx1:cx2]
+            if scratch is not None:
+                fill = scratch[cy1:cy2, cx1:cx2]
+            else:
+                fill = np.empty_like(roi)
+            fill[:] = color
+            cv2.addWeighted(fill, 0.1, roi, 0.9, 0, dst=roi)
+
+        # Draw bounding box
+        cv2.rectangle(image, (x1, y1), (x2, y2), color, 3)
+
+        # Prepare label
+        label = f"⚠️ {det.class_name.upper()}"
+        if show_confidence:
+            label += f" {det.confidence:.1%}"
+
+        # Draw label background
+        (label_w, label_h), _ = cv2.getTextSize(
+            label, cv2.FONT_HERSHEY_SIMPLEX, 0.7, 2
+        )
+        cv2.rectangle(
+            image,
+            (x1, y1 - label_h - 10),
+            (x1 + label_w + 10, y1),
+            color,
+            -1
+        )
+
+        # Draw label text
+        cv2.putText(
+            image,
+            label,
+            (x1 + 5, y1 - 5),
+            cv2.FONT_HERSHEY_SIMPLEX,
+            0.7,
+            (255, 255, 255),
+            2
+        )
+
+    # Add detection count if any weapons found
+    if detections:
+        warning_text = f"🚨 WEAPON DETECTED: {len(detections)}"
+        cv2.putText(
+            image,
+            warning_text,
+            (10, 30),
+            cv2.FONT_HERSHEY_SIMPLEX,
+            1,
+            (0, 0, 255),
+            2
+        )
+
+
+def draw_timestamp(image: np.ndarray, timestamp: Optional[datetime] = None):
+    """Draw the timestamp box in the bottom-left corner in place"""
+    text = (timestamp or datetime.now()).strftime("%Y-%m-%d %H:%M:%S")
+    height = image.shape[0]
+
+    # Semi-transparent black background: halve the region's brightness
+    x1, y1, x2, y2 = _clip_box((10, height - 40, 250, height - 10), image.shape)
+    if x2 > x1 and y2 > y1:
+        roi = image[y1:y2, x1:x2]
+        cv2.addWeighted(roi, 0.5, roi, 0, 0, dst=roi)
+
+    # Add timestamp text
+    cv2.putText(
+        image,
+        text,
+        (15, height - 18),
+        cv2.FONT_HERSHEY_SIMPLEX,
+        0.6,
+        (255, 255, 255),
+        1
+    )
+
+
+class FrameRenderer:
+    """
+    Renders annotated frames into a preallocated buffer.
+
+    The returned array is reused by the next render() call; copy it if it
+    must outlive the current frame (e.g. for evidence).
+    """
+
+    def __init__(self, show_confidence: bool = True, show_timestamp: bool = True):
+        self.show_confidence = show_confidence
+        self.show_timestamp = show_timestamp
+        self._buffer: Optional[np.ndarray] = None
+        self._scratch: Optional[np.ndarray] = None
+
+    def _ensure_buffers(self, frame: np.ndarray):
+        if self._buffer is None or self._buffer.shape != frame.shape or self._buffer.dtype != frame.dtype:
+            self._buffer = np.empty_like(frame)
+            self._scratch = np.empty_like(frame)
+
+    def render(self, frame: np.ndarray, detections: List[Detection]) -> np.ndarray:
+        """
+        Draw detections and timestamp over a frame
+
+        Args:
+            frame: Original BGR frame (left untouched)
+            detections: Detections to draw
+
+        Returns:
+            Annotated frame (internal buffer)
+        """
+        self._ensure_buffers(frame)
+        np.copyto(self._buffer, frame)
+        draw_detections(self._buffer, detections, self.show_confidence, self._scratch)
+        if self.show_timestamp:
+            draw_timestamp(self._buffer)
+        return self._buffer
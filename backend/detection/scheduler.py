@@ -0,0 +1,163 @@
+"""
+Adaptive Inference Scheduler
+Decouples display FPS from inference FPS by choosing, per camera, how often
+to run detection so total inference time stays within a CPU budget
+"""
+import math
+import time
+from dataclasses import dataclass
+from typing import Dict, Any, Optional
+
+from .detector import WeaponDetector
+
+
+@dataclass
+class _CameraSchedule:
+    fps: float
+    interval: int = 1
+    frames_since_inference: int = 0
+    frames_seen: int = 0
+    frames_inferred: int = 0
+    active_until: float = 0.0
+
+
+class InferenceScheduler:
+    """
+    Chooses an inference interval (run detection every Nth frame) per camera.
+
+    The detector's measured per-frame latency gives the number of inferences
+    per second the CPU budget can afford. Cameras with an active detection are
+    served first at full rate; the remaining capacity is spread evenly over
+    idle cameras, down to one inference every ``max_interval`` frames.
+    """
+
+    def __init__(
+        self,
+        detector: WeaponDetector,
+        cpu_budget: float = 1.0,
+        max_interval: int = 10,
+        active_hold_seconds: float = 3.0,
+        update_interval: float = 0.5
+    ):
+        """
+        Initialize the scheduler
+
+        Args:
+            detector: Detector whose measured latency drives the schedule
+            cpu_budget: CPU cores' worth of inference time allowed per second
+            max_interval: Longest allowed gap between inferences, in frames
+            active_hold_seconds: Full-rate period after a camera detects something
+            update_interval: Seconds between schedule recomputations
+        """
+        self.detector = detector
+        self.cpu_budget = cpu_budget
+        self.max_interval = max(1, max_interval)
+        self.active_hold_seconds = active_hold_seconds
+        self.update_interval = update_interval
+
+        self._cameras: Dict[str, _CameraSchedule] = {}
+        self._last_update = 0.0
+
+    def register(self, camera_id: str, fps: float):
+        """Add a camera running at roughly `fps` frames per second"""
+        # Start due so the first frame is inferred immediately
+        self._cameras[camera_id] = _CameraSchedule(
+            fps=max(float(fps), 1.0),
+            frames_since_inference=self.max_interval
+        )
+        self._last_update = 0.0
+
+    def unregister(self, camera_id: str):
+        """Remove a camera from the schedule"""
+        self._cameras.pop(camera_id, None)
+        self._last_update = 0.0
+
+    def _is_active(self, schedule: _CameraSchedule, now: float) -> bool:
+        return now < schedule.active_until
+
+    def _update(self, now: float):
+        """Recompute every camera's interval from latency and budget"""
+        self._last_update = now
+        latency = self.detector.avg_frame_latency
+        if latency <= 0:
+            # Nothing measured yet: run every frame until we know the cost
+            for schedule in self._cameras.values():
+                schedule.interval = 1
+            return
+
+        capacity = self.cpu_budget / latency  # inferences per second
+        active = [s for s in self._cameras.values() if self._is_active(s, now)]
+        idle = [s for s in self._cameras.values() if not self._is_active(s, now)]
+
+        active_demand = sum(s.fps for s in active)
+        if active_demand >= capacity:
+            active_interval = min(math.ceil(active_demand / capacity), self.max_interval)
+            idle_interval = self.max_interval
+        else:
+            active_interval = 1
+            remaining = capacity - active_demand
+            idle_demand = sum(s.fps for s in idle)
+            idle_interval = math.ceil(idle_demand / remaining) if idle_demand else 1
+            idle_interval = min(max(idle_interval, 1), self.max_interval)
+
+        for schedule in active:
+            schedule.interval = active_interval
+        for schedule in idle:
+            schedule.interval = idle_interval
+
+    def is_due(self, camera_id: str) -> bool:
+        """Count a frame and say whether it should be inferred"""
+        schedule = self._cameras.get(camera_id)
+        if schedule is None:
+            return True
+
+        now = time.monotonic()
+        if now - self._last_update >= self.update_interval:
+            self._update(now)
+
+        schedule.frames_seen += 1
+        schedule.frames_since_inference += 1
+        return schedule.frames_since_inference >= schedule.interval
+
+    def mark_inferred(self, camera_id: str, detected: bool = False):
+        """Record that a frame was inferred and whether it found anything"""
+        schedule = self._cameras.get(camera_id)
+        if schedule is None:
+            return
+
+        schedule.frames_since_inference = 0
+        schedule.frames_inferred += 1
+        if detected:
+            became_active = not self._is_active(schedule, time.monotonic())
+            schedule.active_until = time.monotonic() + self.active_hold_seconds
+            if became_active:
+                # Switch to full rate immediately instead of at the next update
+                self._last_update = 0.0
+
+    def get_camera_status(self, camera_id: str) -> Optional[Dict[str, Any]]:
+        """Schedule of a single camera"""
+        schedule = self._cameras.get(camera_id)
+        if schedule is None:
+            return None
+        return {
+            "interval": schedule.interval,
+            "inference_fps": round(schedule.fps / schedule.interval, 1),
+            "active": self._is_active(schedule, time.monotonic()),
+            "frames_seen": schedule.frames_seen,
+            "frames_inferred": schedule.frames_inferred
+        }
+
+    def get_status(self) -> Dict[str, Any]:
+        """Budget, measured latency and per-camera intervals"""
+        latency = self.detector.avg_frame_latency
+        planned = sum(s.fps / s.interval for s in self._cameras.values())
+        return {
+            "cpu_budget": self.cpu_budget,
+            "max_interval": self.max_interval,
+            "avg_frame_latency_ms": round(latency * 1000.0, 2),
+            "planned_inference_fps": round(planned, 1),
+            "planned_cpu_load": round(planned * latency, 2),
+            "cameras": {
+                camera_id: self.get_camera_status(camera_id) for camera_id in self._cameras
+            }
+        }
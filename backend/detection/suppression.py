@@ -0,0 +1,119 @@
+"""
+Detection Event Suppression
+Decides which detections are new events (worth an alert and evidence save)
+per class and per track / spatial region, on wall-clock time
+"""
+import time
+import numpy as np
+from dataclasses import dataclass
+from typing import List, Dict, Tuple, Optional, Any
+
+from .detector import Detection
+from .backends import box_iou
+
+
+@dataclass
+class _RecentEvent:
+    bbox: Tuple[int, int, int, int]
+    track_id: Optional[int]
+    emitted_at: float
+
+
+class EventSuppressor:
+    """
+    Filters detections down to new events.
+
+    A detection is suppressed while an event of the same class was emitted
+    less than ``cooldown_seconds`` ago for the same track, or for an
+    overlapping region (IoU >= ``region_iou``). Suppressed detections keep
+    the remembered region following the object, so a moving object stays
+    one event.
+    """
+
+    def __init__(self, cooldown_seconds: float = 5.0, region_iou: float = 0.3):
+        """
+        Initialize the suppressor
+
+        Args:
+            cooldown_seconds: Minimum time between events for the same object
+            region_iou: Overlap with a recent event's box that counts as the same object
+        """
+        self.cooldown_seconds = cooldown_seconds
+        self.region_iou = region_iou
+
+        self._recent: Dict[str, List[_RecentEvent]] = {}  # Per class
+        self.events_emitted = 0
+        self.events_suppressed = 0
+
+    def reset(self):
+        """Forget all recent events"""
+        self._recent = {}
+
+    def _expire(self, now: float):
+        for class_name in list(self._recent):
+            events = [
+                event for event in self._recent[class_name]
+                if now - event.emitted_at < self.cooldown_seconds
+            ]
+            if events:
+                self._recent[class_name] = events
+            else:
+                del self._recent[class_name]
+
+    def _match(self, detection: Detection, events: List[_RecentEvent]) -> Optional[_RecentEvent]:
+        """Recent event for the same track or overlapping region, if any"""
+        if not events:
+            return None
+
+        if detection.track_id is not None:
+            for event in events:
+                if event.track_id == detection.track_id:
+                    return event
+
+        iou = box_iou(
+            np.array([detection.bbox], dtype=np.float32),
+            np.array([event.bbox for event in events], dtype=np.float32)
+        )[0]
+        best = int(np.argmax(iou))
+        return events[best] if iou[best] >= self.region_iou else None
+
+    def filter(self, detections: List[Detection]) -> List[Detection]:
+        """
+        Select the detections that are new events
+
+        Args:
+            detections: Detections of one frame from a single camera
+
+        Returns:
+            Detections that should raise an event
+        """
+        if not detections:
+            return []
+
+        now = time.monotonic()
+        self._expire(now)
+
+        new_events = []
+        for detection in detections:
+            events = self._recent.setdefault(detection.class_name, [])
+            event = self._match(detection, events)
+            if event is not None:
+                event.bbox = detection.bbox
+                if detection.track_id is not None:
+                    event.track_id = detection.track_id
+                self.events_suppressed += 1
+                continue
+
+            events.append(_RecentEvent(detection.bbox, detection.track_id, now))
+            self.events_emitted += 1
+            new_events.append(detection)
+
+        return new_events
+
+    def get_status(self) -> Dict[str, Any]:
+        """Event counters"""
+        return {
+            "cooldown_seconds": self.cooldown_seconds,
+            "events_emitted": self.events_emitted,
+            "events_suppressed": self.events_suppressed
+        }
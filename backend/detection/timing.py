@@ -0,0 +1,132 @@
+"""
+Frame Timing
+Monotonic per-stage timestamps, latency histograms and an instantaneous
+(exponentially weighted) FPS meter
+"""
+import time
+import bisect
+from typing import Dict, Any, Optional, Sequence, Tuple
+
+
+# Pipeline stages in the order a frame passes through them. Each stage's
+# latency is the time since the previous stage the frame recorded.
+STAGES = ("grab", "decode", "resize", "infer", "annotate", "encode", "send")
+
+# Upper bucket bounds in milliseconds (a final +Inf bucket is implicit)
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+
+def now() -> float:
+    """Monotonic clock shared by every stage (and, on Linux, every process)"""
+    return time.monotonic()
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram in milliseconds"""
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS_MS):
+        self.buckets: Tuple[float, ...] = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value_ms: float):
+        self.counts[bisect.bisect_left(self.buckets, value_ms)] += 1
+        self.count += 1
+        self.sum += value_ms
+        self.max = max(self.max, value_ms)
+
+    def percentile(self, q: float) -> float:
+        """Bucket upper bound below which a fraction q of samples fall"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, bucket_count in zip(self.buckets, self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                return float(bound)
+        return self.max
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "avg_ms": round(self.sum / self.count, 2) if self.count else 0.0,
+            "p50_ms": self.percentile(0.50),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "max_ms": round(self.max, 2),
+            "buckets": {
+                **{str(bound): count for bound, count in zip(self.buckets, self.counts)},
+                "+Inf": self.counts[-1]
+            }
+        }
+
+
+class StageLatency:
+    """Per-stage and end-to-end latency histograms for one camera"""
+
+    def __init__(self):
+        self.stages: Dict[str, LatencyHistogram] = {stage: LatencyHistogram() for stage in STAGES}
+        self.end_to_end = LatencyHistogram()
+
+    def record(self, stamps: Dict[str, float]):
+        """Record the stage durations of one frame from its timestamps"""
+        previous: Optional[float] = None
+        for stage in STAGES:
+            stamp = stamps.get(stage)
+            if stamp is None:
+                continue  # Stage skipped (e.g. no inference on this frame)
+            if previous is not None:
+                self.stages[stage].observe((stamp - previous) * 1000.0)
+            previous = stamp
+
+    def record_send(self, stamps: Dict[str, float], sent_at: Optional[float] = None):
+        """Record delivery of an encoded frame to one viewer"""
+        sent_at = now() if sent_at is None else sent_at
+        if "encode" in stamps:
+            self.stages["send"].observe((sent_at - stamps["encode"]) * 1000.0)
+        if "grab" in stamps:
+            self.end_to_end.observe((sent_at - stamps["grab"]) * 1000.0)
+
+    def get_status(self) -> Dict[str, Any]:
+        """Latency summary per stage; the slowest stage is the bottleneck"""
+        stages = {
+            stage: histogram.get_status()
+            for stage, histogram in self.stages.items() if histogram.count
+        }
+        bottleneck = max(stages, key=lambda stage: stages[stage]["avg_ms"], default=None)
+        return {
+            "stages": stages,
+            "end_to_end": self.end_to_end.get_status(),
+            "bottleneck": bottleneck
+        }
+
+
+class EwmaFps:
+    """Instantaneous frame rate: exponentially weighted frame intervals"""
+
+    def __init__(self, alpha: float = 0.1):
+        self.alpha = alpha
+        self.fps = 0.0
+        self._interval = 0.0
+        self._last: Optional[float] = None
+
+    def tick(self, timestamp: Optional[float] = None) -> float:
+        """Count a frame and return the current rate"""
+        timestamp = now() if timestamp is None else timestamp
+        if self._last is not None:
+            interval = timestamp - self._last
+            if self._interval <= 0:
+                self._interval = interval
+            else:
+                self._interval += self.alpha * (interval - self._interval)
+            self.fps = 1.0 / self._interval if self._interval > 0 else 0.0
+        self._last = timestamp
+        return self.fps
+
+    def reset(self):
+        self.fps = 0.0
+        self._interval = 0.0
+        self._last = None
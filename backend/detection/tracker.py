@@ -0,0 +1,209 @@
+"""
+Lightweight Multi-Object Tracker
+SORT-style tracking (constant-velocity Kalman filter + IoU association) in
+pure NumPy, so boxes persist between inference frames and each object
+produces a single "track started" event
+"""
+import time
+import itertools
+import numpy as np
+from dataclasses import replace
+from typing import List, Optional, Tuple, Dict, Any
+
+from .detector import Detection
+from .backends import box_iou
+
+
+def _bbox_to_z(bbox) -> np.ndarray:
+    """(x1, y1, x2, y2) → measurement (cx, cy, area, aspect)"""
+    x1, y1, x2, y2 = bbox
+    w, h = max(x2 - x1, 1.0), max(y2 - y1, 1.0)
+    return np.array([x1 + w / 2.0, y1 + h / 2.0, w * h, w / h], dtype=np.float64)
+
+
+def _x_to_bbox(x: np.ndarray) -> Tuple[int, int, int, int]:
+    """State (cx, cy, area, aspect, ...) → integer (x1, y1, x2, y2)"""
+    area, aspect = max(x[2], 1.0), max(x[3], 1e-3)
+    w = np.sqrt(area * aspect)
+    h = area / w
+    return (
+        int(round(x[0] - w / 2.0)), int(round(x[1] - h / 2.0)),
+        int(round(x[0] + w / 2.0)), int(round(x[1] + h / 2.0))
+    )
+
+
+class KalmanBoxTrack:
+    """A single tracked box with a constant-velocity Kalman filter"""
+
+    # State: cx, cy, area, aspect, vx, vy, v_area
+    _F = np.eye(7)
+    _F[0, 4] = _F[1, 5] = _F[2, 6] = 1.0
+    _H = np.eye(4, 7)
+    _R = np.diag([1.0, 1.0, 10.0, 10.0])
+    _Q = np.diag([1.0, 1.0, 1.0, 1.0, 0.01, 0.01, 0.0001])
+
+    def __init__(self, track_id: int, detection: Detection):
+        self.track_id = track_id
+        self.detection = detection
+
+        self.x = np.zeros(7)
+        self.x[:4] = _bbox_to_z(detection.bbox)
+        self.P = np.diag([10.0, 10.0, 10.0, 10.0, 10000.0, 10000.0, 10000.0])
+
+        self.hits = 1
+        self.misses = 0  # Consecutive inference frames without a match
+        self.confirmed = False
+        self.last_update = time.monotonic()
+
+    @property
+    def bbox(self) -> Tuple[int, int, int, int]:
+        return _x_to_bbox(self.x)
+
+    def predict(self):
+        """Advance the state by one frame"""
+        if self.x[2] + self.x[6] <= 0:
+            self.x[6] = 0.0
+        self.x = self._F @ self.x
+        self.P = self._F @ self.P @ self._F.T + self._Q
+
+    def update(self, detection: Detection):
+        """Correct the state with a matched detection"""
+        y = _bbox_to_z(detection.bbox) - self._H @ self.x
+        S = self._H @ self.P @ self._H.T + self._R
+        K = self.P @ self._H.T @ np.linalg.inv(S)
+        self.x = self.x + K @ y
+        self.P = (np.eye(7) - K @ self._H) @ self.P
+
+        self.detection = detection
+        self.hits += 1
+        self.misses = 0
+        self.last_update = time.monotonic()
+
+    def as_detection(self) -> Detection:
+        """Latest detection with the filtered box and track id"""
+        return replace(self.detection, bbox=self.bbox, track_id=self.track_id)
+
+
+class ObjectTracker:
+    """
+    Tracks detections of one camera across frames.
+
+    Call step() once per displayed frame: with the detector output on
+    inference frames, or with None on skipped frames to coast boxes forward.
+    """
+
+    _ids = itertools.count(1)  # Track ids are unique across cameras
+
+    def __init__(
+        self,
+        iou_threshold: float = 0.3,
+        max_missed: int = 3,
+        min_hits: int = 1,
+        max_coast_seconds: float = 2.0
+    ):
+        """
+        Initialize the tracker
+
+        Args:
+            iou_threshold: Minimum IoU to associate a detection with a track
+            max_missed: Inference frames a track may go unmatched before removal
+            min_hits: Matches needed before a track is confirmed (and reported)
+            max_coast_seconds: Drop tracks not updated for this long
+        """
+        self.iou_threshold = iou_threshold
+        self.max_missed = max_missed
+        self.min_hits = max(1, min_hits)
+        self.max_coast_seconds = max_coast_seconds
+
+        self._tracks: List[KalmanBoxTrack] = []
+        self.tracks_started = 0
+
+    def reset(self):
+        """Drop every track"""
+        self._tracks = []
+
+    def _associate(self, detections: List[Detection]) -> Tuple[List[Tuple[int, int]], List[int]]:
+        """Greedy same-class IoU matching; returns (track, detection) pairs and unmatched detections"""
+        if not self._tracks or not detections:
+            return [], list(range(len(detections)))
+
+        iou = box_iou(
+            np.array([track.bbox for track in self._tracks], dtype=np.float32),
+            np.array([det.bbox for det in detections], dtype=np.float32)
+        )
+        track_classes = np.array([track.detection.class_name for track in self._tracks])
+        det_classes = np.array([det.class_name for det in detections])
+        iou[track_classes[:, None] != det_classes[None, :]] = 0.0
+
+        matches = []
+        used_tracks, used_dets = set(), set()
+        for flat in np.argsort(-iou, axis=None):
+            t, d = np.unravel_index(flat, iou.shape)
+            if iou[t, d] < self.iou_threshold:
+                break
+            if t in used_tracks or d in used_dets:
+                continue
+            used_tracks.add(t)
+            used_dets.add(d)
+            matches.append((int(t), int(d)))
+
+        unmatched = [d for d in range(len(detections)) if d not in used_dets]
+        return matches, unmatched
+
+    def step(
+        self,
+        detections: Optional[List[Detection]] = None
+    ) -> Tuple[List[Detection], List[Detection]]:
+        """
+        Advance tracks by one frame
+
+        Args:
+            detections: Detector output, or None if inference was skipped
+
+        Returns:
+            (boxes to render, detections of newly started tracks)
+        """
+        for track in self._tracks:
+            track.predict()
+
+        started: List[Detection] = []
+
+        if detections is not None:
+            matches, unmatched = self._associate(detections)
+            matched_tracks = set()
+
+            for t, d in matches:
+                self._tracks[t].update(detections[d])
+                matched_tracks.add(t)
+
+            for t, track in enumerate(self._tracks):
+                if t not in matched_tracks:
+                    track.misses += 1
+
+            for d in unmatched:
+                self._tracks.append(KalmanBoxTrack(next(self._ids), detections[d]))
+
+            # Confirm tracks that reached min_hits; each is reported exactly once
+            for track in self._tracks:
+                if not track.confirmed and track.hits >= self.min_hits:
+                    track.confirmed = True
+                    self.tracks_started += 1
+                    started.append(track.as_detection())
+
+        now = time.monotonic()
+        self._tracks = [
+            track for track in self._tracks
+            if track.misses <= self.max_missed
+            and now - track.last_update <= self.max_coast_seconds
+        ]
+
+        boxes = [track.as_detection() for track in self._tracks if track.confirmed]
+        return boxes, started
+
+    def get_status(self) -> Dict[str, Any]:
+        """Active and total tracks"""
+        return {
+            "active_tracks": sum(1 for track in self._tracks if track.confirmed),
+            "tentative_tracks": sum(1 for track in self._tracks if not track.confirmed),
+            "tracks_started": self.tracks_started
+        }
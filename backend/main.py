@@ -2,25 +2,31 @@
 Smart Surveillance System - FastAPI Backend Server
 Main entry point with WebSocket streaming and REST API
 """
+import json
 import asyncio
 import cv2
 import numpy as np
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Set
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import Response, JSONResponse
+from fastapi.responses import Response, JSONResponse, PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 
 from config import get_config, reload_config
-from detection import WeaponDetector
-from detection.processor import VideoProcessor, frame_to_jpeg, add_timestamp_overlay
+from detection import (
+    WeaponDetector, Detection, DetectionPipeline, CameraRegistry,
+    BatchInferenceService, InferenceScheduler, ProcessInferencePool,
+    StageExecutors, LoopLagMonitor, EncodedFrame
+)
+from detection.processor import FrameData
 from alerts import AlertManager
 from storage import EvidenceManager
+from metrics import REGISTRY, CONTENT_TYPE, DETECTIONS, camera_metrics
 
 
 # ============================================================================
@@ -46,17 +52,106 @@ class AppState:
     """Global application state"""
     def __init__(self):
         self.detector: Optional[WeaponDetector] = None
-        self.processor: Optional[VideoProcessor] = None
+        self.batcher: Optional[BatchInferenceService | ProcessInferencePool] = None
+        self.scheduler: Optional[InferenceScheduler] = None
+        self.executors: Optional[StageExecutors] = None
+        self.loop_monitor: Optional[LoopLagMonitor] = None
+        self.cameras: Optional[CameraRegistry] = None
         self.alert_manager: Optional[AlertManager] = None
         self.evidence_manager: Optional[EvidenceManager] = None
-        self.is_streaming = False
-        self.connected_clients: List[WebSocket] = []
+        self.alert_tasks: Set[asyncio.Task] = set()  # Alerts still being sent
         self.detection_count = 0
         self.start_time: Optional[datetime] = None
 
+    @property
+    def is_streaming(self) -> bool:
+        return self.cameras is not None and any(
+            camera.is_running for camera in self.cameras.cameras
+        )
+
+    @property
+    def connected_clients(self) -> int:
+        if self.cameras is None:
+            return 0
+        return sum(camera.broadcaster.client_count for camera in self.cameras.cameras)
+
 state = AppState()
 
 
+# ============================================================================
+# Detection Handling
+# ============================================================================
+
+async def handle_detections(
+    pipeline: DetectionPipeline,
+    frame_data: FrameData,
+    annotated_frame: EncodedFrame,
+    detections: List[Detection]
+):
+    """
+    Save evidence and dispatch alerts once per detection
+    
+    Awaited by the camera's pipeline, so only the evidence write happens
+    inline; alerts are sent in the background.
+    """
+    state.detection_count += len(detections)
+    
+    # Every detection of this frame shares one encode per quality. Pooled
+    # capture buffers are recycled when the pipeline moves on, so keep a copy
+    frame = frame_data.frame if frame_data.buffer is None else frame_data.frame.copy()
+    original = EncodedFrame(frame)
+    
+    for detection in detections:
+        DETECTIONS.labels(pipeline.camera_id, detection.class_name).inc()
+        
+        # Save evidence
+        evidence_id = await state.evidence_manager.save_detection(
+            frame=original,
+            annotated_frame=annotated_frame,
+            weapon_type=detection.class_name,
+            confidence=detection.confidence,
+            bbox=detection.bbox,
+            location=pipeline.camera_name,
+            camera_id=pipeline.camera_id
+        )
+        
+        # Trigger alert
+        if evidence_id:
+            evidence_path = str(
+                Path(state.evidence_manager.base_path) / 
+                "annotated" / f"{evidence_id}_annotated.jpg"
+            )
+            # Attach the bytes just written instead of reading the file back
+            image = None
+            if state.evidence_manager.save_annotated:
+                image = annotated_frame.jpeg(state.evidence_manager.jpeg_quality)
+            dispatch_alert(
+                weapon_type=detection.class_name,
+                confidence=detection.confidence,
+                location=pipeline.camera_name,
+                evidence_path=evidence_path,
+                camera_id=pipeline.camera_id,
+                image=image
+            )
+
+
+def dispatch_alert(**alert):
+    """Send an alert without holding up the pipeline that detected it"""
+    task = asyncio.create_task(state.alert_manager.trigger_alert(**alert))
+    state.alert_tasks.add(task)
+    task.add_done_callback(_on_alert_sent)
+
+
+def _on_alert_sent(task: asyncio.Task):
+    state.alert_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        print(f"❌ Alert dispatch failed: {task.exception()}")
+
+
+def collect_camera_metrics():
+    return camera_metrics(state.cameras)
+
+
 # ============================================================================
 # Lifecycle
 # ============================================================================
@@ -76,17 +171,89 @@ async def lifespan(app: FastAPI):
     state.detector = WeaponDetector(
         model_path=config.detection.model_path,
         confidence_threshold=config.detection.confidence_threshold,
-        target_classes=config.detection.classes
+        target_classes=config.detection.classes,
+        backend=config.detection.backend,
+        backend_options={
+            "input_size": config.detection.input_size,
+            "providers": config.detection.onnx_providers,
+            "num_threads": config.detection.onnx_threads
+        }
     )
-    state.detector.load_model()
-    
-    # Initialize video processor
-    state.processor = VideoProcessor(
-        source=config.video.source,
-        frame_width=config.video.frame_width,
-        frame_height=config.video.frame_height,
-        target_fps=config.video.fps
+    multiprocess = config.detection.process_mode == "multiprocess"
+    
+    # Blocking capture / inference / encode calls run on these pools so the
+    # event loop stays responsive; the lag monitor proves it
+    state.executors = StageExecutors(
+        capture_workers=len(config.get_cameras()),
+        inference_workers=config.detection.inference_threads,
+        render_workers=config.detection.render_threads
     )
+    state.loop_monitor = LoopLagMonitor()
+    state.loop_monitor.start()
+    
+    if multiprocess:
+        # Capture and inference run in child processes; the model is only
+        # loaded by the inference workers
+        state.batcher = ProcessInferencePool(
+            detector=state.detector,
+            workers=config.detection.inference_workers,
+            max_batch_size=config.detection.batch_max_size
+        )
+        state.batcher.start()
+    else:
+        state.detector.load_model()
+    
+    # Batch inference across cameras
+    if not multiprocess and config.detection.batch_inference:
+        state.batcher = BatchInferenceService(
+            detector=state.detector,
+            max_batch_size=config.detection.batch_max_size,
+            max_wait_ms=config.detection.batch_deadline_ms,
+            executors=state.executors
+        )
+    
+    # Adapt per-camera inference rate to the CPU budget
+    if config.detection.adaptive_scheduling:
+        state.scheduler = InferenceScheduler(
+            detector=state.detector,
+            cpu_budget=config.detection.inference_cpu_budget,
+            max_interval=config.detection.max_inference_interval,
+            active_hold_seconds=config.detection.active_hold_seconds
+        )
+    
+    # Register cameras, one capture-and-detect pipeline each
+    state.cameras = CameraRegistry(
+        detector=state.detector,
+        on_detections=handle_detections,
+        batcher=state.batcher,
+        scheduler=state.scheduler,
+        tracker_options={
+            "iou_threshold": config.detection.track_iou_threshold,
+            "max_missed": config.detection.track_max_missed,
+            "min_hits": config.detection.track_min_hits,
+            "max_coast_seconds": config.detection.track_max_coast_seconds
+        } if config.detection.tracking else None,
+        suppression_options={
+            "cooldown_seconds": config.detection.event_cooldown_seconds,
+            "region_iou": config.detection.event_region_iou
+        },
+        process_mode=config.detection.process_mode,
+        ring_slots=config.detection.shm_ring_slots,
+        executors=state.executors
+    )
+    for camera in config.get_cameras():
+        state.cameras.add_camera(
+            camera_id=camera.id,
+            source=camera.source,
+            name=camera.name,
+            frame_width=camera.frame_width,
+            frame_height=camera.frame_height,
+            fps=camera.fps,
+            enabled=camera.enabled,
+            motion_gate=camera.motion_gate,
+            motion_threshold=camera.motion_threshold,
+            motion_force_interval=camera.motion_force_interval
+        )
     
     # Initialize alert manager
     state.alert_manager = AlertManager(
@@ -131,8 +298,24 @@ async def lifespan(app: FastAPI):
     state.evidence_manager = EvidenceManager(
         base_path=config.storage.evidence_path,
         max_files=config.storage.max_evidence_files,
-        save_annotated=config.storage.save_annotated_frames
+        save_annotated=config.storage.save_annotated_frames,
+        jpeg_quality=config.storage.jpeg_quality,
+        index_backend=config.storage.index_backend,
+        index_options={
+            "fsync_interval": config.storage.journal_fsync_interval,
+            "compact_every": config.storage.journal_compact_every
+        }
     )
+    state.evidence_manager.start_reconciliation(
+        interval=config.storage.reconcile_interval_seconds,
+        files_per_second=config.storage.reconcile_files_per_second
+    )
+    
+    # Camera counters are read when /metrics is scraped
+    REGISTRY.add_collector(collect_camera_metrics)
+    
+    # Start enabled cameras
+    state.cameras.start_all()
     
     print("\n✅ All systems initialized successfully!\n")
     
@@ -140,8 +323,19 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     print("\n🛑 Shutting down...")
-    if state.processor:
-        state.processor.close()
+    REGISTRY.remove_collector(collect_camera_metrics)
+    if state.cameras:
+        await state.cameras.stop_all()
+    if state.loop_monitor:
+        await state.loop_monitor.stop()
+    if state.executors:
+        state.executors.shutdown()
+    if state.alert_tasks:
+        # Let alerts already on their way finish
+        await asyncio.wait(state.alert_tasks, timeout=10.0)
+    if state.evidence_manager:
+        await state.evidence_manager.stop_reconciliation()
+        state.evidence_manager.close()
     print("👋 Goodbye!\n")
 
 
@@ -172,97 +366,58 @@ app.add_middleware(
 
 @app.websocket("/ws/stream")
 async def websocket_stream(websocket: WebSocket):
+    """WebSocket endpoint for the default camera (first configured)"""
+    camera = state.cameras.default_camera
+    await stream_camera(websocket, camera.id if camera else "")
+
+
+@app.websocket("/ws/stream/{camera_id}")
+async def websocket_camera_stream(websocket: WebSocket, camera_id: str):
     """WebSocket endpoint for live video streaming with detection overlays"""
+    await stream_camera(websocket, camera_id)
+
+
+async def stream_camera(websocket: WebSocket, camera_id: str):
+    """Subscribe a WebSocket to a camera's shared pipeline"""
     await websocket.accept()
-    state.connected_clients.append(websocket)
     
-    print(f"📡 Client connected. Total clients: {len(state.connected_clients)}")
+    camera = state.cameras.get(camera_id)
+    if camera is None:
+        await websocket.send_json({
+            "type": "error",
+            "message": f"Unknown camera: {camera_id}"
+        })
+        await websocket.close()
+        return
+    
+    if not camera.is_running:
+        await websocket.send_json({
+            "type": "error",
+            "message": f"Camera {camera_id} is not running"
+        })
+        await websocket.close()
+        return
+    
+    camera.broadcaster.add_client(websocket)
+    print(f"📡 Client connected to {camera_id}. Total clients: {camera.broadcaster.client_count}")
     
     try:
-        # Open video source if not already
-        if not state.processor.cap or not state.processor.cap.isOpened():
-            if not state.processor.open():
-                await websocket.send_json({
-                    "type": "error",
-                    "message": "Failed to open video source"
-                })
-                return
-        
-        state.is_streaming = True
-        
-        async for frame_data in state.processor.stream_frames():
-            if not state.is_streaming:
-                break
-            
-            frame = frame_data.frame
-            
-            # Run detection
-            detections = state.detector.detect(frame)
-            
-            # Annotate frame
-            annotated_frame = state.detector.annotate_frame(frame, detections)
-            annotated_frame = add_timestamp_overlay(annotated_frame)
-            
-            # Handle detections
-            if detections:
-                state.detection_count += len(detections)
-                
-                for detection in detections:
-                    # Save evidence
-                    evidence_id = await state.evidence_manager.save_detection(
-                        frame=frame,
-                        annotated_frame=annotated_frame,
-                        weapon_type=detection.class_name,
-                        confidence=detection.confidence,
-                        bbox=detection.bbox,
-                        location="Camera 1"
-                    )
-                    
-                    # Trigger alert
-                    if evidence_id:
-                        evidence_path = str(
-                            Path(state.evidence_manager.base_path) / 
-                            "annotated" / f"{evidence_id}_annotated.jpg"
-                        )
-                        await state.alert_manager.trigger_alert(
-                            weapon_type=detection.class_name,
-                            confidence=detection.confidence,
-                            location="Camera 1",
-                            evidence_path=evidence_path
-                        )
-                    
-                    # Send detection event
-                    await websocket.send_json({
-                        "type": "detection",
-                        "data": detection.to_dict()
-                    })
-            
-            # Send frame
-            jpeg_bytes = frame_to_jpeg(annotated_frame, quality=80)
-            await websocket.send_bytes(jpeg_bytes)
-            
-            # Check for control messages
+        # Frames are pushed by the pipeline; only listen for control messages
+        while True:
             try:
-                message = await asyncio.wait_for(
-                    websocket.receive_json(),
-                    timeout=0.001
-                )
-                if message.get("action") == "stop":
-                    break
-            except asyncio.TimeoutError:
-                pass
-            except:
-                pass
+                message = json.loads(await websocket.receive_text())
+            except ValueError:
+                continue
+            if isinstance(message, dict) and message.get("action") == "stop":
+                break
                 
     except WebSocketDisconnect:
         print("📡 Client disconnected")
     except Exception as e:
         print(f"❌ WebSocket error: {e}")
     finally:
-        state.connected_clients.remove(websocket)
-        if not state.connected_clients:
-            state.is_streaming = False
-        print(f"📡 Remaining clients: {len(state.connected_clients)}")
+        camera.broadcaster.remove_client(websocket)
+        print(f"📡 Remaining clients on {camera_id}: {camera.broadcaster.client_count}")
 
 
 # ============================================================================
@@ -276,14 +431,20 @@ async def get_status() -> Dict[str, Any]:
     uptime = None
     if state.start_time:
         uptime = str(datetime.now() - state.start_time).split('.')[0]
+    default_camera = state.cameras.default_camera if state.cameras else None
     
     return {
         "status": "running",
         "uptime": uptime,
         "detection_count": state.detection_count,
-        "connected_clients": len(state.connected_clients),
+        "connected_clients": state.connected_clients,
         "is_streaming": state.is_streaming,
-        "video": state.processor.get_status() if state.processor else None,
+        "video": default_camera.processor.get_status() if default_camera else None,
+        "cameras": state.cameras.get_status() if state.cameras else [],
+        "inference": state.batcher.get_status() if state.batcher else None,
+        "schedule": state.scheduler.get_status() if state.scheduler else None,
+        "event_loop": state.loop_monitor.get_status() if state.loop_monitor else None,
+        "executors": state.executors.get_status() if state.executors else None,
         "alerts": state.alert_manager.get_status() if state.alert_manager else None,
         "storage": state.evidence_manager.get_statistics() if state.evidence_manager else None,
         "config": {
@@ -293,6 +454,43 @@ async def get_status() -> Dict[str, Any]:
     }
 
 
+@app.get("/metrics")
+async def get_metrics() -> PlainTextResponse:
+    """Prometheus metrics in the text exposition format"""
+    return PlainTextResponse(REGISTRY.render(), media_type=CONTENT_TYPE)
+
+
+@app.get("/api/cameras")
+async def get_cameras() -> Dict[str, Any]:
+    """List cameras and their pipeline status"""
+    if not state.cameras:
+        raise HTTPException(status_code=503, detail="Cameras not initialized")
+    
+    return {"cameras": state.cameras.get_status()}
+
+
+@app.post("/api/cameras/{camera_id}/start")
+async def start_camera(camera_id: str) -> Dict[str, Any]:
+    """Start a camera's capture-and-detect pipeline"""
+    if not state.cameras or camera_id not in state.cameras:
+        raise HTTPException(status_code=404, detail="Camera not found")
+    
+    if not state.cameras.start(camera_id):
+        raise HTTPException(status_code=502, detail="Failed to open video source")
+    
+    return {"camera_id": camera_id, "is_running": True}
+
+
+@app.post("/api/cameras/{camera_id}/stop")
+async def stop_camera(camera_id: str) -> Dict[str, Any]:
+    """Stop a camera's pipeline and release its video source"""
+    if not state.cameras or camera_id not in state.cameras:
+        raise HTTPException(status_code=404, detail="Camera not found")
+    
+    await state.cameras.stop(camera_id)
+    return {"camera_id": camera_id, "is_running": False}
+
+
 @app.get("/api/detections")
 async def get_detections(
     limit: int = Query(20, ge=1, le=100),
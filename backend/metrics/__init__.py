@@ -0,0 +1,29 @@
+"""
+Metrics Module Components
+"""
+from .registry import (
+    REGISTRY, CONTENT_TYPE, MetricsRegistry, Metric, Counter, Gauge, Histogram
+)
+from .instruments import (
+    DETECTIONS, INFERENCE_SECONDS, EVIDENCE_WRITE_SECONDS, EVIDENCE_BYTES, EVIDENCE_FAILURES,
+    ALERT_DISPATCH_SECONDS, ALERT_FAILURES
+)
+from .collectors import camera_metrics
+
+__all__ = [
+    "REGISTRY",
+    "CONTENT_TYPE",
+    "MetricsRegistry",
+    "Metric",
+    "Counter",
+    "Gauge",
+    "Histogram",
+    "DETECTIONS",
+    "INFERENCE_SECONDS",
+    "EVIDENCE_WRITE_SECONDS",
+    "EVIDENCE_BYTES",
+    "EVIDENCE_FAILURES",
+    "ALERT_DISPATCH_SECONDS",
+    "ALERT_FAILURES",
+    "camera_metrics"
+]
@@ -0,0 +1,92 @@
+"""
+Pipeline Collectors
+Build camera and stream metrics from component counters at scrape time, so
+the frame path does no extra work for metrics
+"""
+from typing import Any, List
+
+from .registry import Metric, Counter, Gauge, Histogram
+
+
+def _load_latency(child, histogram: Any):
+    """Copy a millisecond LatencyHistogram into a seconds histogram child"""
+    child.load(
+        histogram.counts,
+        histogram.sum / 1000.0,
+        buckets=[bound / 1000.0 for bound in histogram.buckets]
+    )
+
+
+def camera_metrics(cameras: Any) -> List[Metric]:
+    """
+    Metrics for every camera of a CameraRegistry
+
+    Args:
+        cameras: CameraRegistry (or None before startup)
+    """
+    captured = Counter(
+        "surveillance_frames_captured_total", "Frames read from the video source", ("camera",)
+    )
+    dropped = Counter(
+        "surveillance_frames_dropped_total",
+        "Frames discarded before reaching a viewer, by stage", ("camera", "stage")
+    )
+    processed = Counter(
+        "surveillance_frames_processed_total", "Frames annotated and published", ("camera",)
+    )
+    inferred = Counter(
+        "surveillance_frames_inferred_total", "Frames that ran inference", ("camera",)
+    )
+    fps = Gauge("surveillance_pipeline_fps", "Instantaneous pipeline frame rate", ("camera",))
+    running = Gauge("surveillance_camera_running", "1 if the camera pipeline is running", ("camera",))
+    stage_latency = Histogram(
+        "surveillance_stage_latency_seconds", "Per-frame latency of each pipeline stage",
+        ("camera", "stage")
+    )
+    end_to_end = Histogram(
+        "surveillance_end_to_end_latency_seconds", "Capture to WebSocket send latency",
+        ("camera",)
+    )
+    clients = Gauge("surveillance_websocket_clients", "Connected WebSocket viewers", ("camera",))
+    queued_frames = Gauge(
+        "surveillance_websocket_queued_frames", "Frames waiting in viewer send queues", ("camera",)
+    )
+    pending_events = Gauge(
+        "surveillance_websocket_pending_events", "Events waiting in viewer send queues", ("camera",)
+    )
+
+    metrics: List[Metric] = [
+        captured, dropped, processed, inferred, fps, running,
+        stage_latency, end_to_end, clients, queued_frames, pending_events
+    ]
+    if cameras is None:
+        return metrics
+
+    for camera in cameras.cameras:
+        processor = camera.processor
+        pipeline = camera.pipeline
+        stream = camera.broadcaster.get_status()
+
+        captured.labels(camera.id).inc(processor.frames_captured)
+        grabber = getattr(processor, "grabber", None)
+        capture_dropped = (
+            grabber.frames_dropped if grabber is not None
+            else getattr(processor, "frames_overwritten", 0)
+        )
+        dropped.labels(camera.id, "capture").inc(capture_dropped)
+        dropped.labels(camera.id, "stream").inc(stream["frames_dropped"])
+        processed.labels(camera.id).inc(pipeline.frames_processed)
+        inferred.labels(camera.id).inc(pipeline.frames_inferred)
+        fps.labels(camera.id).set(pipeline.current_fps)
+        running.labels(camera.id).set(1 if camera.is_running else 0)
+
+        for stage, histogram in pipeline.latency.stages.items():
+            if histogram.count:
+                _load_latency(stage_latency.labels(camera.id, stage), histogram)
+        _load_latency(end_to_end.labels(camera.id), pipeline.latency.end_to_end)
+
+        clients.labels(camera.id).set(stream["clients"])
+        queued_frames.labels(camera.id).set(sum(c["queued_frames"] for c in stream["per_client"]))
+        pending_events.labels(camera.id).set(sum(c["pending_events"] for c in stream["per_client"]))
+
+    return metrics
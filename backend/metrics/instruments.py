@@ -0,0 +1,53 @@
+"""
+Application Metrics
+Instruments updated where events happen (detections, inference, evidence, alerts)
+"""
+from .registry import REGISTRY, Counter, Histogram
+
+
+DETECTIONS = Counter(
+    "surveillance_detections_total",
+    "Detection events reported, by camera and weapon class",
+    labelnames=("camera", "weapon_type"),
+    registry=REGISTRY
+)
+
+INFERENCE_SECONDS = Histogram(
+    "surveillance_inference_seconds",
+    "Time of one model forward pass, by backend and batch size",
+    labelnames=("backend", "batch_size"),
+    registry=REGISTRY
+)
+
+EVIDENCE_WRITE_SECONDS = Histogram(
+    "surveillance_evidence_write_seconds",
+    "Time to write the evidence images of one detection",
+    registry=REGISTRY
+)
+
+EVIDENCE_BYTES = Counter(
+    "surveillance_evidence_bytes_total",
+    "Bytes of evidence images written",
+    registry=REGISTRY
+)
+
+EVIDENCE_FAILURES = Counter(
+    "surveillance_evidence_failures_total",
+    "Evidence saves that failed",
+    registry=REGISTRY
+)
+
+ALERT_DISPATCH_SECONDS = Histogram(
+    "surveillance_alert_dispatch_seconds",
+    "Time to dispatch an alert, by channel",
+    labelnames=("channel",),
+    registry=REGISTRY,
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+)
+
+ALERT_FAILURES = Counter(
+    "surveillance_alert_failures_total",
+    "Alerts a channel failed to deliver",
+    labelnames=("channel",),
+    registry=REGISTRY
+)
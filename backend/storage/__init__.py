@@ -2,5 +2,6 @@
 Storage Module Components
 """
 from .evidence_manager import EvidenceManager
+from .index import EvidenceRecord, EvidenceIndex, create_index
 
-__all__ = ["EvidenceManager"]
+__all__ = ["EvidenceManager", "EvidenceRecord", "EvidenceIndex", "create_index"]
@@ -3,30 +3,15 @@ Evidence Storage Manager
 Handles saving and organizing detection evidence (images, videos, metadata)
 """
 import os
-import cv2
-import json
+import time
 import asyncio
-import aiofiles
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Optional, List, Dict, Any
-from dataclasses import dataclass, asdict
-import numpy as np
 
-
-@dataclass
-class EvidenceRecord:
-    """Metadata for a single evidence file"""
-    id: str
-    weapon_type: str
-    confidence: float
-    timestamp: str
-    location: str
-    image_path: str
-    bbox: tuple
-    
-    def to_dict(self) -> Dict[str, Any]:
-        return asdict(self)
+from detection.processor import EncodedFrame
+from metrics import EVIDENCE_WRITE_SECONDS, EVIDENCE_BYTES, EVIDENCE_FAILURES
+from .index import EvidenceRecord, EvidenceIndex, create_index
 
 
 class EvidenceManager:
@@ -38,7 +23,10 @@ class EvidenceManager:
         self,
         base_path: str = "data/evidence",
         max_files: int = 1000,
-        save_annotated: bool = True
+        save_annotated: bool = True,
+        index_backend: str = "sqlite",
+        index_options: Optional[Dict[str, Any]] = None,
+        jpeg_quality: int = 95
     ):
         """
         Initialize Evidence Manager
@@ -47,14 +35,24 @@ class EvidenceManager:
             base_path: Base directory for evidence storage
             max_files: Maximum number of evidence files to retain
             save_annotated: Whether to save annotated frames
+            index_backend: Metadata store ("sqlite", "journal" or "json")
+            index_options: Extra keyword arguments for the index
+            jpeg_quality: JPEG quality of evidence images
         """
         self.base_path = Path(base_path)
         self.max_files = max_files
         self.save_annotated = save_annotated
+        self.jpeg_quality = jpeg_quality
         
         # Evidence tracking
-        self._evidence_records: List[EvidenceRecord] = []
-        self._metadata_file = self.base_path / "metadata.json"
+        self._index: EvidenceIndex = create_index(
+            index_backend, self.base_path, **(index_options or {})
+        )
+        
+        # Background size reconciliation and index flushing
+        self._reconcile_task: Optional[asyncio.Task] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self._reconciliation: Dict[str, Any] = {"enabled": False, "last_run": None}
         
         # Create directories
         self._init_storage()
@@ -72,27 +70,13 @@ class EvidenceManager:
         print(f"📁 Evidence storage initialized at: {self.base_path.absolute()}")
     
     def _load_metadata(self):
-        """Load existing metadata from file"""
-        if self._metadata_file.exists():
-            try:
-                with open(self._metadata_file, 'r') as f:
-                    data = json.load(f)
-                    self._evidence_records = [
-                        EvidenceRecord(**record) for record in data
-                    ]
-                print(f"📚 Loaded {len(self._evidence_records)} evidence records")
-            except Exception as e:
-                print(f"⚠️ Could not load metadata: {e}")
-                self._evidence_records = []
+        """Open the metadata index"""
+        self._index.load()
+        print(f"📚 Loaded {self._index.count()} evidence records ({self._index.name} index)")
     
-    async def _save_metadata(self):
-        """Save metadata to file"""
-        try:
-            data = [record.to_dict() for record in self._evidence_records]
-            async with aiofiles.open(self._metadata_file, 'w') as f:
-                await f.write(json.dumps(data, indent=2))
-        except Exception as e:
-            print(f"❌ Failed to save metadata: {e}")
+    def close(self):
+        """Flush and close the metadata index"""
+        self._index.close()
     
     def _generate_id(self) -> str:
         """Generate unique evidence ID"""
@@ -101,23 +85,25 @@ class EvidenceManager:
     
     async def save_detection(
         self,
-        frame: np.ndarray,
-        annotated_frame: Optional[np.ndarray],
+        frame: EncodedFrame,
+        annotated_frame: Optional[EncodedFrame],
         weapon_type: str,
         confidence: float,
         bbox: tuple,
-        location: str = "Camera 1"
+        location: str = "Camera 1",
+        camera_id: str = ""
     ) -> Optional[str]:
         """
         Save detection evidence
         
         Args:
-            frame: Original frame
+            frame: Original frame (encoded at most once per quality)
             annotated_frame: Frame with detection annotations
             weapon_type: Type of weapon detected
             confidence: Detection confidence
             bbox: Bounding box (x1, y1, x2, y2)
             location: Camera/location identifier
+            camera_id: Camera identifier
             
         Returns:
             Evidence ID if saved successfully
@@ -130,11 +116,13 @@ class EvidenceManager:
         image_path = self.base_path / "images" / image_filename
         
         try:
+            started = time.perf_counter()
+            
             # Save original frame
             loop = asyncio.get_event_loop()
-            await loop.run_in_executor(
+            written = await loop.run_in_executor(
                 None,
-                lambda: cv2.imwrite(str(image_path), frame)
+                lambda: self._write_file(image_path, frame.jpeg(self.jpeg_quality))
             )
             
             # Save annotated frame if enabled
@@ -142,11 +130,14 @@ class EvidenceManager:
             if self.save_annotated and annotated_frame is not None:
                 annotated_filename = f"{evidence_id}_annotated.jpg"
                 annotated_path = self.base_path / "annotated" / annotated_filename
-                await loop.run_in_executor(
+                written += await loop.run_in_executor(
                     None,
-                    lambda: cv2.imwrite(str(annotated_path), annotated_frame)
+                    lambda: self._write_file(annotated_path, annotated_frame.jpeg(self.jpeg_quality))
                 )
             
+            EVIDENCE_WRITE_SECONDS.observe(time.perf_counter() - started)
+            EVIDENCE_BYTES.inc(written)
+            
             # Create evidence record
             record = EvidenceRecord(
                 id=evidence_id,
@@ -155,13 +146,13 @@ class EvidenceManager:
                 timestamp=timestamp.isoformat(),
                 location=location,
                 image_path=str(image_path),
-                bbox=bbox
+                bbox=bbox,
+                camera_id=camera_id,
+                size_bytes=written
             )
             
-            self._evidence_records.append(record)
-            
-            # Save metadata
-            await self._save_metadata()
+            # Index the record
+            await loop.run_in_executor(None, self._index.add, record)
             
             # Cleanup if needed
             await self._cleanup_old_evidence()
@@ -170,14 +161,23 @@ class EvidenceManager:
             return evidence_id
             
         except Exception as e:
+            EVIDENCE_FAILURES.inc()
             print(f"❌ Failed to save evidence: {e}")
             return None
     
+    @staticmethod
+    def _write_file(path: Path, data: bytes) -> int:
+        """Write already-encoded image bytes and return their size"""
+        with open(path, "wb") as f:
+            f.write(data)
+        return len(data)
+    
     async def _cleanup_old_evidence(self):
         """Remove oldest evidence if exceeding max_files"""
-        while len(self._evidence_records) > self.max_files:
-            oldest = self._evidence_records.pop(0)
-            
+        loop = asyncio.get_event_loop()
+        evicted = await loop.run_in_executor(None, self._index.evict_oldest, self.max_files)
+        
+        for oldest in evicted:
             # Delete files
             try:
                 image_path = Path(oldest.image_path)
@@ -192,15 +192,10 @@ class EvidenceManager:
                 print(f"🗑️ Cleaned up old evidence: {oldest.id}")
             except Exception as e:
                 print(f"⚠️ Cleanup error: {e}")
-        
-        await self._save_metadata()
     
     def get_evidence(self, evidence_id: str) -> Optional[EvidenceRecord]:
         """Get evidence record by ID"""
-        for record in self._evidence_records:
-            if record.id == evidence_id:
-                return record
-        return None
+        return self._index.get(evidence_id)
     
     def get_recent_evidence(
         self,
@@ -214,34 +209,162 @@ class EvidenceManager:
             limit: Maximum records to return
             weapon_type: Optional filter by weapon type
         """
-        records = self._evidence_records
-        
-        if weapon_type:
-            records = [r for r in records if r.weapon_type == weapon_type]
-        
-        return [r.to_dict() for r in records[-limit:]][::-1]
+        return [r.to_dict() for r in self._index.recent(limit, weapon_type)]
     
     def get_statistics(self) -> Dict[str, Any]:
-        """Get evidence storage statistics"""
-        stats = {
-            "total_evidence": len(self._evidence_records),
+        """Get evidence storage statistics from the index's running totals"""
+        totals = self._index.totals()
+        total_size = sum(entry["bytes"] for entry in totals.values())
+        return {
+            "total_evidence": sum(entry["count"] for entry in totals.values()),
             "storage_path": str(self.base_path.absolute()),
             "max_files": self.max_files,
-            "by_weapon_type": {}
+            "index_backend": self._index.name,
+            "by_weapon_type": {weapon_type: entry["count"] for weapon_type, entry in totals.items()},
+            "bytes_by_weapon_type": {weapon_type: entry["bytes"] for weapon_type, entry in totals.items()},
+            "storage_size_mb": round(total_size / (1024 * 1024), 2),
+            "reconciliation": dict(self._reconciliation)
         }
+    
+    def start_reconciliation(self, interval: float = 3600.0, files_per_second: float = 200.0):
+        """
+        Periodically check the recorded sizes against the files on disk
         
-        # Count by weapon type
-        for record in self._evidence_records:
-            weapon = record.weapon_type
-            stats["by_weapon_type"][weapon] = stats["by_weapon_type"].get(weapon, 0) + 1
+        Records without a size (imported from metadata.json or an older
+        database) are measured right away, even if periodic passes are off.
+        Indexes that buffer writes are also flushed every flush_interval.
         
-        # Calculate storage size
-        total_size = 0
-        for path in self.base_path.rglob("*.jpg"):
-            total_size += path.stat().st_size
-        stats["storage_size_mb"] = round(total_size / (1024 * 1024), 2)
+        Args:
+            interval: Seconds between passes (0 disables)
+            files_per_second: Rate limit on stat() calls per pass
+        """
+        if self._reconcile_task is not None:
+            return
+        self._reconciliation["enabled"] = interval > 0
+        self._reconcile_task = asyncio.create_task(
+            self._reconcile_loop(interval, files_per_second)
+        )
+        if self._index.flush_interval > 0:
+            self._flush_task = asyncio.create_task(self._flush_loop(self._index.flush_interval))
+    
+    async def stop_reconciliation(self):
+        """Cancel the background reconciliation and flush tasks"""
+        for task in (self._reconcile_task, self._flush_task):
+            if task is None:
+                continue
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._reconcile_task = None
+        self._flush_task = None
+    
+    async def _reconcile_loop(self, interval: float, files_per_second: float):
+        loop = asyncio.get_event_loop()
+        if await loop.run_in_executor(None, self._has_unsized_records):
+            await self._reconcile_safely(files_per_second)
+        while interval > 0:
+            await asyncio.sleep(interval)
+            await self._reconcile_safely(files_per_second)
+    
+    async def _flush_loop(self, interval: float):
+        loop = asyncio.get_event_loop()
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await loop.run_in_executor(None, self._index.flush)
+            except Exception as e:
+                print(f"⚠️ Evidence index flush error: {e}")
+    
+    async def _reconcile_safely(self, files_per_second: float):
+        try:
+            await self.reconcile(files_per_second)
+        except Exception as e:
+            print(f"⚠️ Evidence reconciliation error: {e}")
+    
+    def _has_unsized_records(self) -> bool:
+        return any(record.size_bytes == 0 for record in self._index)
+    
+    async def reconcile(self, files_per_second: float = 200.0, batch_size: int = 50) -> Dict[str, Any]:
+        """
+        Correct recorded sizes from the files on disk and count files the
+        index does not know about
+        
+        Args:
+            files_per_second: Rate limit on stat() calls
+            batch_size: Records stat'ed per executor call
+        """
+        loop = asyncio.get_event_loop()
+        started = time.perf_counter()
+        records = await loop.run_in_executor(None, lambda: list(self._index))
+        pause = batch_size / files_per_second if files_per_second > 0 else 0.0
+        
+        corrections: Dict[str, int] = {}
+        missing = 0
+        for start in range(0, len(records), batch_size):
+            batch = records[start:start + batch_size]
+            sizes = await loop.run_in_executor(None, self._measure, batch)
+            for record, (size_bytes, found) in zip(batch, sizes):
+                if not found:
+                    missing += 1
+                if size_bytes != record.size_bytes:
+                    corrections[record.id] = size_bytes
+            if pause:
+                await asyncio.sleep(pause)
         
-        return stats
+        if corrections:
+            await loop.run_in_executor(None, self._index.update_sizes, corrections)
+        
+        known = {Path(record.image_path).name for record in records}
+        known.update(f"{record.id}_annotated.jpg" for record in records)
+        untracked, untracked_bytes = await loop.run_in_executor(None, self._untracked_files, known)
+        
+        self._reconciliation.update({
+            "last_run": datetime.now().isoformat(),
+            "duration_seconds": round(time.perf_counter() - started, 2),
+            "records_checked": len(records),
+            "records_corrected": len(corrections),
+            "missing_files": missing,
+            "untracked_files": untracked,
+            "untracked_bytes": untracked_bytes
+        })
+        if corrections or untracked:
+            print(
+                f"🔎 Evidence reconciliation: corrected {len(corrections)} sizes, "
+                f"{untracked} untracked files"
+            )
+        return dict(self._reconciliation)
+    
+    def _measure(self, records: List[EvidenceRecord]) -> List[tuple]:
+        """(size on disk, original image present) for each record"""
+        results = []
+        for record in records:
+            size_bytes = 0
+            found = False
+            for path, original in (
+                (Path(record.image_path), True),
+                (self.base_path / "annotated" / f"{record.id}_annotated.jpg", False)
+            ):
+                try:
+                    size_bytes += path.stat().st_size
+                    found = found or original
+                except OSError:
+                    pass
+            results.append((size_bytes, found))
+        return results
+    
+    def _untracked_files(self, known: set) -> tuple:
+        """Count image files on disk that no record refers to"""
+        count = 0
+        size_bytes = 0
+        for folder in ("images", "annotated"):
+            with os.scandir(self.base_path / folder) as entries:
+                for entry in entries:
+                    if entry.name.endswith(".jpg") and entry.name not in known:
+                        count += 1
+                        size_bytes += entry.stat().st_size
+        return count, size_bytes
     
     def get_evidence_image(self, evidence_id: str, annotated: bool = False) -> Optional[bytes]:
         """
@@ -268,10 +391,10 @@ class EvidenceManager:
     
     async def clear_all(self) -> int:
         """Clear all evidence (use with caution)"""
-        count = len(self._evidence_records)
+        count = self._index.count()
         
         # Delete all files
-        for record in self._evidence_records:
+        for record in self._index:
             try:
                 Path(record.image_path).unlink(missing_ok=True)
                 annotated = self.base_path / "annotated" / f"{record.id}_annotated.jpg"
@@ -279,8 +402,7 @@ class EvidenceManager:
             except:
                 pass
         
-        self._evidence_records.clear()
-        await self._save_metadata()
+        await asyncio.get_event_loop().run_in_executor(None, self._index.clear)
         
         print(f"🗑️ Cleared {count} evidence records")
         return count
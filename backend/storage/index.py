@@ -0,0 +1,722 @@
+"""
+Evidence Index
+Pluggable stores for evidence metadata: the legacy metadata.json file, an
+embedded SQLite database and an append-only journal
+"""
+import os
+import time
+import json
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+from itertools import islice
+from collections import deque
+from dataclasses import dataclass, asdict
+from typing import Optional, List, Dict, Any, Iterator, Deque
+
+
+@dataclass
+class EvidenceRecord:
+    """Metadata for a single evidence file"""
+    id: str
+    weapon_type: str
+    confidence: float
+    timestamp: str
+    location: str
+    image_path: str
+    bbox: tuple
+    camera_id: str = ""
+    size_bytes: int = 0  # Image files on disk (original + annotated)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class RecordStore:
+    """
+    In-memory records with O(1) lookup, eviction and per-type recency.
+
+    ``_by_id`` maps ids to records, ``_order`` holds ids oldest first and
+    ``_by_type`` one such queue per weapon type. Records are always evicted
+    oldest first, so the oldest record of a type is at the left of its own
+    queue too and eviction is a popleft on both. Byte totals per type are
+    kept up to date on every change.
+    """
+
+    def __init__(self):
+        self._by_id: Dict[str, EvidenceRecord] = {}
+        self._order: Deque[str] = deque()
+        self._by_type: Dict[str, Deque[str]] = {}
+        self._bytes_by_type: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def __iter__(self) -> Iterator[EvidenceRecord]:
+        """Oldest first (iterates over a copy)"""
+        return iter([self._by_id[evidence_id] for evidence_id in self._order])
+
+    def add(self, record: EvidenceRecord):
+        if record.id in self._by_id:
+            self.remove(record.id)
+        self._by_id[record.id] = record
+        self._order.append(record.id)
+        self._by_type.setdefault(record.weapon_type, deque()).append(record.id)
+        self._add_bytes(record.weapon_type, record.size_bytes)
+
+    def _add_bytes(self, weapon_type: str, size_bytes: int):
+        self._bytes_by_type[weapon_type] = self._bytes_by_type.get(weapon_type, 0) + size_bytes
+
+    def _drop_type_if_empty(self, weapon_type: str):
+        if not self._by_type[weapon_type]:
+            del self._by_type[weapon_type]
+            self._bytes_by_type.pop(weapon_type, None)
+
+    def evict_oldest(self, keep: int) -> List[EvidenceRecord]:
+        """Remove and return the oldest records beyond the newest ``keep``"""
+        evicted = []
+        while len(self._order) > keep:
+            record = self._by_id.pop(self._order.popleft())
+            self._by_type[record.weapon_type].popleft()
+            self._add_bytes(record.weapon_type, -record.size_bytes)
+            self._drop_type_if_empty(record.weapon_type)
+            evicted.append(record)
+        return evicted
+
+    def remove(self, evidence_id: str) -> Optional[EvidenceRecord]:
+        """Remove one record (O(1) for the oldest, O(n) otherwise)"""
+        record = self._by_id.pop(evidence_id, None)
+        if record is None:
+            return None
+        for queue in (self._order, self._by_type[record.weapon_type]):
+            if queue[0] == evidence_id:
+                queue.popleft()
+            else:
+                queue.remove(evidence_id)
+        self._add_bytes(record.weapon_type, -record.size_bytes)
+        self._drop_type_if_empty(record.weapon_type)
+        return record
+
+    def update_sizes(self, sizes: Dict[str, int]):
+        """Correct the recorded size of existing records"""
+        for evidence_id, size_bytes in sizes.items():
+            record = self._by_id.get(evidence_id)
+            if record is not None:
+                self._add_bytes(record.weapon_type, size_bytes - record.size_bytes)
+                record.size_bytes = size_bytes
+
+    def get(self, evidence_id: str) -> Optional[EvidenceRecord]:
+        return self._by_id.get(evidence_id)
+
+    def recent(self, limit: int, weapon_type: Optional[str] = None) -> List[EvidenceRecord]:
+        """Newest first, reading only the ``limit`` records returned"""
+        if weapon_type:
+            queue = self._by_type.get(weapon_type, ())
+        else:
+            queue = self._order
+        return [self._by_id[evidence_id] for evidence_id in islice(reversed(queue), limit)]
+
+    def totals(self) -> Dict[str, Dict[str, int]]:
+        return {
+            weapon_type: {"count": len(queue), "bytes": self._bytes_by_type.get(weapon_type, 0)}
+            for weapon_type, queue in self._by_type.items()
+        }
+
+    def clear(self):
+        self._by_id.clear()
+        self._order.clear()
+        self._by_type.clear()
+        self._bytes_by_type.clear()
+
+
+class EvidenceIndex(ABC):
+    """Base class for evidence metadata stores (records kept oldest first)"""
+
+    name = "base"
+    flush_interval = 0.0  # Seconds between the owner's flush() calls (0 = not needed)
+
+    def __init__(self, base_path: Path):
+        self.base_path = Path(base_path)
+
+    @abstractmethod
+    def load(self):
+        """Open the store; called once before use"""
+
+    @abstractmethod
+    def add(self, record: EvidenceRecord):
+        ...
+
+    @abstractmethod
+    def evict_oldest(self, keep: int) -> List[EvidenceRecord]:
+        """Remove and return the oldest records beyond the newest ``keep``"""
+
+    @abstractmethod
+    def get(self, evidence_id: str) -> Optional[EvidenceRecord]:
+        ...
+
+    @abstractmethod
+    def recent(self, limit: int, weapon_type: Optional[str] = None) -> List[EvidenceRecord]:
+        """Newest records first"""
+
+    @abstractmethod
+    def count(self) -> int:
+        ...
+
+    @abstractmethod
+    def totals(self) -> Dict[str, Dict[str, int]]:
+        """Record count and bytes per weapon type, maintained incrementally"""
+
+    @abstractmethod
+    def update_sizes(self, sizes: Dict[str, int]):
+        """Correct the size_bytes of existing records (id -> bytes)"""
+
+    @abstractmethod
+    def __iter__(self) -> Iterator[EvidenceRecord]:
+        ...
+
+    @abstractmethod
+    def clear(self):
+        ...
+
+    def flush(self):
+        """Make buffered writes durable"""
+
+    def close(self):
+        pass
+
+
+# ============================================================================
+# metadata.json (legacy)
+# ============================================================================
+
+class JsonEvidenceIndex(EvidenceIndex):
+    """
+    All records in memory (see RecordStore), rewritten to metadata.json on
+    every change.
+
+    Write cost grows with history; kept for compatibility and small stores.
+    """
+
+    name = "json"
+
+    def __init__(self, base_path: Path, **_):
+        super().__init__(base_path)
+        self.path = self.base_path / "metadata.json"
+        self._records = RecordStore()
+        self._lock = threading.Lock()
+
+    def load(self):
+        if self.path.exists():
+            try:
+                with open(self.path, 'r') as f:
+                    for data in json.load(f):
+                        self._records.add(EvidenceRecord(**data))
+            except Exception as e:
+                print(f"⚠️ Could not load metadata: {e}")
+                self._records.clear()
+
+    def _save(self):
+        try:
+            data = [record.to_dict() for record in self._records]
+            tmp_path = self.path.with_suffix(".json.tmp")
+            with open(tmp_path, 'w') as f:
+                f.write(json.dumps(data, indent=2))
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"❌ Failed to save metadata: {e}")
+
+    def add(self, record: EvidenceRecord):
+        with self._lock:
+            self._records.add(record)
+            self._save()
+
+    def evict_oldest(self, keep: int) -> List[EvidenceRecord]:
+        with self._lock:
+            evicted = self._records.evict_oldest(keep)
+            if evicted:
+                self._save()
+            return evicted
+
+    def get(self, evidence_id: str) -> Optional[EvidenceRecord]:
+        return self._records.get(evidence_id)
+
+    def recent(self, limit: int, weapon_type: Optional[str] = None) -> List[EvidenceRecord]:
+        with self._lock:
+            return self._records.recent(limit, weapon_type)
+
+    def count(self) -> int:
+        return len(self._records)
+
+    def totals(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return self._records.totals()
+
+    def update_sizes(self, sizes: Dict[str, int]):
+        with self._lock:
+            self._records.update_sizes(sizes)
+            self._save()
+
+    def __iter__(self) -> Iterator[EvidenceRecord]:
+        with self._lock:
+            return iter(self._records)
+
+    def clear(self):
+        with self._lock:
+            self._records.clear()
+            self._save()
+
+
+# ============================================================================
+# SQLite
+# ============================================================================
+
+class SqliteEvidenceIndex(EvidenceIndex):
+    """
+    Records in an embedded SQLite database (WAL mode).
+
+    Each save is one indexed INSERT, so its cost does not depend on how many
+    records are retained, and a crash can at worst lose the last
+    transaction instead of corrupting the whole index. Triggers keep a
+    per-type count/bytes table in step with every insert, delete and size
+    correction. An existing metadata.json is imported once on first open.
+    """
+
+    name = "sqlite"
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS evidence (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            id TEXT NOT NULL UNIQUE,
+            weapon_type TEXT NOT NULL,
+            confidence REAL NOT NULL,
+            timestamp TEXT NOT NULL,
+            location TEXT NOT NULL,
+            image_path TEXT NOT NULL,
+            bbox TEXT NOT NULL,
+            camera_id TEXT NOT NULL DEFAULT '',
+            size_bytes INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE INDEX IF NOT EXISTS idx_evidence_timestamp ON evidence (timestamp);
+        CREATE INDEX IF NOT EXISTS idx_evidence_weapon_type ON evidence (weapon_type, seq);
+        CREATE INDEX IF NOT EXISTS idx_evidence_camera ON evidence (camera_id, seq);
+    """
+
+    STATS_SCHEMA = """
+        CREATE TABLE IF NOT EXISTS evidence_stats (
+            weapon_type TEXT PRIMARY KEY,
+            count INTEGER NOT NULL,
+            bytes INTEGER NOT NULL
+        );
+        CREATE TRIGGER IF NOT EXISTS evidence_stats_insert AFTER INSERT ON evidence BEGIN
+            INSERT INTO evidence_stats (weapon_type, count, bytes)
+            VALUES (NEW.weapon_type, 1, NEW.size_bytes)
+            ON CONFLICT (weapon_type) DO UPDATE
+            SET count = count + 1, bytes = bytes + excluded.bytes;
+        END;
+        CREATE TRIGGER IF NOT EXISTS evidence_stats_delete AFTER DELETE ON evidence BEGIN
+            UPDATE evidence_stats SET count = count - 1, bytes = bytes - OLD.size_bytes
+            WHERE weapon_type = OLD.weapon_type;
+            DELETE FROM evidence_stats WHERE weapon_type = OLD.weapon_type AND count <= 0;
+        END;
+        CREATE TRIGGER IF NOT EXISTS evidence_stats_size AFTER UPDATE OF size_bytes ON evidence BEGIN
+            UPDATE evidence_stats SET bytes = bytes + NEW.size_bytes - OLD.size_bytes
+            WHERE weapon_type = NEW.weapon_type;
+        END;
+    """
+
+    COLUMNS = "id, weapon_type, confidence, timestamp, location, image_path, bbox, camera_id, size_bytes"
+    PLACEHOLDERS = ", ".join("?" * 9)
+
+    def __init__(self, base_path: Path, **_):
+        super().__init__(base_path)
+        self.path = self.base_path / "evidence.db"
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        # Writes come from executor threads; the lock serializes them
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self.SCHEMA)
+        self._upgrade_schema()
+        self._migrate_json()
+
+    def _upgrade_schema(self):
+        """Add size tracking to a database created before it existed"""
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(evidence)")}
+        if "size_bytes" not in columns:
+            self._conn.execute("ALTER TABLE evidence ADD COLUMN size_bytes INTEGER NOT NULL DEFAULT 0")
+        has_stats = self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'evidence_stats'"
+        ).fetchone()
+        self._conn.executescript(self.STATS_SCHEMA)
+        if not has_stats:
+            self._conn.execute(
+                "INSERT INTO evidence_stats (weapon_type, count, bytes) "
+                "SELECT weapon_type, COUNT(*), SUM(size_bytes) FROM evidence GROUP BY weapon_type"
+            )
+
+    def _migrate_json(self):
+        """Import a legacy metadata.json once, then set it aside"""
+        json_path = self.base_path / "metadata.json"
+        if not json_path.exists():
+            return
+        legacy = JsonEvidenceIndex(self.base_path)
+        legacy.load()
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                f"INSERT OR IGNORE INTO evidence ({self.COLUMNS}) VALUES ({self.PLACEHOLDERS})",
+                [self._to_row(record) for record in legacy]
+            )
+            self._conn.execute("COMMIT")
+        json_path.rename(json_path.with_suffix(".json.migrated"))
+        print(f"📦 Migrated {legacy.count()} evidence records from metadata.json to SQLite")
+
+    @staticmethod
+    def _to_row(record: EvidenceRecord) -> tuple:
+        return (
+            record.id, record.weapon_type, record.confidence, record.timestamp,
+            record.location, record.image_path, json.dumps(list(record.bbox)), record.camera_id,
+            record.size_bytes
+        )
+
+    @staticmethod
+    def _from_row(row: tuple) -> EvidenceRecord:
+        return EvidenceRecord(
+            id=row[0], weapon_type=row[1], confidence=row[2], timestamp=row[3],
+            location=row[4], image_path=row[5], bbox=json.loads(row[6]), camera_id=row[7],
+            size_bytes=row[8]
+        )
+
+    def _query(self, sql: str, params: tuple = ()) -> List[tuple]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def add(self, record: EvidenceRecord):
+        with self._lock:
+            self._conn.execute(
+                f"INSERT INTO evidence ({self.COLUMNS}) VALUES ({self.PLACEHOLDERS})",
+                self._to_row(record)
+            )
+
+    def evict_oldest(self, keep: int) -> List[EvidenceRecord]:
+        with self._lock:
+            excess = self._count() - keep
+            if excess <= 0:
+                return []
+            rows = self._conn.execute(
+                f"SELECT seq, {self.COLUMNS} FROM evidence ORDER BY seq LIMIT ?", (excess,)
+            ).fetchall()
+            self._conn.execute("DELETE FROM evidence WHERE seq <= ?", (rows[-1][0],))
+        return [self._from_row(row[1:]) for row in rows]
+
+    def get(self, evidence_id: str) -> Optional[EvidenceRecord]:
+        rows = self._query(f"SELECT {self.COLUMNS} FROM evidence WHERE id = ?", (evidence_id,))
+        return self._from_row(rows[0]) if rows else None
+
+    def recent(self, limit: int, weapon_type: Optional[str] = None) -> List[EvidenceRecord]:
+        if weapon_type:
+            rows = self._query(
+                f"SELECT {self.COLUMNS} FROM evidence WHERE weapon_type = ? ORDER BY seq DESC LIMIT ?",
+                (weapon_type, limit)
+            )
+        else:
+            rows = self._query(
+                f"SELECT {self.COLUMNS} FROM evidence ORDER BY seq DESC LIMIT ?", (limit,)
+            )
+        return [self._from_row(row) for row in rows]
+
+    def _count(self) -> int:
+        # COUNT(*) scans the table; the stats table has one row per type
+        return self._conn.execute("SELECT COALESCE(SUM(count), 0) FROM evidence_stats").fetchone()[0]
+
+    def count(self) -> int:
+        with self._lock:
+            return self._count()
+
+    def totals(self) -> Dict[str, Dict[str, int]]:
+        return {
+            weapon_type: {"count": count, "bytes": size_bytes}
+            for weapon_type, count, size_bytes in self._query(
+                "SELECT weapon_type, count, bytes FROM evidence_stats"
+            )
+        }
+
+    def update_sizes(self, sizes: Dict[str, int]):
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "UPDATE evidence SET size_bytes = ? WHERE id = ?",
+                [(size_bytes, evidence_id) for evidence_id, size_bytes in sizes.items()]
+            )
+            self._conn.execute("COMMIT")
+
+    def __iter__(self) -> Iterator[EvidenceRecord]:
+        rows = self._query(f"SELECT {self.COLUMNS} FROM evidence ORDER BY seq")
+        return (self._from_row(row) for row in rows)
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM evidence")
+
+    def close(self):
+        if self._conn is not None:
+            with self._lock:
+                self._conn.close()
+            self._conn = None
+
+
+# ============================================================================
+# Append-only journal
+# ============================================================================
+
+class JournalEvidenceIndex(EvidenceIndex):
+    """
+    Records in memory (see RecordStore), persisted as a snapshot plus an
+    append-only journal.
+
+    Every change is one newline-delimited JSON entry appended with a single
+    write; fsyncs are batched to at most one per ``fsync_interval`` seconds,
+    and flush() (called on a timer of the same period) syncs writes that no
+    later write came along to sync.
+    Once the journal holds ``compact_every`` entries, the live records are
+    written to a new snapshot (folding deletions in) and a fresh journal is
+    started, so startup reads one snapshot and replays only the short tail.
+
+    Snapshot and journal carry a generation number: a journal is only
+    replayed on top of the snapshot of the same generation, so a crash at
+    any point of a compaction leaves a consistent pair.
+    """
+
+    name = "journal"
+
+    def __init__(
+        self,
+        base_path: Path,
+        fsync_interval: float = 1.0,
+        compact_every: int = 10000,
+        **_
+    ):
+        """
+        Initialize the journal index
+
+        Args:
+            base_path: Evidence directory holding the snapshot and journal
+            fsync_interval: Max seconds between fsyncs (0 = every write,
+                negative = leave flushing to the OS)
+            compact_every: Journal entries that trigger a compaction
+        """
+        super().__init__(base_path)
+        self.fsync_interval = fsync_interval
+        self.flush_interval = max(fsync_interval, 0.0)
+        self.compact_every = compact_every
+        self.snapshot_path = self.base_path / "evidence.snapshot.json"
+
+        self._records = RecordStore()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._fd: Optional[int] = None
+        self._entries = 0  # Entries in the current journal
+        self._last_fsync = 0.0
+        self._unsynced = False  # Written since the last fsync
+        self.compactions = 0
+
+    def _journal_path(self, generation: int) -> Path:
+        return self.base_path / f"evidence.{generation}.journal"
+
+    # ------------------------------------------------------------------
+    # Startup
+    # ------------------------------------------------------------------
+
+    def load(self):
+        if self.snapshot_path.exists():
+            with open(self.snapshot_path, 'r') as f:
+                snapshot = json.load(f)
+            self._generation = snapshot["generation"]
+            for data in snapshot["records"]:
+                self._records.add(EvidenceRecord(**data))
+        else:
+            self._import_json()
+
+        self._entries = self._replay(self._journal_path(self._generation))
+
+        # Journals of other generations are leftovers of a compaction
+        for path in self.base_path.glob("evidence.*.journal"):
+            if path != self._journal_path(self._generation):
+                path.unlink(missing_ok=True)
+
+        self._fd = os.open(
+            self._journal_path(self._generation), os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644
+        )
+
+    def _import_json(self):
+        """Start from a legacy metadata.json once"""
+        json_path = self.base_path / "metadata.json"
+        if not json_path.exists():
+            return
+        legacy = JsonEvidenceIndex(self.base_path)
+        legacy.load()
+        for record in legacy:
+            self._records.add(record)
+        self._write_snapshot(self._generation)
+        json_path.rename(json_path.with_suffix(".json.migrated"))
+        print(f"📦 Migrated {len(self._records)} evidence records from metadata.json to the journal")
+
+    def _replay(self, path: Path) -> int:
+        """Apply journal entries; a torn final line from a crash is cut off"""
+        if not path.exists():
+            return 0
+        entries = 0
+        valid_bytes = 0
+        with open(path, 'rb') as f:
+            for line in f:
+                try:
+                    self._apply(json.loads(line))
+                except (ValueError, KeyError, TypeError):
+                    break
+                valid_bytes += len(line)
+                entries += 1
+        if valid_bytes < path.stat().st_size:
+            print(f"⚠️ Truncating damaged evidence journal tail at byte {valid_bytes}")
+            os.truncate(path, valid_bytes)
+        return entries
+
+    def _apply(self, entry: Dict[str, Any]):
+        op = entry["op"]
+        if op == "add":
+            self._records.add(EvidenceRecord(**entry["record"]))
+        elif op == "del":
+            for evidence_id in entry["ids"]:
+                self._records.remove(evidence_id)
+        elif op == "size":
+            self._records.update_sizes(entry["sizes"])
+        elif op == "clear":
+            self._records.clear()
+        else:
+            raise ValueError(f"Unknown journal op: {op}")
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def _append(self, entry: Dict[str, Any]):
+        os.write(self._fd, (json.dumps(entry, separators=(",", ":")) + "\n").encode())
+        self._entries += 1
+        self._unsynced = True
+
+        if self.fsync_interval >= 0:
+            if time.monotonic() - self._last_fsync >= self.fsync_interval:
+                self._sync()
+
+        if self._entries >= self.compact_every:
+            self._compact()
+
+    def _sync(self):
+        os.fsync(self._fd)
+        self._last_fsync = time.monotonic()
+        self._unsynced = False
+
+    def _write_snapshot(self, generation: int):
+        tmp_path = self.snapshot_path.with_suffix(".json.tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump({
+                "generation": generation,
+                "records": [record.to_dict() for record in self._records]
+            }, f, separators=(",", ":"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+
+    def _compact(self):
+        """Fold the journal into a new snapshot and start an empty journal"""
+        old_path = self._journal_path(self._generation)
+        generation = self._generation + 1
+
+        self._write_snapshot(generation)
+        os.close(self._fd)
+        self._generation = generation
+        self._fd = os.open(
+            self._journal_path(generation), os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644
+        )
+        old_path.unlink(missing_ok=True)
+
+        self._entries = 0
+        self._unsynced = False  # Everything is in the fsynced snapshot
+        self.compactions += 1
+
+    def add(self, record: EvidenceRecord):
+        with self._lock:
+            self._records.add(record)
+            self._append({"op": "add", "record": record.to_dict()})
+
+    def evict_oldest(self, keep: int) -> List[EvidenceRecord]:
+        with self._lock:
+            evicted = self._records.evict_oldest(keep)
+            if evicted:
+                self._append({"op": "del", "ids": [record.id for record in evicted]})
+            return evicted
+
+    def update_sizes(self, sizes: Dict[str, int]):
+        with self._lock:
+            self._records.update_sizes(sizes)
+            self._append({"op": "size", "sizes": sizes})
+
+    def clear(self):
+        with self._lock:
+            self._records.clear()
+            self._append({"op": "clear"})
+
+    def flush(self):
+        with self._lock:
+            if self._fd is not None and self._unsynced and self.fsync_interval >= 0:
+                self._sync()
+
+    def close(self):
+        with self._lock:
+            if self._fd is not None:
+                os.fsync(self._fd)
+                os.close(self._fd)
+                self._fd = None
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def get(self, evidence_id: str) -> Optional[EvidenceRecord]:
+        return self._records.get(evidence_id)
+
+    def recent(self, limit: int, weapon_type: Optional[str] = None) -> List[EvidenceRecord]:
+        with self._lock:
+            return self._records.recent(limit, weapon_type)
+
+    def count(self) -> int:
+        return len(self._records)
+
+    def totals(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return self._records.totals()
+
+    def __iter__(self) -> Iterator[EvidenceRecord]:
+        with self._lock:
+            return iter(self._records)
+
+
+INDEX_BACKENDS = {
+    JsonEvidenceIndex.name: JsonEvidenceIndex,
+    SqliteEvidenceIndex.name: SqliteEvidenceIndex,
+    JournalEvidenceIndex.name: JournalEvidenceIndex,
+}
+
+
+def create_index(name: str, base_path: Path, **options) -> EvidenceIndex:
+    """Instantiate an evidence index by config name ("sqlite", "journal" or "json")"""
+    try:
+        index_cls = INDEX_BACKENDS[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown evidence index '{name}', expected one of: {', '.join(INDEX_BACKENDS)}"
+        )
+    return index_cls(base_path, **options)
@@ -0,0 +1,9 @@
+"""
+Shared test fixtures
+Tests run from backend/ like the server, importing detection, storage, ...
+as top-level packages
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,110 @@
+"""
+Tests for the ONNX Runtime backend's pre- and post-processing
+"""
+import numpy as np
+import pytest
+
+from detection.backends import OnnxRuntimeBackend, letterbox, preprocess, nms, batched_nms
+
+
+FRAME_H, FRAME_W = 480, 640
+INPUT_SIZE = 320  # ratio 0.5, 40 px of padding above and below
+
+
+def to_network(box):
+    """Frame x1, y1, x2, y2 → letterboxed center x, y, w, h"""
+    x1, y1, x2, y2 = (np.asarray(box, dtype=np.float32) * 0.5) + [0, 40, 0, 40]
+    return [(x1 + x2) / 2, (y1 + y2) / 2, x2 - x1, y2 - y1]
+
+
+class FakeSession:
+    """Returns the same YOLOv8-shaped prediction for every image in the batch"""
+
+    def __init__(self, anchors):
+        # anchors: (center x, y, w, h, class id, score)
+        self.prediction = np.zeros((4 + 3, len(anchors)), dtype=np.float32)
+        for i, (cx, cy, w, h, class_id, score) in enumerate(anchors):
+            self.prediction[:4, i] = (cx, cy, w, h)
+            self.prediction[4 + class_id, i] = score
+        self.batch_sizes = []
+
+    def run(self, _, inputs):
+        (batch,) = inputs.values()
+        self.batch_sizes.append(len(batch))
+        return [np.repeat(self.prediction[None], len(batch), axis=0)]
+
+
+def make_backend(anchors, fixed_batch=None) -> OnnxRuntimeBackend:
+    backend = OnnxRuntimeBackend("model.onnx", input_size=INPUT_SIZE, conf_threshold=0.25, iou_threshold=0.5)
+    backend.session = FakeSession(anchors)
+    backend._input_name = "images"
+    backend._fixed_batch = fixed_batch
+    return backend
+
+
+def frames(count):
+    return [np.zeros((FRAME_H, FRAME_W, 3), dtype=np.uint8) for _ in range(count)]
+
+
+def test_letterbox_scales_and_centers():
+    padded, ratio, pad = letterbox(frames(1)[0], INPUT_SIZE)
+    assert padded.shape == (INPUT_SIZE, INPUT_SIZE, 3)
+    assert ratio == pytest.approx(0.5)
+    assert pad == (0, 40)
+    # Padding rows keep the letterbox colour, the image rows are the frame
+    assert (padded[:40] == 114).all() and (padded[40:280] == 0).all()
+
+
+def test_preprocess_builds_normalized_rgb_nchw_batch():
+    frame = np.zeros((FRAME_H, FRAME_W, 3), dtype=np.uint8)
+    frame[..., 0] = 255  # Blue in BGR
+    batch, transforms = preprocess([frame, frame], INPUT_SIZE)
+    assert batch.shape == (2, 3, INPUT_SIZE, INPUT_SIZE) and batch.dtype == np.float32
+    assert batch[0, 2, 160, 160] == pytest.approx(1.0)  # Blue is the last RGB channel
+    assert batch[0, 0, 160, 160] == pytest.approx(0.0)
+    assert transforms == [(pytest.approx(0.5), (0, 40))] * 2
+
+
+def test_nms_keeps_best_of_overlapping_boxes():
+    boxes = np.array([[0, 0, 10, 10], [1, 1, 11, 11], [50, 50, 60, 60]], dtype=np.float32)
+    scores = np.array([0.8, 0.9, 0.7], dtype=np.float32)
+    assert nms(boxes, scores, 0.5).tolist() == [1, 2]
+    # Boxes of different classes never suppress each other
+    assert sorted(batched_nms(boxes, scores, np.array([0, 1, 0]), 0.5).tolist()) == [0, 1, 2]
+
+
+def test_postprocess_maps_boxes_back_to_frame_coordinates():
+    box = [100, 100, 200, 160]
+    backend = make_backend([
+        (*to_network(box), 1, 0.9),
+        (*to_network([102, 101, 202, 161]), 1, 0.8),  # Duplicate, suppressed
+        (*to_network([300, 200, 400, 300]), 2, 0.6),
+        (*to_network([0, 0, 50, 50]), 0, 0.1)  # Below conf_threshold
+    ])
+
+    (result,) = backend.predict(frames(1))
+
+    assert result.class_ids.tolist() == [1, 2]
+    assert result.scores.tolist() == pytest.approx([0.9, 0.6])
+    np.testing.assert_allclose(result.boxes[0], box, atol=0.5)
+    np.testing.assert_allclose(result.boxes[1], [300, 200, 400, 300], atol=0.5)
+
+
+def test_postprocess_clips_to_the_frame():
+    backend = make_backend([(*to_network([-20, -10, 100, 600]), 0, 0.9)])
+    (result,) = backend.predict(frames(1))
+    np.testing.assert_allclose(result.boxes[0], [0, 0, 100, FRAME_H], atol=0.5)
+
+
+@pytest.mark.parametrize("fixed_batch, count, expected_runs", [
+    (None, 5, [5]),
+    (1, 3, [1, 1, 1]),
+    (4, 3, [4]),
+    (4, 6, [4, 4]),
+])
+def test_static_batch_models_get_full_size_batches(fixed_batch, count, expected_runs):
+    backend = make_backend([(*to_network([100, 100, 200, 160]), 1, 0.9)], fixed_batch)
+    results = backend.predict(frames(count))
+    assert backend.session.batch_sizes == expected_runs
+    assert len(results) == count
+    assert all(len(result) == 1 for result in results)
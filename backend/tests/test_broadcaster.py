@@ -0,0 +1,122 @@
+"""
+Tests for the per-client send queues of the stream broadcaster
+"""
+import asyncio
+
+from detection.broadcaster import ClientChannel, StreamBroadcaster
+
+
+class FakeClient:
+    """Records what is sent; sends can be made to hang or fail"""
+
+    def __init__(self, hang: bool = False, fail: bool = False):
+        self.hang = hang
+        self.fail = fail
+        self.sent = []
+        self.close_code = None
+
+    async def _send(self, payload):
+        if self.fail:
+            raise ConnectionError("socket gone")
+        if self.hang:
+            await asyncio.sleep(3600)
+        self.sent.append(payload)
+
+    async def send_bytes(self, data):
+        await self._send(data)
+
+    async def send_json(self, message):
+        await self._send(message)
+
+    async def close(self, code=1000):
+        self.close_code = code
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_slow_client_gets_only_the_latest_frames():
+    async def run():
+        broadcaster = StreamBroadcaster(max_queued_frames=2)
+        client = FakeClient()
+        broadcaster.add_client(client)
+        # The sender has not run yet: the queue keeps the newest two frames
+        for number in range(5):
+            broadcaster.publish_frame(b"%d" % number)
+        await settle()
+        return client, broadcaster.get_status()
+
+    client, status = asyncio.run(run())
+    assert client.sent == [b"3", b"4"]
+    assert status["frames_published"] == 5
+    assert status["frames_dropped"] == 3
+    assert status["per_client"][0]["frames_sent"] == 2
+
+
+def test_events_are_sent_before_frames_and_never_dropped():
+    async def run():
+        broadcaster = StreamBroadcaster(max_queued_frames=1, max_pending_events=10)
+        client = FakeClient()
+        broadcaster.add_client(client)
+        broadcaster.publish_frame(b"old")
+        for number in range(3):
+            broadcaster.publish_event({"event": number})
+        broadcaster.publish_frame(b"new")
+        await settle()
+        return client
+
+    client = asyncio.run(run())
+    assert client.sent == [{"event": 0}, {"event": 1}, {"event": 2}, b"new"]
+
+
+def test_client_not_reading_events_is_closed_with_policy_violation():
+    async def run():
+        broadcaster = StreamBroadcaster(max_pending_events=3)
+        stalled, healthy = FakeClient(hang=True), FakeClient()
+        broadcaster.add_client(stalled)
+        broadcaster.add_client(healthy)
+        await settle()
+        for number in range(6):
+            broadcaster.publish_event({"event": number})
+            await settle()
+        return stalled, healthy, broadcaster.client_count
+
+    stalled, healthy, client_count = asyncio.run(run())
+    assert stalled.close_code == ClientChannel.POLICY_VIOLATION
+    assert healthy.close_code is None and len(healthy.sent) == 6
+    assert client_count == 1
+
+
+def test_failed_send_closes_the_socket_and_unsubscribes():
+    async def run():
+        broadcaster = StreamBroadcaster()
+        broken = FakeClient(fail=True)
+        broadcaster.add_client(broken)
+        broadcaster.publish_frame(b"frame")
+        await settle()
+        return broken, broadcaster.client_count
+
+    broken, client_count = asyncio.run(run())
+    assert broken.close_code == ClientChannel.INTERNAL_ERROR
+    assert client_count == 0
+
+
+def test_removed_client_is_not_closed_by_the_channel():
+    async def run():
+        broadcaster = StreamBroadcaster()
+        client = FakeClient()
+        channel = broadcaster.add_client(client)
+        assert broadcaster.add_client(client) is channel
+        broadcaster.remove_client(client)
+        broadcaster.remove_client(client)
+        await settle()
+        broadcaster.publish_frame(b"frame")
+        await settle()
+        return client, channel, broadcaster.client_count
+
+    client, channel, client_count = asyncio.run(run())
+    assert channel.closed
+    assert client.close_code is None and client.sent == []
+    assert client_count == 0
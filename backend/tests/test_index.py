@@ -0,0 +1,252 @@
+"""
+Tests for the evidence metadata indexes
+"""
+import json
+import asyncio
+
+import pytest
+
+import storage.index
+from storage import EvidenceManager
+from storage.index import (
+    EvidenceRecord, RecordStore, JournalEvidenceIndex, INDEX_BACKENDS, create_index
+)
+
+
+def record(number: int, weapon_type: str = "gun", size_bytes: int = 100) -> EvidenceRecord:
+    return EvidenceRecord(
+        id=f"EV{number:04d}",
+        weapon_type=weapon_type,
+        confidence=0.9,
+        timestamp=f"2024-01-01T00:00:{number % 60:02d}",
+        location="Gate",
+        image_path=f"images/EV{number:04d}.jpg",
+        bbox=(1, 2, 3, 4),
+        camera_id="cam",
+        size_bytes=size_bytes
+    )
+
+
+def ids(records):
+    return [r.id for r in records]
+
+
+def test_record_store_keeps_per_type_order_through_eviction_and_removal():
+    store = RecordStore()
+    for number, weapon_type in enumerate(["gun", "knife", "gun", "rifle", "knife", "gun"]):
+        store.add(record(number, weapon_type))
+
+    assert ids(store.recent(2)) == ["EV0005", "EV0004"]
+    assert ids(store.recent(10, "gun")) == ["EV0005", "EV0002", "EV0000"]
+    assert store.recent(10, "pistol") == []
+
+    # Removing from the middle and evicting from the front keep every queue in step
+    assert store.remove("EV0002").id == "EV0002"
+    assert store.remove("EV0002") is None
+    assert ids(store.evict_oldest(keep=3)) == ["EV0000", "EV0001"]
+    assert ids(store) == ["EV0003", "EV0004", "EV0005"]
+    assert ids(store.recent(10, "gun")) == ["EV0005"]
+    assert ids(store.recent(10, "knife")) == ["EV0004"]
+    assert store.get("EV0000") is None and store.get("EV0004").weapon_type == "knife"
+    assert store.totals() == {
+        "gun": {"count": 1, "bytes": 100},
+        "knife": {"count": 1, "bytes": 100},
+        "rifle": {"count": 1, "bytes": 100}
+    }
+
+
+def test_record_store_updates_bytes_and_drops_empty_types():
+    store = RecordStore()
+    store.add(record(1, "gun"))
+    store.add(record(2, "knife", size_bytes=0))
+    store.update_sizes({"EV0002": 400, "EV0404": 5})
+    assert store.totals()["knife"] == {"count": 1, "bytes": 400}
+
+    # Re-adding an id replaces the old record
+    store.add(record(1, "rifle", size_bytes=30))
+    assert len(store) == 2 and ids(store) == ["EV0002", "EV0001"]
+    assert store.totals() == {"knife": {"count": 1, "bytes": 400}, "rifle": {"count": 1, "bytes": 30}}
+
+    store.evict_oldest(keep=0)
+    assert len(store) == 0 and store.totals() == {}
+
+
+def open_index(name, path, **options):
+    index = create_index(name, path, **options)
+    index.load()
+    return index
+
+
+@pytest.mark.parametrize("name", sorted(INDEX_BACKENDS))
+def test_index_insert_query_delete_and_stats(tmp_path, name):
+    index = open_index(name, tmp_path)
+    for number in range(5):
+        index.add(record(number, "knife" if number % 2 else "gun"))
+
+    assert index.count() == 5
+    assert index.get("EV0003").weapon_type == "knife"
+    assert list(index.get("EV0003").bbox) == [1, 2, 3, 4]
+    assert index.get("EV9999") is None
+    assert ids(index.recent(3)) == ["EV0004", "EV0003", "EV0002"]
+    assert ids(index.recent(5, "knife")) == ["EV0003", "EV0001"]
+    assert index.totals() == {"gun": {"count": 3, "bytes": 300}, "knife": {"count": 2, "bytes": 200}}
+
+    assert ids(index.evict_oldest(keep=3)) == ["EV0000", "EV0001"]
+    assert index.evict_oldest(keep=3) == []
+    index.update_sizes({"EV0003": 50, "EV9999": 1})
+    assert ids(index) == ["EV0002", "EV0003", "EV0004"]
+    assert index.totals() == {"gun": {"count": 2, "bytes": 200}, "knife": {"count": 1, "bytes": 50}}
+    index.close()
+
+    # Everything survives a reopen
+    reopened = open_index(name, tmp_path)
+    assert ids(reopened) == ["EV0002", "EV0003", "EV0004"]
+    assert reopened.get("EV0003").size_bytes == 50
+    assert reopened.totals() == {"gun": {"count": 2, "bytes": 200}, "knife": {"count": 1, "bytes": 50}}
+
+    reopened.clear()
+    assert reopened.count() == 0 and reopened.totals() == {} and reopened.recent(10) == []
+    reopened.close()
+    assert open_index(name, tmp_path).count() == 0
+
+
+@pytest.mark.parametrize("name", ["sqlite", "journal"])
+def test_metadata_json_is_migrated_once(tmp_path, name):
+    legacy = [record(number).to_dict() for number in range(3)]
+    legacy[0].pop("size_bytes")  # Written before sizes were tracked
+    (tmp_path / "metadata.json").write_text(json.dumps(legacy))
+
+    index = open_index(name, tmp_path)
+    assert ids(index) == ["EV0000", "EV0001", "EV0002"]
+    assert index.get("EV0000").size_bytes == 0
+    assert index.totals() == {"gun": {"count": 3, "bytes": 200}}
+    index.close()
+    assert not (tmp_path / "metadata.json").exists()
+    assert (tmp_path / "metadata.json.migrated").exists()
+
+    # A second start reads only the new store
+    assert open_index(name, tmp_path).count() == 3
+
+
+def test_sqlite_stats_are_rebuilt_for_an_older_database(tmp_path):
+    index = open_index("sqlite", tmp_path)
+    for number in range(3):
+        index.add(record(number, size_bytes=10))
+    index._conn.executescript(
+        "DROP TRIGGER evidence_stats_insert; DROP TRIGGER evidence_stats_delete; "
+        "DROP TRIGGER evidence_stats_size; DROP TABLE evidence_stats;"
+    )
+    index.close()
+
+    reopened = open_index("sqlite", tmp_path)
+    assert reopened.totals() == {"gun": {"count": 3, "bytes": 30}}
+    reopened.add(record(3, size_bytes=10))
+    assert reopened.count() == 4
+    reopened.close()
+
+
+def open_journal(path, **options) -> JournalEvidenceIndex:
+    index = JournalEvidenceIndex(path, **options)
+    index.load()
+    return index
+
+
+@pytest.fixture
+def fsyncs(monkeypatch):
+    """Count fsyncs of the journal index"""
+    calls = []
+    real_fsync = storage.index.os.fsync
+
+    def counting_fsync(fd):
+        calls.append(fd)
+        real_fsync(fd)
+
+    monkeypatch.setattr(storage.index.os, "fsync", counting_fsync)
+    return calls
+
+
+def test_journal_replays_after_compaction(tmp_path):
+    index = open_journal(tmp_path, compact_every=5)
+    for number in range(6):
+        index.add(record(number))
+    index.evict_oldest(keep=3)
+    index.update_sizes({"EV0005": 250})
+    index.close()
+    assert index.compactions == 1
+    # Only the journal of the current generation is left
+    assert [p.name for p in tmp_path.glob("evidence.*.journal")] == ["evidence.1.journal"]
+
+    reopened = open_journal(tmp_path, compact_every=5)
+    assert ids(reopened) == ["EV0003", "EV0004", "EV0005"]
+    assert reopened.get("EV0005").size_bytes == 250
+    assert reopened.totals() == {"gun": {"count": 3, "bytes": 450}}
+    reopened.close()
+
+
+def test_journal_cuts_off_a_torn_tail(tmp_path):
+    index = open_journal(tmp_path)
+    index.add(record(1))
+    index.add(record(2))
+    index.close()
+    journal = tmp_path / "evidence.0.journal"
+    intact = journal.stat().st_size
+    with open(journal, "ab") as f:
+        f.write(b'{"op":"add","rec')
+
+    reopened = open_journal(tmp_path)
+    assert ids(reopened) == ["EV0001", "EV0002"]
+    assert journal.stat().st_size == intact
+    reopened.add(record(3))
+    reopened.close()
+    assert ids(open_journal(tmp_path)) == ["EV0001", "EV0002", "EV0003"]
+
+
+def test_journal_flush_syncs_writes_left_unsynced(tmp_path, fsyncs):
+    index = open_journal(tmp_path, fsync_interval=60.0)
+    index.add(record(1))  # First write syncs
+    index.add(record(2))  # Within the interval: left to flush()
+    assert len(fsyncs) == 1
+
+    index.flush()
+    assert len(fsyncs) == 2
+    index.flush()  # Nothing new to sync
+    assert len(fsyncs) == 2
+    index.close()
+
+
+def test_journal_without_fsyncs_is_not_flushed(tmp_path, fsyncs):
+    index = open_journal(tmp_path, fsync_interval=-1)
+    index.add(record(1))
+    index.flush()
+    assert index.flush_interval == 0
+    assert fsyncs == []
+    index.close()
+
+
+def test_evidence_manager_flushes_the_journal_periodically(tmp_path, fsyncs):
+    manager = EvidenceManager(
+        base_path=str(tmp_path),
+        index_backend="journal",
+        index_options={"fsync_interval": 0.05}
+    )
+
+    async def run():
+        manager.start_reconciliation(interval=0)
+        try:
+            manager._index.add(record(1))
+            manager._index.add(record(2))
+            synced = len(fsyncs)
+            await asyncio.sleep(0.3)
+            return synced
+        finally:
+            await manager.stop_reconciliation()
+
+    synced = asyncio.run(run())
+    assert len(fsyncs) > synced
+    assert not manager._index._unsynced
+    manager.close()
+
+
+def test_create_index_rejects_unknown_backends(tmp_path):
+    with pytest.raises(ValueError):
+        create_index("csv", tmp_path)
@@ -0,0 +1,117 @@
+"""
+Tests for shared-memory capture and the inference process pool
+"""
+import queue
+import asyncio
+import threading
+
+import cv2
+import numpy as np
+import pytest
+
+from detection import WeaponDetector
+from metrics import INFERENCE_SECONDS
+from detection.multiprocess import SharedFrameRing, FrameRef, ProcessInferencePool, capture_worker
+import bench.common  # noqa: F401  (registers the "stub" backend)
+
+
+@pytest.fixture
+def ring():
+    ring = SharedFrameRing((120, 160, 3), slots=2, create=True)
+    yield ring
+    ring.close()
+
+
+def write_frame(ring: SharedFrameRing, slot: int) -> FrameRef:
+    view = ring.begin_write(slot)
+    view[:] = np.random.default_rng(slot).integers(0, 255, view.shape, dtype=np.uint8)
+    seq = ring.end_write(slot)
+    return FrameRef(ring.spec, slot, seq)
+
+
+def test_ring_seqlock_detects_overwrite(ring):
+    ref = write_frame(ring, 0)
+    assert ring.is_current(ref.slot, ref.seq)
+    write_frame(ring, 0)
+    assert not ring.is_current(ref.slot, ref.seq)
+
+
+class UnreadableCapture:
+    """Opens fine but never delivers a frame, like a truncated file"""
+
+    opened = 0
+
+    def __init__(self, source):
+        UnreadableCapture.opened += 1
+
+    def isOpened(self):
+        return True
+
+    def set(self, *args):
+        return True
+
+    def grab(self):
+        return False
+
+    def release(self):
+        pass
+
+
+def test_capture_worker_gives_up_on_unreadable_file(ring, monkeypatch):
+    monkeypatch.setattr(cv2, "VideoCapture", UnreadableCapture)
+    UnreadableCapture.opened = 0
+    frames_out = queue.Queue(maxsize=2)
+
+    capture_worker(
+        "clip.avi", 160, 120, 30, ring.spec, frames_out, threading.Event(),
+        initial_backoff=0.001, max_backoff=0.01, max_file_failures=3
+    )
+
+    # Initial open plus three backed-off reopens, then end of stream
+    assert UnreadableCapture.opened == 4
+    assert frames_out.get_nowait() is None
+
+
+def test_pool_returns_detections_from_worker_processes(ring):
+    detector = WeaponDetector(
+        model_path="",
+        confidence_threshold=0.5,
+        backend="stub",
+        backend_options={"boxes": 4, "preprocess": False}
+    )
+    pool = ProcessInferencePool(detector, workers=1, request_timeout=60.0)
+
+    async def run():
+        pool.start()
+        try:
+            ref = write_frame(ring, 0)
+            detections = await pool.detect(ring.view(0), camera_id="cam", ref=ref)
+            return detections, pool.get_status()
+        finally:
+            await pool.stop()
+
+    detections, status = asyncio.run(run())
+
+    # Class names arrive with the worker's ready message
+    assert status["workers_ready"] == 1
+    assert status["frames_inferred"] == 1
+    assert detections
+    assert {d.camera_id for d in detections} == {"cam"}
+    assert {d.class_name for d in detections} <= {"gun", "knife", "rifle", "person_detected"}
+    # The worker reports its forward passes to the parent's histogram
+    assert sum(INFERENCE_SECONDS.labels("stub", "1").counts) == 1
+
+
+def test_pool_answers_pending_requests_when_workers_die(ring):
+    detector = WeaponDetector(model_path="missing.onnx", backend="onnx")
+    pool = ProcessInferencePool(detector, workers=1, request_timeout=60.0)
+
+    async def run():
+        pool.start()
+        try:
+            return await pool.detect(ring.view(0), camera_id="cam", ref=write_frame(ring, 0))
+        finally:
+            await pool.stop()
+
+    assert asyncio.run(run()) == []
+    assert pool.workers_exited == 1
@@ -0,0 +1,138 @@
+"""
+Tests for the object tracker and event suppression
+"""
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from detection import tracker, suppression
+from detection.detector import Detection
+from detection.tracker import ObjectTracker
+from detection.suppression import EventSuppressor
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    for module in (tracker, suppression):
+        monkeypatch.setattr(module, "time", SimpleNamespace(monotonic=clock.monotonic))
+    return clock
+
+
+def detection(bbox, class_name="gun", track_id=None) -> Detection:
+    return Detection(
+        class_name=class_name, confidence=0.9, bbox=bbox,
+        timestamp=datetime.now(), frame_id=0, camera_id="cam", track_id=track_id
+    )
+
+
+def moving(step: int, dx: int = 5):
+    return (100 + step * dx, 100, 160 + step * dx, 140)
+
+
+def test_track_keeps_its_id_while_the_object_moves(clock):
+    objects = ObjectTracker(iou_threshold=0.3)
+
+    boxes, started = objects.step([detection(moving(0))])
+    assert len(started) == 1
+    track_id = started[0].track_id
+
+    for step in range(1, 6):
+        boxes, started = objects.step([detection(moving(step))])
+        assert started == []
+        assert [box.track_id for box in boxes] == [track_id]
+    assert objects.get_status()["tracks_started"] == 1
+
+
+def test_skipped_frames_coast_the_box_forward(clock):
+    objects = ObjectTracker()
+    for step in range(4):
+        objects.step([detection(moving(step, dx=10))])
+
+    (before,) = objects.step(None)[0]
+    (after,) = objects.step(None)[0]
+    assert after.track_id == before.track_id
+    assert after.bbox[0] > before.bbox[0]  # Still moving right
+
+
+def test_classes_are_tracked_separately(clock):
+    objects = ObjectTracker()
+    _, started = objects.step([detection(moving(0), "gun"), detection(moving(0), "knife")])
+    assert len({d.track_id for d in started}) == 2
+
+    boxes, started = objects.step([detection(moving(1), "knife")])
+    assert started == []
+    assert {box.class_name for box in boxes} == {"gun", "knife"}
+
+
+def test_tracks_are_dropped_after_misses_or_timeout(clock):
+    objects = ObjectTracker(max_missed=2, max_coast_seconds=2.0)
+    objects.step([detection(moving(0))])
+    for _ in range(2):
+        assert objects.step([])[0]
+    assert objects.step([])[0] == []
+
+    objects.step([detection(moving(0))])
+    clock.now += 2.5
+    assert objects.step(None)[0] == []
+
+    # A returning object gets a new id
+    _, started = objects.step([detection(moving(0))])
+    assert len(started) == 1
+
+
+def test_min_hits_delays_confirmation(clock):
+    objects = ObjectTracker(min_hits=3)
+    assert objects.step([detection(moving(0))]) == ([], [])
+    assert objects.step([detection(moving(1))]) == ([], [])
+    boxes, started = objects.step([detection(moving(2))])
+    assert len(boxes) == 1 and len(started) == 1
+    assert objects.get_status() == {"active_tracks": 1, "tentative_tracks": 0, "tracks_started": 1}
+
+
+def test_suppressor_emits_one_event_per_track_per_cooldown(clock):
+    events = EventSuppressor(cooldown_seconds=5.0)
+    assert len(events.filter([detection(moving(0), track_id=1)])) == 1
+
+    # The same track is suppressed even after it moved away from the first box
+    clock.now += 1.0
+    assert events.filter([detection(moving(20), track_id=1)]) == []
+
+    clock.now += 4.5
+    assert len(events.filter([detection(moving(20), track_id=1)])) == 1
+    assert events.get_status()["events_emitted"] == 2
+    assert events.get_status()["events_suppressed"] == 1
+
+
+def test_suppressor_matches_untracked_detections_by_region(clock):
+    events = EventSuppressor(cooldown_seconds=5.0, region_iou=0.3)
+    assert len(events.filter([detection(moving(0))])) == 1
+
+    # Overlapping box of the same class: same object
+    assert events.filter([detection(moving(1))]) == []
+    # The remembered region follows the object step by step
+    for step in range(2, 12):
+        assert events.filter([detection(moving(step, dx=10))]) == []
+
+    # Far away, or another class: new events
+    assert len(events.filter([detection((500, 400, 560, 440))])) == 1
+    assert len(events.filter([detection(moving(0), "knife")])) == 1
+
+
+def test_suppressor_forgets_events_after_the_cooldown(clock):
+    events = EventSuppressor(cooldown_seconds=2.0)
+    events.filter([detection(moving(0), track_id=7)])
+    clock.now += 2.0
+    assert len(events.filter([detection(moving(0), track_id=7)])) == 1
+
+    events.reset()
+    assert len(events.filter([detection(moving(0), track_id=7)])) == 1
@@ -0,0 +1,3 @@
+"""
+Command-line maintenance tools (run from backend/ with ``python -m tools.<name>``)
+"""
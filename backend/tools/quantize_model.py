@@ -0,0 +1,380 @@
+"""
+INT8 Post-Training Quantization for the Weapon Model
+
+Statically quantizes the ONNX export of ``detection.model_path`` using frames
+from the evidence store as calibration data, then compares the INT8 model
+against FP32 on the same frames (agreement and mAP@0.5 with FP32 detections
+as reference) and reports the latency speedup.
+
+Usage (from backend/):
+    python -m tools.quantize_model
+    python -m tools.quantize_model --max-images 300 --report quant.json
+
+Load the result with:
+    detection:
+      backend: "onnx"
+      model_path: "models/<name>.int8.onnx"
+"""
+import sys
+import json
+import time
+import argparse
+import tempfile
+import cv2
+import numpy as np
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+
+from config import get_config
+from detection.backends import OnnxRuntimeBackend, RawDetections, preprocess, box_iou
+
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp"}
+
+
+# ============================================================================
+# Calibration Data
+# ============================================================================
+
+def load_calibration_frames(image_dir: Path, max_images: int) -> List[np.ndarray]:
+    """Load up to max_images BGR frames, spread evenly over the directory"""
+    paths = sorted(
+        p for p in image_dir.glob("*") if p.suffix.lower() in IMAGE_EXTENSIONS
+    )
+    if len(paths) > max_images:
+        step = len(paths) / max_images
+        paths = [paths[int(i * step)] for i in range(max_images)]
+
+    frames = []
+    for path in paths:
+        frame = cv2.imread(str(path))
+        if frame is not None:
+            frames.append(frame)
+    return frames
+
+
+class FrameCalibrationReader:
+    """onnxruntime CalibrationDataReader over letterboxed frames"""
+
+    def __init__(self, frames: List[np.ndarray], input_name: str, input_size: int):
+        self._inputs = (
+            {input_name: preprocess([frame], input_size)[0]} for frame in frames
+        )
+
+    def get_next(self) -> Optional[Dict[str, np.ndarray]]:
+        return next(self._inputs, None)
+
+
+# ============================================================================
+# Quantization
+# ============================================================================
+
+def head_node_names(model_path: Path) -> List[str]:
+    """Nodes of the final (Detect) module, kept in FP32 for box precision"""
+    import onnx
+
+    graph = onnx.load(str(model_path)).graph
+    prefixes = [
+        node.name.split("/")[1] for node in graph.node
+        if node.name.startswith("/model.") and len(node.name.split("/")) > 2
+    ]
+    if not prefixes:
+        return []
+
+    head = max(prefixes, key=lambda prefix: int(prefix.split(".")[1]))
+    return [node.name for node in graph.node if node.name.startswith(f"/{head}/")]
+
+
+def quantize(
+    fp32_path: Path,
+    output_path: Path,
+    frames: List[np.ndarray],
+    input_size: int,
+    per_channel: bool = True,
+    fp32_head: bool = True,
+    calibration_method: str = "minmax"
+):
+    """Run static INT8 quantization (QDQ format) with frame calibration"""
+    import onnxruntime as ort
+    from onnxruntime.quantization import (
+        quantize_static, QuantFormat, QuantType, CalibrationMethod
+    )
+    from onnxruntime.quantization.shape_inference import quant_pre_process
+
+    methods = {
+        "minmax": CalibrationMethod.MinMax,
+        "entropy": CalibrationMethod.Entropy,
+        "percentile": CalibrationMethod.Percentile,
+    }
+
+    input_name = ort.InferenceSession(
+        str(fp32_path), providers=["CPUExecutionProvider"]
+    ).get_inputs()[0].name
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Shape inference + graph cleanup recommended before static quantization
+        prepared = Path(tmp) / "prepared.onnx"
+        try:
+            quant_pre_process(str(fp32_path), str(prepared))
+        except Exception as e:
+            print(f"⚠️ Pre-processing skipped: {e}")
+            prepared = fp32_path
+
+        excluded = head_node_names(prepared) if fp32_head else []
+
+        quantize_static(
+            model_input=str(prepared),
+            model_output=str(output_path),
+            calibration_data_reader=FrameCalibrationReader(frames, input_name, input_size),
+            quant_format=QuantFormat.QDQ,
+            activation_type=QuantType.QUInt8,
+            weight_type=QuantType.QInt8,
+            per_channel=per_channel,
+            calibrate_method=methods[calibration_method],
+            nodes_to_exclude=excluded
+        )
+
+    # Carry class names over so the detector can map classes
+    import onnx
+    source = onnx.load(str(fp32_path))
+    quantized = onnx.load(str(output_path))
+    existing = {prop.key for prop in quantized.metadata_props}
+    for prop in source.metadata_props:
+        if prop.key not in existing:
+            quantized.metadata_props.add(key=prop.key, value=prop.value)
+    onnx.save(quantized, str(output_path))
+
+
+# ============================================================================
+# Evaluation
+# ============================================================================
+
+def run_backend(
+    backend: OnnxRuntimeBackend,
+    frames: List[np.ndarray],
+    warmup: int = 3
+) -> Dict[str, Any]:
+    """Predict every frame one at a time, timing each call"""
+    for frame in frames[:warmup]:
+        backend.predict([frame])
+
+    outputs, latencies = [], []
+    for frame in frames:
+        started = time.perf_counter()
+        outputs.append(backend.predict([frame])[0])
+        latencies.append((time.perf_counter() - started) * 1000.0)
+
+    latencies = np.asarray(latencies)
+    return {
+        "outputs": outputs,
+        "latency_ms": {
+            "mean": round(float(latencies.mean()), 2),
+            "p50": round(float(np.percentile(latencies, 50)), 2),
+            "p95": round(float(np.percentile(latencies, 95)), 2)
+        }
+    }
+
+
+def _filter(raw: RawDetections, threshold: float) -> RawDetections:
+    mask = raw.scores >= threshold
+    return RawDetections(raw.boxes[mask], raw.scores[mask], raw.class_ids[mask])
+
+
+def match_detections(
+    reference: RawDetections,
+    candidate: RawDetections,
+    iou_threshold: float = 0.5
+) -> List[tuple]:
+    """Greedy same-class matching by candidate score; returns (ref_idx, cand_idx, iou)"""
+    if len(reference) == 0 or len(candidate) == 0:
+        return []
+
+    iou = box_iou(candidate.boxes, reference.boxes)
+    iou[candidate.class_ids[:, None] != reference.class_ids[None, :]] = 0.0
+
+    matches, used = [], set()
+    for cand_idx in np.argsort(-candidate.scores):
+        order = np.argsort(-iou[cand_idx])
+        for ref_idx in order:
+            if iou[cand_idx, ref_idx] < iou_threshold:
+                break
+            if ref_idx not in used:
+                used.add(ref_idx)
+                matches.append((int(ref_idx), int(cand_idx), float(iou[cand_idx, ref_idx])))
+                break
+    return matches
+
+
+def average_precision(tp: np.ndarray, scores: np.ndarray, num_reference: int) -> float:
+    """All-point interpolated AP from per-prediction true-positive flags"""
+    if num_reference == 0:
+        return float("nan")
+    if len(tp) == 0:
+        return 0.0
+
+    order = np.argsort(-scores)
+    tp = tp[order]
+    tp_cum = np.cumsum(tp)
+    fp_cum = np.cumsum(1 - tp)
+    recall = tp_cum / num_reference
+    precision = tp_cum / np.maximum(tp_cum + fp_cum, 1e-9)
+
+    recall = np.concatenate(([0.0], recall, [1.0]))
+    precision = np.concatenate(([1.0], precision, [0.0]))
+    precision = np.maximum.accumulate(precision[::-1])[::-1]
+    changed = np.where(recall[1:] != recall[:-1])[0]
+    return float(np.sum((recall[changed + 1] - recall[changed]) * precision[changed + 1]))
+
+
+def compare(
+    reference_outputs: List[RawDetections],
+    candidate_outputs: List[RawDetections],
+    confidence_threshold: float,
+    names: Dict[int, str]
+) -> Dict[str, Any]:
+    """Agreement and mAP@0.5 of the candidate, taking the reference as ground truth"""
+    matched = reference_total = candidate_total = 0
+    ious, score_deltas = [], []
+    per_class: Dict[int, Dict[str, list]] = {}
+
+    for reference, candidate in zip(reference_outputs, candidate_outputs):
+        reference = _filter(reference, confidence_threshold)
+
+        # Agreement at the operating threshold
+        thresholded = _filter(candidate, confidence_threshold)
+        matches = match_detections(reference, thresholded)
+        matched += len(matches)
+        reference_total += len(reference)
+        candidate_total += len(thresholded)
+        for ref_idx, cand_idx, iou in matches:
+            ious.append(iou)
+            score_deltas.append(abs(float(reference.scores[ref_idx] - thresholded.scores[cand_idx])))
+
+        # mAP uses every candidate box so the full PR curve is covered
+        matched_candidates = {cand_idx for _, cand_idx, _ in match_detections(reference, candidate)}
+        for class_id in set(reference.class_ids.tolist()) | set(candidate.class_ids.tolist()):
+            entry = per_class.setdefault(class_id, {"tp": [], "scores": [], "num_reference": [0]})
+            entry["num_reference"][0] += int((reference.class_ids == class_id).sum())
+            for idx in np.where(candidate.class_ids == class_id)[0]:
+                entry["tp"].append(1.0 if idx in matched_candidates else 0.0)
+                entry["scores"].append(float(candidate.scores[idx]))
+
+    class_ap = {}
+    for class_id, entry in per_class.items():
+        ap = average_precision(
+            np.asarray(entry["tp"]), np.asarray(entry["scores"]), entry["num_reference"][0]
+        )
+        if not np.isnan(ap):
+            class_ap[names.get(class_id, str(class_id))] = round(ap, 4)
+
+    precision = matched / candidate_total if candidate_total else 1.0
+    recall = matched / reference_total if reference_total else 1.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+
+    return {
+        "reference_detections": reference_total,
+        "quantized_detections": candidate_total,
+        "matched": matched,
+        "precision": round(precision, 4),
+        "recall": round(recall, 4),
+        "f1": round(f1, 4),
+        "mean_matched_iou": round(float(np.mean(ious)), 4) if ious else None,
+        "mean_score_delta": round(float(np.mean(score_deltas)), 4) if score_deltas else None,
+        "map50_vs_fp32": round(float(np.mean(list(class_ap.values()))), 4) if class_ap else None,
+        "ap50_by_class": class_ap
+    }
+
+
+# ============================================================================
+# Main
+# ============================================================================
+
+def main(argv: Optional[List[str]] = None) -> int:
+    config = get_config()
+
+    parser = argparse.ArgumentParser(description="INT8 static quantization of the weapon model")
+    parser.add_argument("--model", default=config.detection.model_path,
+                        help="Model weights (.pt) or FP32 .onnx (default: detection.model_path)")
+    parser.add_argument("--images", default=str(Path(config.storage.evidence_path) / "images"),
+                        help="Calibration image directory (default: evidence images)")
+    parser.add_argument("--output", default=None,
+                        help="Output path (default: <model>.int8.onnx)")
+    parser.add_argument("--max-images", type=int, default=200)
+    parser.add_argument("--input-size", type=int, default=config.detection.input_size)
+    parser.add_argument("--calibration", choices=["minmax", "entropy", "percentile"], default="minmax")
+    parser.add_argument("--per-tensor", action="store_true", help="Per-tensor instead of per-channel weights")
+    parser.add_argument("--quantize-head", action="store_true", help="Also quantize the Detect head")
+    parser.add_argument("--threads", type=int, default=config.detection.onnx_threads)
+    parser.add_argument("--report", default=None, help="Write the JSON report here")
+    args = parser.parse_args(argv)
+
+    frames = load_calibration_frames(Path(args.images), args.max_images)
+    if not frames:
+        print(f"❌ No calibration images found in {args.images}")
+        return 1
+    print(f"🖼️ Loaded {len(frames)} calibration frames from {args.images}")
+
+    fp32 = OnnxRuntimeBackend(args.model, input_size=args.input_size, num_threads=args.threads)
+    fp32.load()
+
+    output_path = Path(args.output) if args.output else fp32.onnx_path.with_suffix(".int8.onnx")
+    print(f"⚙️ Quantizing {fp32.onnx_path} → {output_path}")
+    quantize(
+        fp32.onnx_path,
+        output_path,
+        frames,
+        input_size=args.input_size,
+        per_channel=not args.per_tensor,
+        fp32_head=not args.quantize_head,
+        calibration_method=args.calibration
+    )
+
+    int8 = OnnxRuntimeBackend(str(output_path), input_size=args.input_size, num_threads=args.threads)
+    int8.load()
+
+    print("⏱️ Benchmarking FP32 and INT8 on the calibration set...")
+    fp32_run = run_backend(fp32, frames)
+    int8_run = run_backend(int8, frames)
+
+    accuracy = compare(
+        fp32_run["outputs"],
+        int8_run["outputs"],
+        config.detection.confidence_threshold,
+        fp32.names
+    )
+    fp32_mean = fp32_run["latency_ms"]["mean"]
+    int8_mean = int8_run["latency_ms"]["mean"]
+
+    report = {
+        "fp32_model": str(fp32.onnx_path),
+        "int8_model": str(output_path),
+        "calibration_images": len(frames),
+        "confidence_threshold": config.detection.confidence_threshold,
+        "size_mb": {
+            "fp32": round(fp32.onnx_path.stat().st_size / (1024 * 1024), 2),
+            "int8": round(output_path.stat().st_size / (1024 * 1024), 2)
+        },
+        "latency_ms": {"fp32": fp32_run["latency_ms"], "int8": int8_run["latency_ms"]},
+        "speedup": round(fp32_mean / int8_mean, 2) if int8_mean else None,
+        "accuracy": accuracy
+    }
+
+    print("\n" + "=" * 60)
+    print("📊 Quantization report")
+    print("=" * 60)
+    print(f"   Size:     {report['size_mb']['fp32']} MB → {report['size_mb']['int8']} MB")
+    print(f"   Latency:  {fp32_mean} ms → {int8_mean} ms (×{report['speedup']})")
+    print(f"   Agreement vs FP32: precision {accuracy['precision']:.1%}, "
+          f"recall {accuracy['recall']:.1%}, F1 {accuracy['f1']:.1%}")
+    if accuracy["map50_vs_fp32"] is not None:
+        print(f"   mAP@0.5 vs FP32:   {accuracy['map50_vs_fp32']:.3f}")
+    print(f"\n   To use it set detection.backend: onnx and model_path: {output_path}")
+
+    report_path = Path(args.report) if args.report else output_path.with_suffix(".report.json")
+    report_path.write_text(json.dumps(report, indent=2))
+    print(f"📝 Report written to {report_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())